@@ -0,0 +1,152 @@
+"""
+Coroutine entry points for generating and simulating palettes from asyncio applications.
+
+The work is handed off to a shared thread pool so the event loop is never blocked waiting on it, the number
+of jobs running at once is limited, and cancelling the awaiting task also stops the work it was waiting on.
+
+The pool is for keeping the loop responsive, not for speed. Only big numpy operations (like simulating large
+images) release the GIL for long, while spreading the points of a palette of the usual sizes is mostly Python
+overhead that holds it, so concurrent generations take turns rather than running in parallel (and take turns
+with the loop too). For throughput across cores use the worker processes of `python -m colours -j` or
+server.py instead.
+
+    scheme = await aio.generate_scheme(10, preset="Colourblind Friendly", seed=3)
+    simulated = await aio.simulate(rgb, "deuteranopia")
+"""
+import asyncio
+import colours
+import concurrent.futures
+import functools
+import numpy
+import os
+import threading
+import weakref
+
+_executor = None
+_max_concurrency = None
+_semaphores = weakref.WeakKeyDictionary()  # event loop -> semaphore limiting the jobs it has running
+
+# how many colours to simulate between checks for cancellation
+_chunk_size = 2**18
+
+
+def configure(max_workers=None, max_concurrency=None):
+    """Set the number of worker threads and how many jobs may run at once (both default to the cores)."""
+    global _executor, _max_concurrency
+
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+
+    _executor = concurrent.futures.ThreadPoolExecutor(max_workers or os.cpu_count() or 1,
+                                                      thread_name_prefix="colours")
+    _max_concurrency = max_concurrency or max_workers or os.cpu_count() or 1
+    _semaphores.clear()
+
+
+def _get_executor():
+    """Return the shared executor, making it if we need to."""
+    if _executor is None:
+        configure()
+    return _executor
+
+
+def _semaphore():
+    """Return the semaphore for the running loop."""
+    _get_executor()
+    loop = asyncio.get_running_loop()
+    if loop not in _semaphores:
+        _semaphores[loop] = asyncio.Semaphore(_max_concurrency)
+    return _semaphores[loop]
+
+
+def _release(loop, semaphore, future):
+    """Release the semaphore (on the loop's thread) once the job's future is done."""
+    try:
+        loop.call_soon_threadsafe(semaphore.release)
+    except RuntimeError:
+        # the loop has been closed, so nothing is waiting on the semaphore any more
+        pass
+
+
+async def _run(function, *args):
+    """Run the function on the executor, passing it an event that is set if we're cancelled.
+
+    The job keeps its place in the semaphore until the function has actually returned, not just until we stop
+    waiting for it, so cancelled jobs that are still winding down count towards the limit.
+    """
+    cancel = threading.Event()
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphore()
+
+    await semaphore.acquire()
+    try:
+        future = _get_executor().submit(function, *args, cancel=cancel)
+    except BaseException:
+        semaphore.release()
+        raise
+    future.add_done_callback(functools.partial(_release, loop, semaphore))
+
+    try:
+        return await asyncio.wrap_future(future)
+    except asyncio.CancelledError:
+        # the future is only cancelled if it hadn't started yet, so tell it to stop if it had
+        cancel.set()
+        raise
+
+
+async def generate_scheme(n, preset=None, hue=None, chroma=None, light=None, seed=None):
+    """Generate a ColourScheme of n colours without blocking the event loop.
+
+    The options are the same as for colours.generate, with hue/chroma/light as (low, high) pairs.
+    """
+    spec = colours._resolve_spec({"n": n, "preset": preset, "hue": hue, "chroma": chroma, "light": light,
+                                  "seed": seed})
+
+    scheme = colours.ColourScheme(spec["n"], generate=False)
+    scheme.set_limits(spec["hue"], spec["chroma"], spec["light"])
+
+    def reroll(cancel):
+        return scheme.reroll(cancel=cancel, seed=spec["seed"])
+
+    if not await _run(reroll):
+        raise asyncio.CancelledError()
+
+    return scheme
+
+
+def _simulate_chunks(rgb, condition, anomalise, cancel):
+    """Simulate the colours a chunk at a time so we can stop part way through."""
+    rgb = numpy.asarray(rgb)
+    flat = rgb.reshape(-1, 3)
+    result = numpy.empty(flat.shape, dtype=numpy.int32)
+    for start in range(0, flat.shape[0], _chunk_size):
+        if cancel.is_set():
+            return None
+        result[start:start + _chunk_size] = colours.simulate(flat[start:start + _chunk_size], condition, anomalise)
+
+    return result.reshape(rgb.shape)
+
+
+async def simulate(rgb, condition, anomalise=None):
+    """Return the RGB colours (0-255, any shape ending in 3) as though viewed with the condition.
+
+    The condition is either one of the named viewing conditions (e.g. "deuteranopia", "greyscale"), or one of
+    the raw conditions ("protan", "deutan", "tritan", "achroma", "normal") with anomalise given.
+    """
+    if anomalise is None:
+        if condition not in colours._conditions:
+            raise ValueError("unknown condition {!r}, choose from {}".format(condition,
+                                                                            ", ".join(colours._conditions)))
+        condition, anomalise = colours._conditions[condition]
+
+    result = await _run(_simulate_chunks, rgb, condition, anomalise)
+    if result is None:
+        raise asyncio.CancelledError()
+
+    return result
+
+
+async def simulate_all(rgb):
+    """Return the RGB colours as though viewed with each of the named conditions, keyed by name."""
+    results = await asyncio.gather(*[simulate(rgb, name) for name in colours._conditions])
+    return dict(zip(colours._conditions, results))
@@ -0,0 +1,173 @@
+"""
+Audit existing palettes for how distinct their colours stay under each viewing condition.
+
+Palettes are read from a text file, one per line, as hex codes separated by commas and/or spaces, optionally
+preceded by a name and a colon (e.g. "corporate: #1f77b4, #ff7f0e, #2ca02c"). Every palette is simulated
+under every condition, converted to CIELab and its smallest colour difference (CIE76 ΔE) found, all
+vectorised across the whole collection at once. The report is ranked worst first.
+
+usage: python audit.py PALETTES [--condition deuteranopia] [--threshold 10] [--format csv] [-o report.csv]
+"""
+import argparse
+import colours
+import csv
+import json
+import numpy
+import re
+import sys
+
+# how much memory the pairwise differences of a chunk of palettes may take, and roughly how many bytes each pair
+# of colours needs (the float64 difference vector and its norm, plus the masks)
+_memory_budget = 256 * 2**20
+_bytes_per_pair = 48
+
+
+def _parse_palette(line):
+    """Parse a palette line into its name (or None) and list of hex codes."""
+    name = None
+    if ":" in line:
+        name, line = line.split(":", 1)
+        name = name.strip()
+
+    return name, [code for code in re.split(r"[\s,]+", line.strip()) if code]
+
+
+def load_palettes(infile):
+    """Read the palettes from an open file, returning their names and an (n, 3) RGB array for each."""
+    names = []
+    palettes = []
+    for line_number, line in enumerate(infile, 1):
+        if not line.strip() or line.lstrip().startswith("//"):
+            continue
+
+        name, codes = _parse_palette(line)
+        try:
+            palettes.append(colours._hex_to_rgb(codes))
+        except ValueError as error:
+            raise ValueError("line {}: {}".format(line_number, error))
+        names.append(name or "line {}".format(line_number))
+
+    return names, palettes
+
+
+def _pad(palettes):
+    """Stack the palettes into one (p, k, 3) array, with a mask of which entries are real colours."""
+    size = max(len(palette) for palette in palettes)
+    rgb = numpy.zeros((len(palettes), size, 3))
+    mask = numpy.zeros((len(palettes), size), dtype=bool)
+    for index, palette in enumerate(palettes):
+        rgb[index, :len(palette)] = palette
+        mask[index, :len(palette)] = True
+
+    return rgb, mask
+
+
+def _chunks(palettes):
+    """Split the palettes into chunks whose pairwise differences fit the memory budget, yielding their indices.
+
+    Each palette of a chunk is padded to the longest, so they're taken shortest first to keep one long palette
+    from padding all the short ones out with it.
+    """
+    chunk = []
+    for index in sorted(range(len(palettes)), key=lambda index: len(palettes[index])):
+        # sorted, so this palette is the longest in the chunk so far
+        size = max(len(palettes[index]), 1)
+        if chunk and (len(chunk) + 1) * size**2 * _bytes_per_pair > _memory_budget:
+            yield chunk
+            chunk = []
+        chunk.append(index)
+
+    if chunk:
+        yield chunk
+
+
+def _min_difference(lab, mask):
+    """Find the smallest difference between any two real colours in each palette."""
+    differences = numpy.linalg.norm(lab[:, :, None] - lab[:, None], axis=-1)
+
+    # ignore each colour's difference with itself, and anything involving padding
+    valid = mask[:, :, None] & mask[:, None]
+    valid &= ~numpy.eye(lab.shape[1], dtype=bool)
+    differences[~valid] = numpy.inf
+
+    return differences.min(axis=(1, 2))
+
+
+def audit(palettes, conditions=None):
+    """Return the smallest ΔE in each palette under each condition, keyed by the condition name.
+
+    The palettes are a list of (n, 3) RGB arrays (0-255), and the conditions a list of the named viewing
+    conditions (all of them by default). Palettes with fewer than two colours have an infinite minimum.
+    """
+    conditions = list(colours._conditions) if conditions is None else conditions
+    results = {name: numpy.empty(len(palettes)) for name in conditions}
+    if not palettes:
+        return results
+
+    for chunk in _chunks(palettes):
+        rgb, mask = _pad([palettes[index] for index in chunk])
+        for name in conditions:
+            lab = colours.rgb_to_lab(colours.simulate(rgb, *colours._conditions[name]))
+            results[name][chunk] = _min_difference(lab, mask)
+
+    return results
+
+
+def report(names, palettes, results, condition=None, threshold=None):
+    """Rank the palettes worst first, by the given condition or the worst across all of them."""
+    conditions = list(results)
+    worst = numpy.min([results[name] for name in conditions], axis=0)
+    key = worst if condition is None else results[condition]
+
+    for index in numpy.argsort(key, kind="stable"):
+        record = {"name": names[index],
+                  "colours": colours._rgb_to_hex(palettes[index]),
+                  "worst": float(worst[index])}
+        record.update({name: float(results[name][index]) for name in conditions})
+        if threshold is not None:
+            record["pass"] = bool(key[index] >= threshold)
+        yield record
+
+
+def _to_json(record):
+    """Encode a report record as strict JSON, with null for the minimum of a palette with fewer than two colours."""
+    record = {key: None if isinstance(value, float) and numpy.isinf(value) else value
+              for key, value in record.items()}
+    # anything else that isn't a number is a bug, so it shouldn't slip out as NaN
+    return json.dumps(record, allow_nan=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Audit palettes for colour deficiency problems.")
+    parser.add_argument("palettes", type=argparse.FileType("r"), help="file of palettes, one per line")
+    parser.add_argument("--condition", choices=list(colours._conditions),
+                        help="condition to rank by (default: the worst of all of them)")
+    parser.add_argument("--threshold", type=float, help="ΔE that a palette needs to pass")
+    parser.add_argument("--format", choices=("csv", "jsonl"), default="csv", help="report format")
+    parser.add_argument("-o", "--output", type=argparse.FileType("w"), default=sys.stdout, help="report file")
+    args = parser.parse_args(argv)
+
+    try:
+        names, palettes = load_palettes(args.palettes)
+    except ValueError as error:
+        parser.error(str(error))
+
+    records = list(report(names, palettes, audit(palettes), args.condition, args.threshold))
+
+    if args.format == "jsonl":
+        for record in records:
+            args.output.write(_to_json(record) + "\n")
+    else:
+        fields = ["name", "worst"] + list(colours._conditions) + (["pass"] if args.threshold is not None else [])
+        writer = csv.DictWriter(args.output, fields, extrasaction="ignore")
+        writer.writeheader()
+        for record in records:
+            writer.writerow(dict(record, **{key: round(value, 2) for key, value in record.items()
+                                            if isinstance(value, float)}))
+
+    # make it easy to use as a check
+    return 1 if any(not record.get("pass", True) for record in records) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+"""
+The pieces shared by the benchmarks: where the code is, what it ran on, and comparing against a baseline.
+"""
+import json
+import os
+import platform
+import sys
+
+_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# the benchmarks import the modules being measured straight from the repository
+if _root not in sys.path:
+    sys.path.insert(0, _root)
+
+
+def environment():
+    """Describe what the benchmark ran on, so results from different machines aren't mixed up."""
+    import numpy
+
+    return {"python": platform.python_version(),
+            "numpy": numpy.__version__,
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "cpus": os.cpu_count()}
+
+
+def save(results, outfile):
+    """Write the results out as JSON."""
+    json.dump(results, outfile, indent=2)
+    outfile.write("\n")
+
+
+def compare(records, baseline, keys, metrics, tolerance):
+    """Compare the records against the baseline, returning a description of each regression.
+
+    Records are matched on the keys, and each metric is a (name, direction) pair where the direction is 1 if
+    bigger is worse (like time) or -1 if smaller is worse (like throughput). Anything that got worse by more
+    than the tolerance (a fraction) is a regression. Records missing from either side are ignored.
+    """
+    def key(record):
+        return tuple(record.get(name) for name in keys)
+
+    previous = {key(record): record for record in baseline}
+    regressions = []
+    for record in records:
+        old = previous.get(key(record))
+        if old is None:
+            continue
+
+        for name, direction in metrics:
+            new_value, old_value = record.get(name), old.get(name)
+            if new_value is None or old_value is None or old_value == 0:
+                continue
+
+            change = direction * (new_value - old_value) / abs(old_value)
+            if change > tolerance:
+                regressions.append("{}: {} went from {:.4g} to {:.4g} ({:+.0%})".format(
+                    ", ".join("{}={}".format(name, value) for name, value in zip(keys, key(record))),
+                    name, old_value, new_value, direction * change))
+
+    return regressions
@@ -0,0 +1,264 @@
+"""
+Measure how many colours per second each colour conversion and deficiency simulation gets through.
+
+The vectorised conversions (_RGB_to_linear, _linear_to_RGB, lab_to_rgb, rgb_to_lab and simulate under each
+viewing condition) are timed at batch sizes from 1 up to 10^7 colours, and the scalar Colour and
+Colourblind.as_though paths alongside them (on at most --scalar-limit colours, as they go one at a time).
+Each is also checked against a reference worked out in extended precision (numpy.longdouble): the largest
+error, and for the outputs rounded to whole RGB values the fraction that round differently.
+
+Batches that would need more memory than allowed (estimated from a small calibration batch) are skipped.
+Results are written as JSON, and given a baseline anything that has lost throughput or accuracy by more than
+the tolerance is reported and the exit status is non-zero.
+
+usage: python benchmarks/conversion.py [--max-batch 1000000] [-o results.json] [--baseline old.json]
+"""
+import _common
+
+import argparse
+import colours
+import json
+import numpy
+import sys
+import time
+import tracemalloc
+
+_keys = ("kind", "conversion", "condition", "batch")
+_metrics = (("colours_per_second", -1), ("max_error", 1), ("mismatched", 1))
+
+# the reference is worked out with everything in extended precision
+_long = numpy.longdouble
+
+
+def _long_inverse(matrix):
+    """Invert a matrix to extended precision (linalg doesn't do longdouble) with a step of refinement."""
+    matrix = matrix.astype(_long)
+    inverse = numpy.linalg.inv(matrix.astype(float)).astype(_long)
+    return inverse @ (2 * numpy.eye(3, dtype=_long) - matrix @ inverse)
+
+
+_reference_xyz_srgb = colours._xyz_srgb_matrix.astype(_long)
+_reference_srgb_xyz = _long_inverse(colours._xyz_srgb_matrix)
+_reference_white = numpy.array(colours._balances["D65"], dtype=_long)
+
+
+def _reference_RGB_to_linear(RGB):
+    RGB = numpy.asarray(RGB, dtype=_long) / 255
+    return numpy.where(RGB > _long("0.04045"), ((RGB + _long("0.055")) / _long("1.055"))**_long("2.4"),
+                       RGB / _long("12.92"))
+
+
+def _reference_linear_to_RGB(rgb):
+    rgb = numpy.clip(numpy.asarray(rgb, dtype=_long), 0, 1)
+    return 255 * numpy.where(rgb <= _long("0.0031308"), _long("12.92") * rgb,
+                             _long("1.055") * rgb**(1 / _long("2.4")) - _long("0.055"))
+
+
+def _reference_lab_to_rgb(lab):
+    lab = numpy.asarray(lab, dtype=_long)
+    delta = _long(6) / 29
+    t = numpy.stack([(lab[..., 0] + 16) / 116 + lab[..., 1] / 500,
+                     (lab[..., 0] + 16) / 116,
+                     (lab[..., 0] + 16) / 116 - lab[..., 2] / 200], axis=-1)
+    xyz = numpy.where(t > delta, t**3, 3 * delta**2 * (t - _long(4) / 29)) * _reference_white / 100
+
+    return _reference_linear_to_RGB(xyz @ _reference_xyz_srgb.T)
+
+
+def _reference_rgb_to_lab(rgb):
+    xyz = _reference_RGB_to_linear(rgb) @ _reference_srgb_xyz.T * 100 / _reference_white
+    delta = _long(6) / 29
+    f = numpy.where(xyz > delta**3, numpy.cbrt(xyz), xyz / (3 * delta**2) + _long(4) / 29)
+
+    return numpy.stack([116 * f[..., 1] - 16, 500 * (f[..., 0] - f[..., 1]), 200 * (f[..., 1] - f[..., 2])],
+                       axis=-1)
+
+
+def _reference_simulate(rgb, condition, anomalise=False):
+    """Simulate the condition as colours.simulate does, but without rounding the result."""
+    rgb = numpy.asarray(rgb, dtype=_long)
+    v = _long("1.75")
+    if condition == "normal":
+        return rgb
+
+    if condition == "achroma":
+        z = numpy.repeat((rgb @ colours._grey_weights.astype(_long))[..., None], 3, axis=-1)
+        return (v * z + rgb) / (v + 1) if anomalise else z
+
+    style = {key: _long(value) for key, value in colours._blindness_type[condition].items()}
+    xyz = _reference_RGB_to_linear(rgb) @ _reference_srgb_xyz.T
+    norm = xyz.sum(axis=-1)
+    black = norm == 0
+    norm[black] = 1
+    x = numpy.where(black, 0, xyz[..., 0] / norm)
+    y = numpy.where(black, 0, xyz[..., 1] / norm)
+    Y = xyz[..., 1]
+
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        slope = (y - style["y"]) / (x - style["x"])
+        y_int = y - x * slope
+        dx = (style["yi"] - y_int) / (slope - style["m"])
+        dy = slope * dx + y_int
+        z = Y[..., None] * numpy.stack([dx / dy, numpy.ones(dx.shape, dtype=_long), (1 - (dx + dy)) / dy], axis=-1)
+        z[Y == 0] = 0
+
+        dX = _long("0.312713") * Y / _long("0.329016") - z[..., 0]
+        dZ = _long("0.358271") * Y / _long("0.329016") - z[..., 2]
+        distance = numpy.stack([dX, numpy.zeros(dX.shape, dtype=_long), dZ], axis=-1) @ _reference_xyz_srgb.T
+        new_rgb = z @ _reference_xyz_srgb.T
+
+        ratio = ((new_rgb >= 0) - new_rgb) / distance
+        ratio[(ratio < 0) | (ratio > 1)] = 0
+        new_rgb += ratio.max(axis=-1)[..., None] * distance
+        new_rgb = 255 * numpy.clip(new_rgb, 0, 1)**(1 / _long("2.2"))
+
+    return (v * new_rgb + rgb) / (v + 1) if anomalise else new_rgb
+
+
+def _random_inputs(kind, size, seed=0):
+    """Make random colours of the kind that a conversion takes."""
+    random = numpy.random.RandomState(seed)
+    if kind == "rgb":
+        return random.randint(0, 256, (size, 3)).astype(float)
+    if kind == "linear":
+        return random.random_sample((size, 3))
+    # Lab colours that mostly land inside sRGB
+    return random.random_sample((size, 3)) * [100, 160, 160] - [0, 80, 80]
+
+
+def _conversions():
+    """Return (name, condition, input kind, function, reference, rounded) for everything to measure.
+
+    Rounded outputs are compared with the rounded reference.
+    """
+    conversions = [("_RGB_to_linear", None, "rgb", colours._RGB_to_linear, _reference_RGB_to_linear, False),
+                   ("_linear_to_RGB", None, "linear", colours._linear_to_RGB, _reference_linear_to_RGB, False),
+                   ("lab_to_rgb", None, "lab", colours.lab_to_rgb, _reference_lab_to_rgb, False),
+                   ("rgb_to_lab", None, "rgb", colours.rgb_to_lab, _reference_rgb_to_lab, False),
+                   ("Colour", None, "lab", lambda lab: numpy.array([colours.Colour(value).rgb for value in lab]),
+                    _reference_lab_to_rgb, True)]
+
+    for name, (condition, anomalise) in colours._conditions.items():
+        def vectorised(rgb, condition=condition, anomalise=anomalise):
+            return colours.simulate(rgb, condition, anomalise)
+
+        def scalar(rgb, condition=condition, anomalise=anomalise):
+            return numpy.array([colours.Colourblind(value, linear=False).as_though(condition, anomalise)
+                                for value in rgb])
+
+        def reference(rgb, condition=condition, anomalise=anomalise):
+            return _reference_simulate(rgb, condition, anomalise)
+
+        conversions.append(("simulate", name, "rgb", vectorised, reference, True))
+        conversions.append(("as_though", name, "rgb", scalar, reference, True))
+
+    return conversions
+
+
+def _best_time(function, argument, min_time):
+    """Return the best time for calling the function, repeating it for at least min_time seconds."""
+    best, total = numpy.inf, 0
+    while total < min_time or best == numpy.inf:
+        start = time.perf_counter()
+        function(argument)
+        elapsed = time.perf_counter() - start
+        best, total = min(best, elapsed), total + elapsed
+
+    return best
+
+
+def _bytes_per_colour(function, kind, size=10000):
+    """Estimate how much memory the function needs per colour, from a small batch."""
+    argument = _random_inputs(kind, size)
+    tracemalloc.start()
+    try:
+        function(argument)
+        return tracemalloc.get_traced_memory()[1] / size + argument.nbytes / size
+    finally:
+        tracemalloc.stop()
+
+
+def accuracy(function, reference, kind, rounded, size):
+    """Return the largest error against the reference, and the fraction of values rounding differently."""
+    argument = _random_inputs(kind, size, seed=1)
+    result = numpy.asarray(function(argument), dtype=_long)
+    expected = reference(argument)
+    if rounded:
+        expected = numpy.round(expected)
+
+    with numpy.errstate(invalid="ignore"):
+        error = numpy.abs(result - expected)
+    return {"max_error": float(numpy.nanmax(error)),
+            "mismatched": float((error > 0.5).mean()) if rounded else None}
+
+
+def run(batches, scalar_limit, min_time, accuracy_size, memory_limit, names=None, log=None):
+    """Measure the throughput and accuracy of each conversion, returning a record for each."""
+    records = []
+    for name, condition, kind, function, reference, rounded in _conversions():
+        if names and name not in names:
+            continue
+
+        scalar = name in ("Colour", "as_though")
+        function(_random_inputs(kind, 8))  # get any lazy set up out of the way
+        per_colour = _bytes_per_colour(function, kind, 1000 if scalar else 10000)
+
+        record = {"kind": "accuracy", "conversion": name, "condition": condition, "batch": None}
+        record.update(accuracy(function, reference, kind, rounded, min(accuracy_size, scalar_limit)
+                               if scalar else accuracy_size))
+        records.append(record)
+        if log is not None:
+            print(record, file=log)
+
+        for batch in batches:
+            record = {"kind": "throughput", "conversion": name, "condition": condition, "batch": batch}
+
+            # the scalar paths go one colour at a time, so a sample of a big batch is as good as all of it
+            measured = min(batch, scalar_limit) if scalar else batch
+            if per_colour * measured > memory_limit:
+                record["skipped"] = "needs about {:.0f} MiB".format(per_colour * measured / 2**20)
+            else:
+                seconds = _best_time(function, _random_inputs(kind, measured), min_time)
+                record.update({"measured": measured,
+                               "seconds": seconds,
+                               "colours_per_second": measured / seconds})
+
+            records.append(record)
+            if log is not None:
+                print(record, file=log)
+
+    return records
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark colour conversion and simulation throughput.")
+    parser.add_argument("--max-batch", type=int, default=10**7, help="largest batch of colours (a power of 10)")
+    parser.add_argument("--scalar-limit", type=int, default=10000,
+                        help="most colours to time the one at a time (Colour and as_though) paths on")
+    parser.add_argument("--min-time", type=float, default=0.1, help="seconds to repeat each measurement for")
+    parser.add_argument("--accuracy-size", type=int, default=100000, help="colours to check the accuracy on")
+    parser.add_argument("--conversions", nargs="+", help="only measure these conversions")
+    parser.add_argument("--memory-limit", type=float, default=2048, help="MiB a batch may use before skipping")
+    parser.add_argument("-o", "--output", type=argparse.FileType("w"), default=sys.stdout, help="results file")
+    parser.add_argument("--baseline", type=argparse.FileType("r"), help="earlier results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="fraction worse that counts as a regression")
+    args = parser.parse_args(argv)
+
+    batches = [10**power for power in range(len(str(args.max_batch)))]
+    records = run(batches, args.scalar_limit, args.min_time, args.accuracy_size, args.memory_limit * 2**20,
+                  args.conversions, log=sys.stderr)
+    _common.save({"environment": _common.environment(), "results": records}, args.output)
+
+    if args.baseline is None:
+        return 0
+
+    baseline = json.load(args.baseline)["results"]
+    regressions = _common.compare(records, baseline, _keys, _metrics, args.tolerance)
+    for regression in regressions:
+        print("regression: " + regression, file=sys.stderr)
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
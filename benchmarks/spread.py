@@ -0,0 +1,167 @@
+"""
+Measure how spreading points, and generating whole colour schemes, scale with the number of colours.
+
+Points.spread is swept over the number of points, periodic and bounded boxes, the force settings (dim and
+force) and the dtype, recording the time per step, the total time, the peak memory of a step (from
+tracemalloc) and the smallest separation of the spread points. ColourScheme generation is timed the same way
+with its separation as a ΔE. Everything is seeded so the separations are reproducible, and configurations
+that would need more memory than allowed are skipped.
+
+Results are written as JSON, and given a baseline (an earlier set of results) anything that has slowed down,
+grown or lost separation by more than the tolerance is reported and the exit status is non-zero.
+
+usage: python benchmarks/spread.py [--sizes 8 32 128] [--steps 10] [-o results.json] [--baseline old.json]
+(sizes of 10000 and up need --memory-limit raised well past its default of 2048 MiB, or they're skipped)
+"""
+import _common
+
+import argparse
+import colours
+import itertools
+import json
+import numpy
+import sys
+import time
+import tracemalloc
+
+# roughly how many n x n arrays of the dtype a step holds at once (the periodic cdist adds its 27 copies)
+_arrays_per_step = 16
+_arrays_per_periodic_cdist = 32
+
+_keys = ("kind", "n", "periodic", "dim", "force", "dtype")
+_metrics = (("per_step", 1), ("peak_memory", 1), ("min_separation", -1))
+
+
+def _estimate_memory(n, periodic, dtype):
+    """Estimate the peak memory of a step, in bytes."""
+    dtype = numpy.dtype(dtype)
+    arrays = _arrays_per_periodic_cdist if periodic and dtype == numpy.float64 else _arrays_per_step
+    return arrays * n * n * dtype.itemsize
+
+
+def _peak_memory(function):
+    """Run the function, returning the most memory it had allocated at once."""
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _separation(points):
+    """Return the smallest distance between any two points, as a fraction of the box."""
+    distances = points._get_distances()
+    numpy.fill_diagonal(distances, numpy.inf)
+    return float(distances.min() / points.scale)
+
+
+def _lab_separation(scheme):
+    """Return the smallest ΔE between any two colours of the scheme."""
+    lab = numpy.array([colour.lab for colour in scheme.colours])
+    distances = numpy.linalg.norm(lab[:, None] - lab, axis=-1)
+    numpy.fill_diagonal(distances, numpy.inf)
+    return float(distances.min())
+
+
+def bench_spread(n, periodic, dim, force, dtype, steps, repeat, seed=0):
+    """Time spreading n points for a number of steps, taking the best of several repeats."""
+    best = numpy.inf
+    for i in range(repeat):
+        points = colours.Points(n, force=force, dim=dim, periodic=periodic, seed=seed, dtype=dtype)
+        start = time.perf_counter()
+        points.spread(steps)
+        best = min(best, time.perf_counter() - start)
+
+    # measuring the memory slows things down a little so it's done on a step of its own
+    return {"steps": steps,
+            "total": best,
+            "per_step": best / steps,
+            "peak_memory": _peak_memory(points._move),
+            "min_separation": _separation(points)}
+
+
+def bench_scheme(n, dtype, repeat, seed=0):
+    """Time generating a whole scheme of n colours."""
+    best = numpy.inf
+    for i in range(repeat):
+        scheme = colours.ColourScheme(n, generate=False, dtype=dtype)
+        start = time.perf_counter()
+        scheme.reroll(seed=seed)
+        best = min(best, time.perf_counter() - start)
+
+    points = scheme.points
+    steps = 200  # what _find_colours spreads for
+    return {"steps": steps,
+            "total": best,
+            "per_step": best / steps,
+            "peak_memory": _peak_memory(points._move),
+            "min_separation": _lab_separation(scheme)}
+
+
+def run(sizes, periodics, dims, forces, dtypes, steps, repeat, scheme_sizes, memory_limit, log=None):
+    """Run the whole sweep, returning a record for each configuration."""
+    records = []
+    sweep = [("spread", n, periodic, dim, force, dtype)
+             for n, periodic, dim, force, dtype in itertools.product(sizes, periodics, dims, forces, dtypes)]
+    # schemes always spread in a periodic box with dim 8 and force 20
+    sweep += [("scheme", n, True, 8, 20, dtype) for n, dtype in itertools.product(scheme_sizes, dtypes)]
+
+    # get the lazy imports out of the way so they aren't put down to the first configuration
+    colours.Points(8, seed=0).spread(1)
+
+    for kind, n, periodic, dim, force, dtype in sweep:
+        record = dict(zip(_keys, (kind, n, periodic, dim, force, numpy.dtype(dtype).name)))
+
+        needed = _estimate_memory(n, periodic, dtype)
+        if needed > memory_limit:
+            record["skipped"] = "needs about {:.0f} MiB".format(needed / 2**20)
+        elif kind == "spread":
+            record.update(bench_spread(n, periodic, dim, force, dtype, steps, repeat))
+        else:
+            record.update(bench_scheme(n, dtype, repeat))
+
+        records.append(record)
+        if log is not None:
+            print(record, file=log)
+
+    return records
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark spreading points and generating colour schemes.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[8, 32, 128, 512, 2048],
+                        help="numbers of points to spread (the defaults fit the default memory limit, 10000 needs "
+                             "--memory-limit raised to about 6000 for float32 and 25000 for float64)")
+    parser.add_argument("--periodic", choices=("yes", "no", "both"), default="both", help="box boundaries")
+    parser.add_argument("--dims", type=int, nargs="+", default=[3, 8], help="force drop off powers")
+    parser.add_argument("--forces", type=float, nargs="+", default=[2, 20], help="force strengths")
+    parser.add_argument("--dtypes", nargs="+", default=["float64", "float32"], help="dtypes to spread in")
+    parser.add_argument("--steps", type=int, default=10, help="steps to spread for")
+    parser.add_argument("--repeat", type=int, default=1, help="number of runs to take the best of")
+    parser.add_argument("--scheme-sizes", type=int, nargs="*", default=[8, 32, 128],
+                        help="numbers of colours to generate whole schemes for")
+    parser.add_argument("--memory-limit", type=float, default=2048, help="MiB a step may use before skipping")
+    parser.add_argument("-o", "--output", type=argparse.FileType("w"), default=sys.stdout, help="results file")
+    parser.add_argument("--baseline", type=argparse.FileType("r"), help="earlier results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="fraction worse that counts as a regression")
+    args = parser.parse_args(argv)
+
+    periodics = {"yes": [True], "no": [False], "both": [False, True]}[args.periodic]
+    records = run(args.sizes, periodics, args.dims, args.forces, args.dtypes, args.steps, args.repeat,
+                  args.scheme_sizes, args.memory_limit * 2**20, log=sys.stderr)
+    _common.save({"environment": _common.environment(), "results": records}, args.output)
+
+    if args.baseline is None:
+        return 0
+
+    baseline = json.load(args.baseline)["results"]
+    regressions = _common.compare(records, baseline, _keys, _metrics, args.tolerance)
+    for regression in regressions:
+        print("regression: " + regression, file=sys.stderr)
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+"""
+Check the cold startup time of colours and scheming against a budget.
+
+Every measurement is made in a fresh interpreter so nothing is already imported, and the time for a bare
+interpreter is taken off so the numbers reflect our code. Exits non-zero if anything is over budget.
+
+usage: python benchmarks/startup.py [--repeat 5] [--colours-budget 0.25] [--scheming-budget 0.4]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# modules that a plain `import colours` should never pull in
+_heavy_modules = ("matplotlib", "scipy", "mpl_toolkits", "tkinter")
+
+# how long it takes to get the first window painted (run inside the child interpreter)
+_first_paint = """
+import time
+start = time.perf_counter()
+import tkinter
+import scheming
+try:
+    root = tkinter.Tk()
+except tkinter.TclError:
+    print("nan")
+else:
+    app = scheming.MainApplication(root)
+    root.update()
+    print(time.perf_counter() - start)
+    root.destroy()
+"""
+
+
+def _run(code):
+    """Run the code in a fresh interpreter, returning the wall time and its output."""
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", code], cwd=_root, stdout=subprocess.PIPE, check=True,
+                            universal_newlines=True)
+    return time.perf_counter() - start, result.stdout
+
+
+def _best(code, repeat):
+    """Return the best time for running the code."""
+    return min(_run(code)[0] for i in range(repeat))
+
+
+def measure(repeat=5):
+    """Measure the startup times."""
+    baseline = _best("pass", repeat)
+    results = {"interpreter": baseline,
+               "import numpy": _best("import numpy", repeat) - baseline,
+               "import colours": _best("import colours", repeat) - baseline,
+               "import scheming": _best("import scheming", repeat) - baseline}
+
+    # make sure importing colours doesn't drag in any of the heavy modules
+    check = "import sys, colours; print(' '.join(sorted({}.intersection(m.split('.')[0] for m in sys.modules))))"
+    results["colours heavy imports"] = _run(check.format(set(_heavy_modules)))[1].split()
+
+    # and if we've got a display, how long it takes to get the window up
+    paint = min(float(_run(_first_paint)[1]) for i in range(repeat))
+    results["first paint"] = None if paint != paint else paint
+
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the startup time of colours and scheming.")
+    parser.add_argument("--repeat", type=int, default=5, help="number of runs to take the best of")
+    parser.add_argument("--colours-budget", type=float, default=0.25, help="seconds allowed for import colours")
+    parser.add_argument("--scheming-budget", type=float, default=0.4, help="seconds allowed for import scheming")
+    parser.add_argument("--paint-budget", type=float, default=1.0, help="seconds allowed to paint the window")
+    args = parser.parse_args(argv)
+
+    results = measure(args.repeat)
+    print(json.dumps(results, indent=2))
+
+    failures = []
+    if results["import colours"] > args.colours_budget:
+        failures.append("import colours took {:.3f}s".format(results["import colours"]))
+    if results["import scheming"] > args.scheming_budget:
+        failures.append("import scheming took {:.3f}s".format(results["import scheming"]))
+    if results["first paint"] is not None and results["first paint"] > args.paint_budget:
+        failures.append("first paint took {:.3f}s".format(results["first paint"]))
+    if results["colours heavy imports"]:
+        failures.append("import colours pulled in " + ", ".join(results["colours heavy imports"]))
+
+    for failure in failures:
+        print("over budget: " + failure, file=sys.stderr)
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
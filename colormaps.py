@@ -0,0 +1,166 @@
+"""
+Perceptually uniform sequential and diverging colormaps.
+
+A colormap follows a path through HCL within the given hue, chroma and light limits (the same limits as the
+sliders), with the lightness changing monotonically along it. Colours outside of sRGB have their chroma
+reduced until they fit, and the path is then resampled so that every step is the same perceptual
+distance (ΔE) apart, all vectorised (a few passes even out the steps where the path bends).
+
+    cmap = colormaps.sequential(hue=(300, 90), chroma=(40, 70), light=(15, 90))
+    cmap.validate()["deuteranopia"]
+    matplotlib.pyplot.imshow(data, cmap=cmap.to_matplotlib())
+    cmap.save("sequential.npy")
+"""
+import colours
+import numpy
+
+# how finely to sample the path before resampling it evenly
+_samples = 4096
+
+# how far inside sRGB (in linear RGB) the path is kept, so that interpolating between its samples stays inside
+_gamut_margin = 1e-4
+
+
+def _fit_gamut(hue, chroma, light, iterations=24):
+    """Reduce the chroma of each point (keeping hue and lightness) until it fits in sRGB."""
+    # bisect on the chroma of every point at once
+    low = numpy.zeros(chroma.shape)
+    high = numpy.array(chroma, dtype=float)
+    fits = colours.in_gamut(colours.hcl_to_lab(hue, high, light), tolerance=-_gamut_margin)
+    low[fits] = high[fits]
+    for i in range(iterations):
+        middle = (low + high) / 2
+        inside = colours.in_gamut(colours.hcl_to_lab(hue, middle, light), tolerance=-_gamut_margin)
+        low = numpy.where(inside, middle, low)
+        high = numpy.where(inside, high, middle)
+
+    return colours.hcl_to_lab(hue, low, light)
+
+
+def _equalise(lab, size, iterations=8):
+    """Resample the path so that neighbouring colours are all the same ΔE apart."""
+    steps = numpy.linalg.norm(numpy.diff(lab, axis=0), axis=-1)
+    distance = numpy.concatenate([[0], numpy.cumsum(steps)])
+
+    def resample(targets):
+        return numpy.stack([numpy.interp(targets, distance, lab[:, i]) for i in range(3)], axis=-1)
+
+    targets = numpy.linspace(0, distance[-1], size)
+    if distance[-1] == 0:
+        return resample(targets)
+
+    # evenly spaced along the path, the straight line between neighbours falls short where the path bends (like
+    # where it follows the edge of the gamut), so those gaps are given a little more of the path until it evens out
+    for i in range(iterations):
+        chords = numpy.linalg.norm(numpy.diff(resample(targets), axis=0), axis=-1)
+        gaps = numpy.diff(targets) * chords.mean() / numpy.maximum(chords, 1e-12)
+        targets = numpy.concatenate([[0], numpy.cumsum(gaps)]) * distance[-1] / gaps.sum()
+
+    return resample(targets)
+
+
+def _arm(hue, chroma, light, size, end=None):
+    """Make an evenly spaced path from the first to the second of each (start, end) pair.
+
+    If an end point (in CIELab) is given the path carries on in a straight line to finish there.
+    """
+    t = numpy.linspace(0, 1, _samples)
+    path_hue = hue[0] + (hue[1] - hue[0]) * t
+    path_chroma = chroma[0] + (chroma[1] - chroma[0]) * t
+    path_light = light[0] + (light[1] - light[0]) * t
+
+    path = _fit_gamut(path_hue, path_chroma, path_light)
+    if end is not None:
+        path = numpy.concatenate([path, [end]])
+
+    # the first pass evens out the dense samples so the chords of the second match the arc length closely
+    return _equalise(_equalise(path, _samples), size)
+
+
+class Colormap():
+    """A lookup table of colours that are evenly spaced in perceptual space."""
+
+    def __init__(self, lab, kind="sequential"):
+        self.lab = lab
+        self.kind = kind
+        self.size = lab.shape[0]
+
+        # the RGB table, as 0-1 floats ready for matplotlib
+        self.rgb = colours.lab_to_rgb(lab) / 255
+
+    def validate(self, conditions=None):
+        """Check how the colormap holds up under each viewing condition.
+
+        For each condition this gives whether the simulated lightness is still monotonic (in each half for a
+        diverging map), the ΔE between the ends (the middle and the ends for a diverging map), and how even
+        the steps are (the standard deviation of the ΔE between steps over its mean, 0 being perfectly even).
+        """
+        conditions = list(colours._conditions) if conditions is None else conditions
+        rgb = numpy.round(self.rgb * 255)
+
+        # neighbouring entries of a large table are closer than whole RGB values can resolve, so the evenness
+        # is measured over a coarser sampling
+        coarse = numpy.linspace(0, self.size - 1, min(self.size, 33)).round().astype(int)
+
+        results = {}
+        for name in conditions:
+            lab = colours.rgb_to_lab(colours.simulate(rgb, *colours._conditions[name]))
+            steps = numpy.linalg.norm(numpy.diff(lab[coarse], axis=0), axis=-1)
+
+            if self.kind == "diverging":
+                middle = self.size // 2
+                halves = (lab[:middle + 1, 0], lab[middle:, 0][::-1])
+                span = min(numpy.linalg.norm(lab[0] - lab[middle]), numpy.linalg.norm(lab[-1] - lab[middle]))
+            else:
+                halves = (lab[:, 0],)
+                span = numpy.linalg.norm(lab[-1] - lab[0])
+
+            # allow for the rounding to whole RGB values
+            monotonic = all((numpy.diff(half) > -0.5).all() or (numpy.diff(half) < 0.5).all() for half in halves)
+
+            results[name] = {"monotonic": bool(monotonic),
+                             "span": float(span),
+                             "uniformity": float(steps.std() / steps.mean()) if steps.mean() else 0.0}
+
+        return results
+
+    def to_matplotlib(self, name=None):
+        """Return the colormap as a matplotlib ListedColormap."""
+        import matplotlib.colors
+
+        return matplotlib.colors.ListedColormap(self.rgb, name=name or "scheming_" + self.kind)
+
+    def save(self, path):
+        """Save the RGB lookup table (size x 3, 0-1 floats) as a .npy file."""
+        numpy.save(path, self.rgb.astype(numpy.float32))
+
+
+def sequential(hue=(300, 90), chroma=(40, 70), light=(15, 90), size=256):
+    """Make a sequential colormap running from dark to light.
+
+    The hue moves from the first to the second limit (in degrees, so (300, 90) goes through blue and green)
+    while the chroma rises from the first to the second limit and the lightness from dark to light.
+    """
+    if light[0] >= light[1]:
+        raise ValueError("the light limits should be (low, high), got {}".format(light))
+
+    return Colormap(_arm(hue, chroma, light, size), "sequential")
+
+
+def diverging(hue=(260, 40), chroma=(0, 60), light=(30, 95), size=256):
+    """Make a diverging colormap from one hue, through a light neutral middle, to the other.
+
+    Each end takes the high chroma and low lightness, and towards the middle the chroma falls to the low limit
+    and the lightness rises to the high one, so the lightness rises monotonically into the middle and falls away
+    from it. Both halves finish at the grey of the high lightness, so they join up whatever the low chroma is.
+    """
+    if light[0] >= light[1] or chroma[0] > chroma[1]:
+        raise ValueError("the chroma and light limits should be (low, high), got {} and {}".format(chroma, light))
+
+    # make each half separately so the two sides are the same length
+    half = size // 2 + 1
+    middle = numpy.array([light[1], 0, 0])
+    left = _arm((hue[0], hue[0]), chroma[::-1], light, half, end=middle)
+    right = _arm((hue[1], hue[1]), chroma[::-1], light, size - half + 1, end=middle)[::-1]
+
+    return Colormap(numpy.concatenate([left, right[1:]]), "diverging")
@@ -1,21 +1,15 @@
+import argparse
+import copy
+import csv
+import functools
+import json
+import metrics
+import multiprocessing
 import numpy
-import matplotlib.pyplot
-import matplotlib.path
-import matplotlib.patches
-import scipy.spatial
+import sys
 
-# we also want the 3D stuff for the time being
-from mpl_toolkits.mplot3d import Axes3D
-
-import builtins
-
-# use this so we can avoid profiler issues
-try:
-    builtins.profile
-except AttributeError:
-    # this is the case when we're not running a profiler
-    def profile(func): return func
-    builtins.profile = profile
+# matplotlib and scipy aren't imported here: they're slow to import and most uses of this module (converting
+# colours) never touch them, so the drawing functions and Points._get_distances import them where they're used
 
 # define the vertices of the paths
 _verts = numpy.array([(0.2, 0.0),
@@ -35,24 +29,30 @@ _verts = numpy.array([(0.2, 0.0),
 _scale = numpy.array([1, 1.5]) * 1.5
 
 # and the associated curves
-_codes = numpy.array([matplotlib.path.Path.MOVETO,
-                      matplotlib.path.Path.LINETO,
-                      matplotlib.path.Path.CURVE3,
-                      matplotlib.path.Path.CURVE3,
-                      matplotlib.path.Path.LINETO,
-                      matplotlib.path.Path.CURVE3,
-                      matplotlib.path.Path.CURVE3,
-                      matplotlib.path.Path.LINETO,
-                      matplotlib.path.Path.CURVE3,
-                      matplotlib.path.Path.CURVE3,
-                      matplotlib.path.Path.LINETO,
-                      matplotlib.path.Path.CURVE3,
-                      matplotlib.path.Path.CURVE3])
+@functools.lru_cache(maxsize=None)
+def _codes():
+    import matplotlib.path
+
+    return numpy.array([matplotlib.path.Path.MOVETO,
+                        matplotlib.path.Path.LINETO,
+                        matplotlib.path.Path.CURVE3,
+                        matplotlib.path.Path.CURVE3,
+                        matplotlib.path.Path.LINETO,
+                        matplotlib.path.Path.CURVE3,
+                        matplotlib.path.Path.CURVE3,
+                        matplotlib.path.Path.LINETO,
+                        matplotlib.path.Path.CURVE3,
+                        matplotlib.path.Path.CURVE3,
+                        matplotlib.path.Path.LINETO,
+                        matplotlib.path.Path.CURVE3,
+                        matplotlib.path.Path.CURVE3])
 
 
 # and make the path
 def _rounded_verts(x_offset, y_offset):
-    return matplotlib.path.Path(_verts * _scale + numpy.array([x_offset, y_offset]), _codes)
+    import matplotlib.path
+
+    return matplotlib.path.Path(_verts * _scale + numpy.array([x_offset, y_offset]), _codes())
 
 
 # this will hold the offsets (duplicate coordinates) for the periodic boundary conditions
@@ -62,9 +62,13 @@ _offset_cubes = numpy.array([(i, j, k) for i in range(-1, 2) for j in range(-1,
 class Points():
     """A collection of points."""
 
-    def __init__(self, n, force=2, dim=3, scale=10, periodic=False):
+    def __init__(self, n, force=2, dim=3, scale=10, periodic=False, seed=None, dtype=numpy.float64):
         # first make the random points in a 1x1x1 cube centred at the origin
-        self.points = numpy.random.random((n, 3)) * scale
+        # (using the global random state unless we've been given a seed of our own)
+        # everything is worked out in the given dtype, float32 halves the memory traffic for large n
+        random = numpy.random if seed is None else numpy.random.RandomState(seed)
+        self.dtype = numpy.dtype(dtype)
+        self.points = (random.random_sample((n, 3)) * scale).astype(self.dtype)
         self.scale = scale
 
         # we'll define these auxillary attributes to make them easier to find later
@@ -77,18 +81,37 @@ class Points():
         self.dim = dim  # this defines the drop off of the force with distance
 
         # we'll store the deltas too
-        self.delta = numpy.zeros(self.points.shape)
+        self.delta = numpy.zeros(self.points.shape, dtype=self.dtype)
 
         self.fixed = numpy.array([True] + [False] * (n - 1))
         self.periodic = periodic
 
+    def copy(self):
+        """Return a copy of the points that can be spread without moving these ones."""
+        other = copy.copy(self)
+        other.points = self.points.copy()
+        other.x, other.y, other.z = other.points[:, 0], other.points[:, 1], other.points[:, 2]
+        other.delta = self.delta.copy()
+        other.fixed = self.fixed.copy()
+        return other
+
     def get_normed_points(self):
         """Return the normalised points."""
         return self.points / self.scale
 
-    @profile
+    @metrics.timed("points.distances")
     def _get_distances(self):
         """Calculate the separation between each pair of points."""
+        if self.dtype != numpy.float64:
+            # cdist always works in double precision so we do it ourselves to stay in our dtype
+            separation = numpy.abs(self.points[:, None] - self.points)
+            if self.periodic:
+                # the nearest copy of each point is never more than half the box away in each direction
+                numpy.minimum(separation, self.scale - separation, out=separation)
+            return numpy.sqrt(numpy.einsum("ijk,ijk->ij", separation, separation))
+
+        import scipy.spatial.distance
+
         # here we want to account for periodic boundary conditions
         if self.periodic:
             # we want to duplicate the volume on each side of the cube
@@ -108,7 +131,7 @@ class Points():
 
         return scipy.spatial.distance.cdist(self.points, self.points)
 
-    @profile
+    @metrics.timed("points.move")
     def _move(self, dt=1):
         """Separate the points according to the repulsive force between them."""
         # first get the distances
@@ -119,9 +142,13 @@ class Points():
         vectors = self.points - self.points[:, None]
 
         # now we can calculate the forces
-        forces = numpy.zeros(vectors.shape)
+        # (very close points would underflow the power to zero, so the distance is kept to where it's still a normal
+        # number)
+        forces = numpy.zeros(vectors.shape, dtype=self.dtype)
+        nearest = numpy.finfo(self.dtype).tiny**(1 / self.dim)
         forces[dist != 0] = (self.force * vectors[dist != 0]
-                             / dist.reshape(vectors.shape[0], vectors.shape[1], 1)[dist != 0]**self.dim)
+                             / numpy.maximum(dist, nearest).reshape(vectors.shape[0], vectors.shape[1], 1)[
+                                 dist != 0]**self.dim)
 
         # now sum the forces for each point
         total_forces = forces.sum(axis=0)
@@ -131,43 +158,95 @@ class Points():
 
         # and account for the bounding box
         if self.periodic:
-            self.points[self.points >= self.scale] -= self.scale
-            self.points[self.points <= 0] += self.scale
+            # a big push (from points that were very close) can carry a point round the box more than once
+            self.points[:] = numpy.mod(self.points, self.scale)
         else:
             self.points[self.points >= self.scale] = self.scale
             self.points[self.points <= 0] = 0
 
-    def spread(self, times=200, dt=1):
-        """Spread the points throughout the available space."""
-        for i in range(times):
-            self._move(dt)
-
-
-def _visualise_movement():
-    numpy.random.seed(0)
-    points = Points(20, force=10, dim=8, periodic=True)
-
-    # make the plot interactive
-    matplotlib.pyplot.ion()
-    figure = matplotlib.pyplot.figure()
-
-    ax = figure.add_subplot(1, 1, 1, projection='3d')
-
-    scatter = ax.scatter(points.x, points.y, points.z, color='g')
-
-    matplotlib.pyplot.draw()
-    for i in range(200):
-        points._move(1)
-        scatter._offsets3d = (points.x, points.y, points.z)
+    @metrics.timed("points.spread")
+    def spread(self, times=200, dt=1, cancel=None, record=False):
+        """Spread the points throughout the available space.
 
-        # update the plot
-        figure.canvas.draw()
-        matplotlib.pyplot.pause(0.1)
+        If a cancel event is given it is checked before every step, and the spread stops early (returning
+        False) once it is set.
 
-    matplotlib.pyplot.waitforbuttonpress()
+        With record the positions before and after every step are kept in self.trajectory, of shape
+        (steps + 1, n, 3). It's allocated up front, or record can be an array of that shape to fill instead.
+        """
+        trajectory = None
+        if record is not False:
+            shape = (times + 1,) + self.points.shape
+            trajectory = numpy.empty(shape, dtype=self.dtype) if record is True else record
+            if trajectory.shape != shape:
+                raise ValueError("the record array should have shape {}, got {}".format(shape, trajectory.shape))
+            trajectory[0] = self.points
 
+        for i in range(times):
+            if cancel is not None and cancel.is_set():
+                metrics.count("points.steps", i)
+                if trajectory is not None:
+                    self.trajectory = trajectory[:i + 1]
+                return False
+            self._move(dt)
+            if trajectory is not None:
+                trajectory[i + 1] = self.points
+
+        metrics.count("points.steps", times)
+        if trajectory is not None:
+            self.trajectory = trajectory
+        return True
+
+    def save_trajectory(self, path):
+        """Save the recorded trajectory (see spread) and the settings behind it, compressed."""
+        numpy.savez_compressed(path, positions=self.trajectory, scale=self.scale, periodic=self.periodic,
+                               force=self.force, dim=self.dim)
+
+
+def load_trajectory(path):
+    """Load a trajectory saved by Points.save_trajectory, as a dict of its positions and settings."""
+    with numpy.load(path) as data:
+        trajectory = {key: data[key] for key in data.files}
+
+    # everything but the positions is a single value
+    trajectory.update({key: value.item() for key, value in trajectory.items() if key != "positions"})
+    return trajectory
+
+
+def _visualise_movement(n=20, steps=200, seed=0):
+    """Record a spread and replay it."""
+    import replay
+
+    points = Points(n, force=10, dim=8, periodic=True, seed=seed)
+    points.spread(steps, record=True)
+    replay.show([points.trajectory], scale=points.scale)
+
+
+# the white points of the standard illuminants (2 degree observer) as XYZ, scaled so that Y = 100
+_balances = {"A": (109.850, 100, 35.585),
+             "C": (98.074, 100, 118.232),
+             "D50": (96.422, 100, 82.521),
+             "D55": (95.682, 100, 92.149),
+             "D65": (95.0489, 100, 108.8840),
+             "D75": (94.972, 100, 122.638),
+             "E": (100, 100, 100),
+             "F2": (99.187, 100, 67.395),
+             "F7": (95.044, 100, 108.755),
+             "F11": (100.966, 100, 64.370)}
+_srgb_white = "D65"  # the sRGB primaries are defined relative to this
+
+# the cone response matrices (from XYZ) that each method of chromatic adaptation scales the white point in
+_cone_responses = {"bradford": numpy.array([[0.8951, 0.2664, -0.1614],
+                                            [-0.7502, 1.7135, 0.0367],
+                                            [0.0389, -0.0685, 1.0296]]),
+                   "cat02": numpy.array([[0.7328, 0.4296, -0.1624],
+                                         [-0.7036, 1.6975, 0.0061],
+                                         [0.0030, 0.0136, 0.9834]]),
+                   "von kries": numpy.array([[0.40024, 0.70760, -0.08081],
+                                             [-0.22630, 1.16532, 0.04570],
+                                             [0.0, 0.0, 0.91822]]),
+                   "xyz scaling": numpy.eye(3)}
 
-_balances = {'D65': (95.0489, 100, 108.8840)}
 _xyz_srgb_matrix = numpy.array([[3.2404542, -1.5371385, -0.4985314],
                                 [-0.9692660,  1.8760108,  0.0415560],
                                 [0.0556434, -0.2040259,  1.0572252]])
@@ -216,7 +295,7 @@ class Colourblind():
         RGB[RGB >= 1] = 1
         RGB[RGB <= 0] = 0
 
-        return numpy.round_(RGB * 255)
+        return numpy.round(RGB * 255)
 
     def _RGB_to_linear(self):
         """Convert RGB to linear rgb."""
@@ -247,6 +326,7 @@ class Colourblind():
         # otherwise we need to make the following transformation
         return numpy.array([self.xyz[0] / norm, self.xyz[1] / norm, self.xyz[1]])
 
+    @metrics.timed("simulate.scalar")
     def as_though(self, condition, anomalise=False, _hex=False):
         """Return the colour as though the condition."""
         # first check something
@@ -262,7 +342,7 @@ class Colourblind():
                 n = v + 1
                 z = (v * z + self.rgb) / n
 
-            z = numpy.round_(z).astype(numpy.int32)
+            z = numpy.round(z).astype(numpy.int32)
 
             if _hex:
                 return "#{:02x}{:02x}{:02x}".format(z[0], z[1], z[2])
@@ -320,7 +400,7 @@ class Colourblind():
             n = v + 1
             new_rgb = (v * new_rgb + self.rgb) / n
 
-        new_rgb = numpy.round_(new_rgb).astype(numpy.int32)
+        new_rgb = numpy.round(new_rgb).astype(numpy.int32)
 
         if _hex:
             return "#{:02x}{:02x}{:02x}".format(*new_rgb)
@@ -328,17 +408,271 @@ class Colourblind():
             return new_rgb
 
 
+_srgb_xyz_matrix = numpy.linalg.inv(_xyz_srgb_matrix)
+
+
+@functools.lru_cache(maxsize=None)
+def adaptation_matrix(source, destination, method="bradford"):
+    """Return the matrix adapting XYZ colours under the source illuminant to look the same under the destination.
+
+    The method is one of bradford, cat02, von kries or xyz scaling. Each matrix is only worked out once, so
+    the returned array is shared (and read only).
+    """
+    cones = _cone_responses[method]
+    source_white = numpy.array(_balances[source])
+    destination_white = numpy.array(_balances[destination])
+
+    # no adaptation is needed at all (and skipping it keeps the sRGB white exact)
+    if source == destination:
+        matrix = numpy.eye(3)
+    else:
+        matrix = numpy.linalg.inv(cones) @ numpy.diag((cones @ destination_white) / (cones @ source_white)) @ cones
+
+    matrix.flags.writeable = False
+    return matrix
+
+
+@functools.lru_cache(maxsize=None)
+def _xyz_to_linear_matrix(illuminant, method):
+    """Return the matrix taking XYZ (under the illuminant) to linear sRGB."""
+    matrix = _xyz_srgb_matrix @ adaptation_matrix(illuminant, _srgb_white, method)
+    matrix.flags.writeable = False
+    return matrix
+
+
+@functools.lru_cache(maxsize=None)
+def _lab_to_linear_matrix(illuminant, method):
+    """Return the matrix taking XYZ relative to the illuminant's white (Lab before its f) to linear sRGB."""
+    matrix = _xyz_to_linear_matrix(illuminant, method) @ numpy.diag(numpy.array(_balances[illuminant]) / 100)
+    matrix.flags.writeable = False
+    return matrix
+
+
+@functools.lru_cache(maxsize=None)
+def _linear_to_lab_matrix(illuminant, method):
+    """Return the matrix taking linear sRGB to XYZ relative to the illuminant's white (Lab before its f)."""
+    matrix = (numpy.diag(100 / numpy.array(_balances[illuminant]))
+              @ adaptation_matrix(_srgb_white, illuminant, method) @ _srgb_xyz_matrix)
+    matrix.flags.writeable = False
+    return matrix
+
+
+_grey_weights = numpy.array([0.212656, 0.715158, 0.072186])
+
+# the viewing conditions, keyed by name, as the (condition, anomalise) arguments for simulating them
+_conditions = {"normal": ("normal", False),
+               "greyscale": ("achroma", False),
+               "deuteranomaly": ("deutan", True),
+               "deuteranopia": ("deutan", False),
+               "protanomaly": ("protan", True),
+               "protanopia": ("protan", False),
+               "tritanomaly": ("tritan", True),
+               "tritanopia": ("tritan", False)}
+
+
+def _RGB_to_linear(RGB):
+    """Convert RGB (0-255) to linear rgb."""
+    RGB = numpy.asarray(RGB, dtype=float) / 255
+    return numpy.where(RGB > 0.04045, ((RGB + 0.055) / 1.055)**2.4, RGB / 12.92)
+
+
+def _linear_to_RGB(rgb):
+    """Convert linear rgb to (unrounded) RGB, clipped to 0-255."""
+    rgb = numpy.clip(rgb, 0, 1)
+    return 255 * numpy.where(rgb <= 0.0031308, 12.92 * rgb, 1.055 * rgb**(1/2.4) - 0.055)
+
+
+@metrics.timed("convert.lab_to_linear")
+def lab_to_linear(lab, illuminant="D65", adaptation="bradford"):
+    """Convert CIELab colours (shape (..., 3)) into (unclipped) linear rgb, vectorised.
+
+    The Lab colours are relative to the white of the illuminant, and are adapted to sRGB's own (D65) white
+    with the given method of chromatic adaptation.
+    """
+    lab = numpy.asarray(lab, dtype=float)
+
+    # this is the vectorised version of Colour._f_prime
+    delta = 6 / 29
+    t = numpy.stack([(lab[..., 0] + 16) / 116 + lab[..., 1] / 500,
+                     (lab[..., 0] + 16) / 116,
+                     (lab[..., 0] + 16) / 116 - lab[..., 2] / 200], axis=-1)
+    xyz = numpy.where(t > delta, t**3, 3 * delta**2 * (t - 4 / 29))
+
+    # the white point scaling and the adaptation are all folded into the one matrix
+    return xyz @ _lab_to_linear_matrix(illuminant, adaptation).T
+
+
+def lab_to_rgb(lab, illuminant="D65", adaptation="bradford"):
+    """Convert CIELab colours into RGB (0-255, clipped but not rounded), vectorised."""
+    return _linear_to_RGB(lab_to_linear(lab, illuminant, adaptation))
+
+
+def in_gamut(lab, illuminant="D65", tolerance=1e-6, adaptation="bradford"):
+    """Return whether each CIELab colour can be shown in sRGB without clipping."""
+    rgb = lab_to_linear(lab, illuminant, adaptation)
+    return ((rgb >= -tolerance) & (rgb <= 1 + tolerance)).all(axis=-1)
+
+
+def hcl_to_lab(hue, chroma, light):
+    """Convert hue (degrees), chroma and lightness arrays into CIELab colours."""
+    hue = numpy.radians(hue)
+    return numpy.stack(numpy.broadcast_arrays(light, chroma * numpy.cos(hue), chroma * numpy.sin(hue)), axis=-1)
+
+
+@metrics.timed("convert.rgb_to_lab")
+def rgb_to_lab(rgb, illuminant="D65", adaptation="bradford"):
+    """Convert RGB colours (0-255, shape (..., 3)) into CIELab (relative to the illuminant), vectorised."""
+    # go through linear rgb to XYZ, adapted to the illuminant and normalised by its white point
+    xyz = _RGB_to_linear(rgb) @ _linear_to_lab_matrix(illuminant, adaptation).T
+
+    # this is the forward version of Colour._f_prime
+    delta = 6 / 29
+    f = numpy.where(xyz > delta**3, numpy.cbrt(xyz), xyz / (3 * delta**2) + 4 / 29)
+
+    return numpy.stack([116 * f[..., 1] - 16,
+                        500 * (f[..., 0] - f[..., 1]),
+                        200 * (f[..., 1] - f[..., 2])], axis=-1)
+
+
+def _rgb_to_hex(rgb):
+    """Convert an (n, 3) array of RGB values (0-255) into a list of hex codes."""
+    return ["#{:02x}{:02x}{:02x}".format(*colour) for colour in numpy.asarray(rgb).astype(int).tolist()]
+
+
+def _hex_to_rgb(codes):
+    """Convert a list of hex codes (with or without the #) into an (n, 3) array of RGB values."""
+    codes = [code.strip().lstrip("#") for code in codes]
+    if any(len(code) != 6 for code in codes):
+        raise ValueError("hex codes should have six digits")
+
+    return numpy.array([(int(code[0:2], 16), int(code[2:4], 16), int(code[4:6], 16)) for code in codes],
+                       dtype=numpy.int32).reshape(-1, 3)
+
+
+@metrics.timed("simulate")
+def simulate(rgb, condition, anomalise=False):
+    """Return the RGB colours (0-255, any shape ending in 3) as though viewed with the condition.
+
+    This is the vectorised equivalent of Colourblind(rgb, linear=False).as_though(condition, anomalise), so
+    whole palettes (or images) can be simulated in one go.
+    """
+    rgb = numpy.asarray(rgb, dtype=float)
+    if rgb.ndim == 1:
+        return simulate(rgb[None], condition, anomalise)[0]
+    metrics.count("simulate.colours", rgb.size // 3)
+
+    if condition == "normal":
+        return numpy.round(rgb).astype(numpy.int32)
+
+    if condition == "achroma":  # this one is special as it's the lack of colour
+        # make the grey point
+        z = numpy.repeat((rgb @ _grey_weights)[..., None], 3, axis=-1)
+        if anomalise:
+            v = 1.75
+            n = v + 1
+            z = (v * z + rgb) / n
+
+        return numpy.round(z).astype(numpy.int32)
+
+    # get the style of colour blindness
+    style = _blindness_type[condition]
+
+    # go through to xyY
+    xyz = _RGB_to_linear(rgb) @ _srgb_xyz_matrix.T
+    norm = xyz.sum(axis=-1)
+    black = norm == 0
+    norm[black] = 1
+    x = numpy.where(black, 0, xyz[..., 0] / norm)
+    y = numpy.where(black, 0, xyz[..., 1] / norm)
+    Y = xyz[..., 1]
+
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        # find the confusion line and where it meets the colour axis of the blindness type
+        confuse_slope = (y - style["y"]) / (x - style["x"])
+        y_int = y - x * confuse_slope
+        dx = (style["yi"] - y_int) / (confuse_slope - style["m"])
+        dy = (confuse_slope * dx) + y_int
+
+        # the simulated colours in XYZ (black can land on a degenerate confusion line, but stays black)
+        z = Y[..., None] * numpy.stack([dx / dy, numpy.ones(dx.shape), (1 - (dx + dy)) / dy], axis=-1)
+        z[Y == 0] = 0
+
+        # and the distance from the neutral grey
+        dX = 0.312713 * Y / 0.329016 - z[..., 0]
+        dZ = 0.358271 * Y / 0.329016 - z[..., 2]
+
+        distance = numpy.stack([dX, numpy.zeros(dX.shape), dZ], axis=-1) @ _xyz_srgb_matrix.T
+        new_rgb = z @ _xyz_srgb_matrix.T
+
+        # shift the colours back into gamut along the distance to the grey
+        ratio = ((new_rgb >= 0) - new_rgb) / distance
+        ratio[(ratio < 0) | (ratio > 1)] = 0
+        new_rgb += ratio.max(axis=-1)[..., None] * distance
+
+        # and apply the companding
+        new_rgb[new_rgb < 0] = 0
+        new_rgb[new_rgb > 1] = 1
+        new_rgb = 255 * new_rgb**(1/2.2)
+
+    if anomalise:
+        v = 1.75
+        n = v + 1
+        new_rgb = (v * new_rgb + rgb) / n
+
+    return numpy.round(new_rgb).astype(numpy.int32)
+
+
+def _distinct_colours(image):
+    """Return the distinct colours in an RGB image, and the index of each pixel's colour in them.
+
+    The channels are packed 8 bits each, so they need to be whole numbers from 0 to 255: uint8, or another
+    integer type with values in that range.
+    """
+    image = numpy.asarray(image)
+    if image.dtype != numpy.uint8:
+        if image.dtype.kind not in "iu" or (image.size and (image.min() < 0 or image.max() > 255)):
+            raise ValueError("expected an image with 8-bit channels (whole numbers 0-255), got {} values".format(
+                image.dtype))
+    flat = image.reshape(-1, 3).astype(numpy.uint32)
+
+    # pack the colours into single integers so we can find the distinct ones quickly
+    packed = (flat[:, 0] << 16) | (flat[:, 1] << 8) | flat[:, 2]
+    unique, inverse = numpy.unique(packed, return_inverse=True)
+
+    return numpy.stack([unique >> 16, (unique >> 8) & 255, unique & 255], axis=-1), inverse
+
+
+def simulate_image(image, condition, anomalise=False):
+    """Return an RGB image (0-255, shape (..., 3)) as though viewed with the condition.
+
+    Images tend to be made up of far fewer colours than pixels, so each distinct colour is only simulated once.
+    """
+    image = numpy.asarray(image)
+    unique, inverse = _distinct_colours(image)
+    return simulate(unique, condition, anomalise).astype(image.dtype)[inverse].reshape(image.shape)
+
+
+def simulate_image_all(image):
+    """Return the image as though viewed with each of the named conditions, keyed by name."""
+    image = numpy.asarray(image)
+    unique, inverse = _distinct_colours(image)
+    return {name: simulate(unique, *condition).astype(image.dtype)[inverse].reshape(image.shape)
+            for name, condition in _conditions.items()}
+
+
 class Colour():
     """The colour object."""
 
-    def __init__(self, value, illuminant='D65'):
+    @metrics.timed("convert.colour")
+    def __init__(self, value, illuminant='D65', adaptation="bradford"):
         self.L = value[0]
         self.a = value[1]
         self.b = value[2]
 
-        # we should get the appropriate white balance transformation
+        # we should get the appropriate white balance transformation (the matrices are shared between colours)
+        self.illuminant = illuminant
         self.xyz_norm = _balances[illuminant]
-        self.xyz_matrix = _xyz_srgb_matrix
+        self.xyz_matrix = _xyz_to_linear_matrix(illuminant, adaptation)
 
         # perform the in-situ conversion between the colours
         self.xyz = self._to_xyz()
@@ -350,7 +684,7 @@ class Colour():
 
     def _get_hex(self):
         """Get the hex code for Colour."""
-        r, g, b = self.rgb.astype(numpy.int)
+        r, g, b = self.rgb.astype(int)
         return "#{0:02x}{1:02x}{2:02x}".format(r, g, b)  # strip off the hex garbage
 
     def _f_prime(self, t):
@@ -381,7 +715,7 @@ class Colour():
         # and clip the values
         RGB[RGB >= 1] = 1
         RGB[RGB <= 0] = 0
-        return numpy.round_(RGB * 255).astype(numpy.int32)
+        return numpy.round(RGB * 255).astype(numpy.int32)
 
     def _to_xyz(self):
         """Return the XYZ representation of the colour."""
@@ -399,20 +733,58 @@ class Colour():
 class ColourScheme():
     """A collection of perceptually uniformly spaced colours within a given range."""
 
-    def __init__(self, n):
-        """Generate a colour scheme of n colours."""
+    def __init__(self, n, generate=True, seed=None, dtype=numpy.float64):
+        """Generate a colour scheme of n colours (or leave it empty until reroll if not generate).
+
+        The dtype is what the points are spread in.
+        """
         self.size = n
+        self.dtype = dtype
 
         self.hue_limit = [0, 2*numpy.pi]
         self.chroma_limit = [0, 100]
         self.light_limit = [0, 100]
 
-        self.colours = self._find_colours()
+        self.points = None  # the spread points behind the colours, kept so we can warm start from them
+        self.seed = seed  # the seed behind the current colours, so they can always be reproduced
+        self.colours = []
+        if generate:
+            self.reroll(seed=seed)
+
+    def reroll(self, cancel=None, seed=None):
+        """Regenerate the colours, returning False if cancelled before they were found.
+
+        Without a seed a new one is drawn from the global random state.
+        """
+        if seed is None:
+            seed = numpy.random.randint(2**31)
+
+        colours = self._find_colours(cancel, seed)
+        if colours is None:
+            return False
 
-    def reroll(self):
-        """Regenerate the colours."""
-        self.colours = self._find_colours()
+        self.colours = colours
+        self.seed = seed
+        metrics.count("scheme.generated")
         # self.show()
+        return True
+
+    def respread(self, times=20, dt=1):
+        """Continue spreading the current points for a few steps and remap them inside the current limits."""
+        if self.points is None:
+            return self.reroll()
+
+        self.points.spread(times, dt)
+        self.colours = self._to_colours(self.points)
+
+        return True
+
+    def reorder(self, order):
+        """Put the colours (and the points behind them) into the given order."""
+        self.colours = [self.colours[i] for i in order]
+        if self.points is not None:
+            self.points.points[:] = self.points.points[order]
+            self.points.fixed[:] = self.points.fixed[order]
 
     def set_chroma_limit(self, a, b):
         """Set the limits on the chroma scale."""
@@ -432,6 +804,15 @@ class ColourScheme():
 
         self.light_limit = [a, b]
 
+    def set_limits(self, hue=None, chroma=None, light=None):
+        """Set any of the hue (degrees), chroma and light limits from (low, high) pairs."""
+        if hue is not None:
+            self.set_hue_limit(*hue)
+        if chroma is not None:
+            self.set_chroma_limit(*chroma)
+        if light is not None:
+            self.set_light_limit(*light)
+
     def _hcl_lab_limits(self):
         """Generate the limits of Lab given the HCL limitations."""
         # first find the limits for a
@@ -498,14 +879,49 @@ class ColourScheme():
 
         return a_min, a_max, b_min, b_max
 
-    def _find_colours(self):
-        """Find the colours in perceptually uniform space."""
-        # first we should make a set of points
+    def get_limits(self):
+        """Return the hue (degrees), chroma and light limits as (low, high) pairs."""
+        return (tuple(float(limit * 180 / numpy.pi) for limit in self.hue_limit),
+                tuple(self.chroma_limit), tuple(self.light_limit))
+
+    @classmethod
+    def from_lab(cls, lab, limits, seed=None, positions=None, fixed=0):
+        """Rebuild a scheme from its Lab colours and limits without generating anything.
+
+        The positions (and which of them is fixed) of the spread points can be given too, so the scheme can
+        be respread from where it left off.
+        """
+        scheme = cls(len(lab), generate=False, seed=seed)
+        scheme.set_limits(*limits)
+        scheme.colours = [Colour(value) for value in numpy.asarray(lab, dtype=float)]
+
+        if positions is not None:
+            scheme.points = scheme._make_points(seed=0)  # (overwritten straight away)
+            scheme.points.points[:] = positions
+            scheme.points.fixed[:] = numpy.arange(len(lab)) == fixed
+
+        return scheme
+
+    def _make_points(self, seed=None):
+        """Make the set of points to spread."""
         # the dimension and force should be tweaked to make sure we're getting some nice
         # separation of the values
-        points = Points(self.size, periodic=True, dim=8, force=20)
-        points.spread(200)  # and spread them throughout the space
+        return Points(self.size, periodic=True, dim=8, force=20, seed=seed, dtype=self.dtype)
+
+    @metrics.timed("scheme.find_colours")
+    def _find_colours(self, cancel=None, seed=None):
+        """Find the colours in perceptually uniform space (None if cancelled)."""
+        # first we should make a set of points
+        points = self._make_points(seed)
+        if not points.spread(200, cancel=cancel):  # and spread them throughout the space
+            return None
+
+        self.points = points
+        return self._to_colours(points)
 
+    @metrics.timed("scheme.to_colours")
+    def _to_colours(self, points):
+        """Convert the spread points into colours within the current limits."""
         # convert those into CIELab values
         # make sure we consider the contraints in the ranges
         a_min, a_max, b_min, b_max = self._hcl_lab_limits()
@@ -525,6 +941,9 @@ class ColourScheme():
 
     def show(self, x_offset=1.5, y_offset=2, ncol=5):
         """Show the colour scheme."""
+        import matplotlib.patches
+        import matplotlib.pyplot
+
         figure = matplotlib.pyplot.figure()
 
         ax = figure.add_subplot(1, 1, 1, aspect='equal')
@@ -544,9 +963,163 @@ class ColourScheme():
         matplotlib.pyplot.show()
 
 
-if __name__ == "__main__":
+# these are the preset limits, keyed by their name
+# the value is a 3-tuple of 2-tuples corresponding to ((h_low, h_high), (c_low, c_high), (l_low, l_high))
+_presets = {"All": ((0, 360), (0, 100), (0, 100)),
+            "Colourblind Friendly": ((0, 360), (40, 70), (15, 85))}
+
+_spec_keys = ("n", "preset", "hue", "chroma", "light", "seed")
 
-    # _visualise_movement()
-    points = Points(20, periodic=True)
-    for i in range(200):
-        points._move()
+
+def _resolve_spec(spec, defaults=None):
+    """Fill in a palette specification from the defaults and its preset, checking it makes sense."""
+    # anything missing falls back to the defaults
+    resolved = dict(defaults or {})
+    resolved.update({key: value for key, value in spec.items() if value is not None})
+
+    unknown = set(resolved) - set(_spec_keys)
+    if unknown:
+        raise ValueError("unknown palette option(s): {}".format(", ".join(sorted(unknown))))
+    if "n" not in resolved or int(resolved["n"]) < 1:
+        raise ValueError("a palette needs a positive number of colours (n)")
+    if resolved.get("preset", "All") not in _presets:
+        raise ValueError("unknown preset {!r}, choose from {}".format(resolved["preset"], ", ".join(_presets)))
+
+    # any limits that aren't given explicitly come from the preset
+    preset = _presets[resolved.get("preset", "All")]
+    for key, limits in zip(("hue", "chroma", "light"), preset):
+        low, high = resolved.get(key) or limits
+        if low > high:
+            raise ValueError("the {} limits should be (low, high), got ({}, {})".format(key, low, high))
+        resolved[key] = [low, high]
+
+    resolved["n"] = int(resolved["n"])
+    resolved.setdefault("preset", None)
+    resolved.setdefault("seed", None)
+    return resolved
+
+
+def generate(spec):
+    """Generate a ColourScheme from a palette specification.
+
+    The specification is a dict with n, and optionally a preset name, hue/chroma/light limits as (low, high)
+    pairs (hue in degrees) and a seed. Explicit limits override the preset.
+    """
+    spec = _resolve_spec(spec)
+
+    scheme = ColourScheme(spec["n"], generate=False)
+    scheme.set_limits(spec["hue"], spec["chroma"], spec["light"])
+    scheme.reroll(seed=spec["seed"])
+
+    return scheme
+
+
+def _generate_record(spec):
+    """Generate the palette for a resolved specification as a plain record (run in the worker processes)."""
+    # each worker only generates one palette at a time, so the metrics are just for this one
+    metrics.reset()
+    scheme = generate(spec)
+
+    record = dict(spec)
+    record["seed"] = scheme.seed
+    record["colours"] = [colour.hex for colour in scheme.colours]
+    if metrics.is_enabled():
+        record["metrics"] = metrics.snapshot()
+    return record
+
+
+def _fill_seeds(specs, entropy=None):
+    """Give every specification without a seed one of its own, lazily.
+
+    The seeds are drawn here rather than left to the workers, which all start from the same (forked) random
+    state and so would draw the same ones.
+    """
+    random = numpy.random.default_rng(entropy)
+    for spec in specs:
+        if spec["seed"] is None:
+            spec = dict(spec, seed=int(random.integers(2**31)))
+        yield spec
+
+
+def _read_specs(infile, defaults):
+    """Read palette specifications (one JSON object per line) from a file, lazily."""
+    for line_number, line in enumerate(infile, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+
+        try:
+            yield _resolve_spec(json.loads(line), defaults)
+        except ValueError as error:  # json errors are ValueErrors too
+            raise ValueError("line {} of {}: {}".format(line_number, infile.name, error))
+
+
+def _write_records(records, outfile, output_format):
+    """Write the records out as they arrive."""
+    if output_format == "jsonl":
+        for record in records:
+            outfile.write(json.dumps(record) + "\n")
+        return
+
+    writer = csv.writer(outfile)
+    writer.writerow(["n", "preset", "hue_low", "hue_high", "chroma_low", "chroma_high",
+                     "light_low", "light_high", "seed", "colours"])
+    for record in records:
+        writer.writerow([record["n"], record["preset"] or ""] + record["hue"] + record["chroma"]
+                        + record["light"] + [record["seed"], " ".join(record["colours"])])
+
+
+def main(argv=None):
+    """Generate palettes from the command line, without any need for a display."""
+    parser = argparse.ArgumentParser(prog="python -m colours",
+                                     description="Generate perceptually uniformly spaced colour palettes.")
+    parser.add_argument("-n", "--number", type=int, dest="n", help="number of colours in each palette")
+    parser.add_argument("--preset", choices=list(_presets), help="preset limits to start from")
+    parser.add_argument("--hue", type=float, nargs=2, metavar=("LOW", "HIGH"), help="hue limits (degrees)")
+    parser.add_argument("--chroma", type=float, nargs=2, metavar=("LOW", "HIGH"), help="chroma limits")
+    parser.add_argument("--light", type=float, nargs=2, metavar=("LOW", "HIGH"), help="lightness limits")
+    parser.add_argument("--seed", type=int, help="seed for the first palette (later ones count up from it)")
+    parser.add_argument("--count", type=int, default=1, help="number of palettes to generate from the options")
+    parser.add_argument("--batch", type=argparse.FileType("r"),
+                        help="file of palette specifications, one JSON object per line ('-' for stdin), "
+                             "using the other options as defaults")
+    parser.add_argument("--format", choices=("jsonl", "csv"), default="jsonl", help="output format")
+    parser.add_argument("-o", "--output", type=argparse.FileType("w"), default=sys.stdout, help="output file")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="number of worker processes")
+    parser.add_argument("--metrics", action="store_true",
+                        help="add the time spent in each phase and the step counts to each palette (jsonl only)")
+    args = parser.parse_args(argv)
+
+    if args.metrics:
+        metrics.enable()
+
+    defaults = {key: value for key, value in vars(args).items() if key in _spec_keys and value is not None}
+
+    if args.batch is not None:
+        specs = _read_specs(args.batch, defaults)
+    else:
+        try:
+            spec = _resolve_spec(defaults)
+        except ValueError as error:
+            parser.error(str(error))
+
+        # give every palette its own seed so the whole run can be reproduced
+        seeds = [None] * args.count if args.seed is None else range(args.seed, args.seed + args.count)
+        specs = (dict(spec, seed=seed) for seed in seeds)
+
+    specs = _fill_seeds(specs)
+    try:
+        if args.jobs == 1:
+            _write_records(map(_generate_record, specs), args.output, args.format)
+        else:
+            with multiprocessing.Pool(args.jobs, initializer=metrics.enable, initargs=(args.metrics,)) as pool:
+                _write_records(pool.imap(_generate_record, specs, chunksize=8), args.output, args.format)
+    except ValueError as error:
+        print("{}: error: {}".format(parser.prog, error), file=sys.stderr)
+        return 2
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,228 @@
+"""
+Write palettes out in the formats other tools read them in.
+
+The text formats are hex codes, RGB triples, gnuplot line styles, a Python list, CSS custom properties, a
+matplotlib style (setting the colour cycle) and JSON, and there's .npy for numpy. Palettes are (n, 3) arrays
+of RGB values (0-255), and every colour of a palette is encoded at once by building the bytes of the output
+with numpy rather than formatting the colours one by one. Big palettes (like lookup tables) are written a
+chunk at a time, and batches of palettes are streamed straight to the file one after another.
+
+    export.save(export.from_scheme(scheme), "palette.css")
+    export.encode(rgb, "gnuplot").decode()
+
+usage: python export.py PALETTES.jsonl [-o OUTPUT] [--format css]
+(the palettes are JSON lines with a "colours" list of hex codes, as written by python -m colours)
+"""
+import argparse
+import colours
+import io
+import json
+import numpy
+import os
+import string
+import sys
+
+# each text format is (header, template for a colour, separator between colours, end of the last colour,
+# footer), where the template can use the fields r, g and b (0-255), hex (without the #) and index (counting
+# from 1), and the end (finishing the last colour's line) is left out when there are no colours
+_formats = {"hex": ("", "#{hex}", "\n", "\n", ""),
+            "rgb": ("", "({r}, {g}, {b})", "\n", "\n", ""),
+            "gnuplot": ("", "set style line {index} lc \"#{hex}\"", "\n", "\n", ""),
+            "python": ("[", "'#{hex}'", ",\n", "", "]\n"),
+            "css": (":root {\n", "  --colour-{index}: #{hex};", "\n", "\n", "}\n"),
+            # a # starts a comment in a style file, so the colours go without
+            "mplstyle": ("axes.prop_cycle: cycler('color', [", "'{hex}'", ", ", "", "])\n"),
+            "json": ("[", "\"#{hex}\"", ", ", "", "]\n")}
+
+formats = tuple(_formats) + ("npy",)
+
+# the format to use for each file extension, when it isn't given
+_extensions = {".txt": "hex",
+               ".hex": "hex",
+               ".gp": "gnuplot",
+               ".gnuplot": "gnuplot",
+               ".py": "python",
+               ".css": "css",
+               ".mplstyle": "mplstyle",
+               ".json": "json",
+               ".npy": "npy"}
+
+_hex_digits = numpy.frombuffer(b"0123456789abcdef", dtype=numpy.uint8)
+
+
+def as_rgb(rgb):
+    """Return the colours as an (n, 3) array of whole RGB values (0-255)."""
+    return numpy.round(numpy.clip(numpy.asarray(rgb, dtype=float), 0, 255)).astype(numpy.uint8).reshape(-1, 3)
+
+
+def from_scheme(scheme):
+    """Return the colours of a ColourScheme as an (n, 3) array of RGB values."""
+    return as_rgb([colour.rgb for colour in scheme.colours])
+
+
+def _literal(text, n):
+    """Return the text repeated for n rows, as an (n, width) array of bytes and which of them to keep."""
+    data = numpy.frombuffer(text.encode(), dtype=numpy.uint8)
+    return numpy.broadcast_to(data, (n, data.size)), numpy.ones((n, data.size), dtype=bool)
+
+
+def _decimal(values):
+    """Return the digits of whole (non-negative) numbers as an (n, width) array of bytes and which to keep."""
+    values = numpy.asarray(values, dtype=numpy.int64)[:, None]
+    width = len(str(int(values.max()))) if values.size else 1
+    powers = 10**numpy.arange(width - 1, -1, -1, dtype=numpy.int64)
+
+    # every number gets the same width of digits, and the leading zeros are dropped (apart from the units)
+    digits = (values // powers % 10 + ord("0")).astype(numpy.uint8)
+    return digits, (values >= powers) | (powers == 1)
+
+
+# the digits of every channel value, looked up rather than worked out each time
+_channel_digits, _channel_keep = _decimal(numpy.arange(256))
+
+
+def _hexadecimal(rgb):
+    """Return the hex codes (without the #) of the colours as an (n, 6) array of bytes and which to keep."""
+    digits = _hex_digits[numpy.stack([rgb >> 4, rgb & 15], axis=-1).reshape(-1, 6)]
+    return digits, numpy.ones(digits.shape, dtype=bool)
+
+
+def _field(name, rgb, start):
+    """Return the bytes of a template field for the colours (the first being number start in the palette)."""
+    if name in ("r", "g", "b"):
+        channel = rgb[:, "rgb".index(name)]
+        return _channel_digits[channel], _channel_keep[channel]
+    if name == "hex":
+        return _hexadecimal(rgb)
+    if name == "index":
+        return _decimal(numpy.arange(start + 1, start + len(rgb) + 1))
+
+    raise ValueError("unknown field {!r} in an export template".format(name))
+
+
+def _encode_rows(rgb, template, start=0):
+    """Encode every colour with the template, returning all of them as one lump of bytes."""
+    columns = []
+    for literal, name, _, _ in string.Formatter().parse(template):
+        if literal:
+            columns.append(_literal(literal, len(rgb)))
+        if name is not None:
+            columns.append(_field(name, rgb, start))
+
+    # lay the rows out side by side and keep only the bytes that are wanted, which reads them out row by row
+    data = numpy.concatenate([data for data, _ in columns], axis=1)
+    keep = numpy.concatenate([keep for _, keep in columns], axis=1)
+    return data[keep].tobytes()
+
+
+def _check_format(output_format):
+    if output_format not in formats:
+        raise ValueError("unknown export format {!r}, choose from {}".format(output_format, ", ".join(formats)))
+
+
+def write(rgb, outfile, output_format="hex", chunk_size=65536):
+    """Write a palette to a (binary) file, encoding chunk_size colours at a time."""
+    _check_format(output_format)
+    rgb = as_rgb(rgb)
+    if output_format == "npy":
+        numpy.save(outfile, rgb)
+        return
+
+    header, template, separator, end, footer = _formats[output_format]
+    outfile.write(header.encode())
+    for start in range(0, len(rgb), chunk_size):
+        chunk = _encode_rows(rgb[start:start + chunk_size], template + separator, start)
+        # the last colour gets the end instead of a separator
+        if start + chunk_size >= len(rgb):
+            chunk = chunk[:len(chunk) - len(separator.encode())] + end.encode()
+        outfile.write(chunk)
+    outfile.write(footer.encode())
+
+
+def write_batch(palettes, outfile, output_format="hex", chunk_size=65536):
+    """Write palettes to a (binary) file as they arrive, returning how many were written.
+
+    The text formats put each palette after the last (a line each for JSON, otherwise separated by a blank
+    line). For .npy the palettes are stacked into one array, so they all need the same number of colours.
+    """
+    _check_format(output_format)
+    if output_format == "npy":
+        palettes = [as_rgb(rgb) for rgb in palettes]
+        if len(set(len(rgb) for rgb in palettes)) > 1:
+            raise ValueError("the palettes need the same number of colours to be saved together as .npy")
+        numpy.save(outfile, numpy.stack(palettes) if palettes else numpy.empty((0, 0, 3), dtype=numpy.uint8))
+        return len(palettes)
+
+    count = 0
+    for count, rgb in enumerate(palettes, 1):
+        if count > 1 and output_format != "json":
+            outfile.write(b"\n")
+        write(rgb, outfile, output_format, chunk_size)
+
+    return count
+
+
+def encode(rgb, output_format="hex"):
+    """Return a palette encoded in the format, as bytes."""
+    if output_format == "npy":
+        raise ValueError("npy is a binary format, write it to a file instead")
+
+    buffer = io.BytesIO()
+    write(rgb, buffer, output_format)
+    return buffer.getvalue()
+
+
+def guess_format(path, default="hex"):
+    """Return the format that goes with the extension of the path."""
+    return _extensions.get(os.path.splitext(path)[1].lower(), default)
+
+
+def save(rgb, path, output_format=None):
+    """Save a palette to a file, in the format given or the one that goes with its extension."""
+    output_format = output_format or guess_format(path)
+    with open(path, "wb") as outfile:
+        write(rgb, outfile, output_format)
+
+
+def _read_palettes(infile):
+    """Read palettes from JSON lines with a list of hex codes under "colours", lazily."""
+    for line_number, line in enumerate(infile, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+
+        try:
+            record = json.loads(line)
+            if not isinstance(record, dict) or "colours" not in record:
+                raise ValueError("expected a palette with a list of hex codes under \"colours\"")
+            rgb = colours._hex_to_rgb(record["colours"])
+        except (ValueError, AttributeError, TypeError) as error:  # json errors are ValueErrors too
+            raise ValueError("line {} of {}: {}".format(line_number, infile.name, error))
+
+        yield rgb
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export palettes for use in other tools.")
+    parser.add_argument("palettes", type=argparse.FileType("r"),
+                        help="JSON lines with a list of hex codes under \"colours\" ('-' for stdin)")
+    parser.add_argument("-o", "--output", help="file to write to (standard output if not given)")
+    parser.add_argument("--format", choices=formats, help="output format (from the extension if not given)")
+    args = parser.parse_args(argv)
+
+    output_format = args.format or (guess_format(args.output) if args.output else "hex")
+    try:
+        if args.output is None:
+            write_batch(_read_palettes(args.palettes), sys.stdout.buffer, output_format)
+        else:
+            with open(args.output, "wb") as outfile:
+                write_batch(_read_palettes(args.palettes), outfile, output_format)
+    except (OSError, ValueError) as error:
+        print("{}: error: {}".format(parser.prog, error), file=sys.stderr)
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""
+Keep a bounded history of colour schemes that can be stepped back and forth through.
+
+Each scheme is stored compactly as its Lab colours, its limits and seed, and the positions of the spread points
+behind it (so it can still be respread), in a ring buffer that drops the oldest schemes once it's full.
+Stepping back or forward rebuilds the scheme from those, without spreading anything again.
+
+    schemes = history.SchemeHistory(capacity=50)
+    schemes.push(scheme)
+    scheme = schemes.undo()  # None if there's nothing to go back to
+"""
+import collections
+import colours
+import numpy
+
+# a compact record of a scheme, the arrays are (n, 3) and positions is None if there were no points
+Entry = collections.namedtuple("Entry", ["lab", "limits", "seed", "positions", "fixed"])
+
+
+def snapshot(scheme):
+    """Return a compact record of the scheme."""
+    lab = numpy.array([colour.lab for colour in scheme.colours], dtype=float).reshape(-1, 3)
+    positions, fixed = None, 0
+    if scheme.points is not None:
+        # the points only need to be close enough to carry on spreading from
+        positions = scheme.points.points.astype(numpy.float32)
+        fixed = int(numpy.argmax(scheme.points.fixed))
+
+    return Entry(lab, scheme.get_limits(), scheme.seed, positions, fixed)
+
+
+def restore(entry):
+    """Rebuild the scheme from its record."""
+    return colours.ColourScheme.from_lab(entry.lab, entry.limits, entry.seed, entry.positions, entry.fixed)
+
+
+class SchemeHistory():
+    """A bounded undo/redo history of colour schemes."""
+
+    def __init__(self, capacity=100):
+        self.capacity = capacity
+        self._entries = collections.deque(maxlen=capacity)
+        self._position = -1  # the index of the current scheme
+
+    def __len__(self):
+        return len(self._entries)
+
+    def push(self, scheme):
+        """Record the scheme as the current one, forgetting anything that had been undone."""
+        # anything after the current position is a redo that can't happen any more
+        while len(self._entries) > self._position + 1:
+            self._entries.pop()
+
+        # the deque drops the oldest entry itself once it's full
+        self._entries.append(snapshot(scheme))
+        self._position = len(self._entries) - 1
+
+    def can_undo(self):
+        return self._position > 0
+
+    def can_redo(self):
+        return self._position < len(self._entries) - 1
+
+    def undo(self):
+        """Step back to the previous scheme, returning it (or None if there isn't one)."""
+        if not self.can_undo():
+            return None
+
+        self._position -= 1
+        return restore(self._entries[self._position])
+
+    def redo(self):
+        """Step forward to the next scheme, returning it (or None if there isn't one)."""
+        if not self.can_redo():
+            return None
+
+        self._position += 1
+        return restore(self._entries[self._position])
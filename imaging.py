@@ -0,0 +1,138 @@
+"""
+Simulate or correct (daltonise) colour deficiencies in images of any size.
+
+Images are memory-mapped from .npy files, or raw files of RGB bytes given their shape, and processed a tile at
+a time on a pool of threads, with each tile written straight out to the (also memory-mapped) output. Only a
+few tiles are ever in flight, so memory stays bounded by the tile size however large the image is.
+
+usage: python imaging.py {simulate,daltonise} INPUT OUTPUT [--condition deuteranopia] [--shape H W]
+                         [--tile 512] [--workers N]
+"""
+import argparse
+import colours
+import concurrent.futures
+import itertools
+import numpy
+import os
+import sys
+
+# how the error between the original and simulated colours is moved into channels that can be seen
+# (after Fidaner, Lin and Ozguven), the red-green conditions push it into green and blue and tritan into red
+# and green
+_error_shift = {"protan": numpy.array([[0, 0, 0], [0.7, 1, 0], [0.7, 0, 1]]),
+                "deutan": numpy.array([[0, 0, 0], [0.7, 1, 0], [0.7, 0, 1]]),
+                "tritan": numpy.array([[1, 0, 0.7], [0, 1, 0.7], [0, 0, 0]])}
+
+
+def daltonise(rgb, condition, anomalise=False):
+    """Return the RGB colours (0-255, shape (..., 3)) adjusted to be easier to tell apart with the condition."""
+    if condition not in _error_shift:
+        # there's nothing to move the error into for greyscale (or normal vision)
+        return numpy.round(numpy.asarray(rgb, dtype=float)).astype(numpy.int32)
+
+    rgb = numpy.asarray(rgb, dtype=float)
+    error = rgb - colours.simulate(rgb, condition, anomalise)
+
+    return numpy.round(numpy.clip(rgb + error @ _error_shift[condition].T, 0, 255)).astype(numpy.int32)
+
+
+def daltonise_image(image, condition, anomalise=False):
+    """Return the daltonised image, only working out each distinct colour once."""
+    image = numpy.asarray(image)
+    unique, inverse = colours._distinct_colours(image)
+    return daltonise(unique, condition, anomalise).astype(image.dtype)[inverse].reshape(image.shape)
+
+
+_operations = {"simulate": colours.simulate_image,
+               "daltonise": daltonise_image}
+
+
+def open_image(path, shape=None, dtype=numpy.uint8):
+    """Memory-map an image read only, from a .npy file or a raw file of the given (height, width, 3) shape."""
+    if shape is None:
+        image = numpy.load(path, mmap_mode="r")
+    else:
+        image = numpy.memmap(path, dtype=dtype, mode="r", shape=tuple(shape))
+
+    if image.ndim != 3 or image.shape[2] != 3:
+        raise ValueError("expected an image of shape (height, width, 3), got {}".format(image.shape))
+
+    return image
+
+
+def create_image(path, shape, dtype=numpy.uint8):
+    """Memory-map a new image for writing, as a .npy file if the path ends in .npy and raw otherwise."""
+    if path.endswith(".npy"):
+        return numpy.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=tuple(shape))
+    return numpy.memmap(path, dtype=dtype, mode="w+", shape=tuple(shape))
+
+
+def _tiles(shape, tile):
+    """Generate the (row, column) slices covering an image."""
+    for top, left in itertools.product(range(0, shape[0], tile), range(0, shape[1], tile)):
+        yield slice(top, top + tile), slice(left, left + tile)
+
+
+def process(source, destination, operation="simulate", condition="deuteranopia", tile=512, workers=None):
+    """Simulate or daltonise the source image into the destination, a tile at a time.
+
+    Both are arrays of shape (height, width, 3), usually memory-mapped (see open_image and create_image), and
+    the condition is one of the named viewing conditions. Returns the number of tiles processed.
+    """
+    if source.shape != destination.shape:
+        raise ValueError("the source {} and destination {} shapes differ".format(source.shape, destination.shape))
+    if condition not in colours._conditions:
+        raise ValueError("unknown condition {!r}, choose from {}".format(condition, ", ".join(colours._conditions)))
+
+    function = _operations[operation]
+    condition, anomalise = colours._conditions[condition]
+
+    def run(rows, columns):
+        # read the tile in, work on it, and write it straight back out
+        destination[rows, columns] = function(numpy.asarray(source[rows, columns]), condition, anomalise)
+
+    workers = workers or os.cpu_count() or 1
+    tiles = _tiles(source.shape, tile)
+    done = 0
+    with concurrent.futures.ThreadPoolExecutor(workers) as pool:
+        # keep a couple of tiles queued per worker, but no more, so memory stays bounded
+        pending = {pool.submit(run, *where) for where in itertools.islice(tiles, 2 * workers)}
+        while pending:
+            finished, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in finished:
+                future.result()  # raise anything that went wrong
+                done += 1
+            pending.update(pool.submit(run, *where) for where in itertools.islice(tiles, len(finished)))
+
+    if isinstance(destination, numpy.memmap):
+        destination.flush()
+
+    return done
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate or daltonise colour deficiencies in large images.")
+    parser.add_argument("operation", choices=list(_operations), help="what to do to the image")
+    parser.add_argument("input", help="input image, a .npy file or raw RGB bytes (see --shape)")
+    parser.add_argument("output", help="output image, written as .npy if it ends in .npy and raw otherwise")
+    parser.add_argument("--condition", choices=list(colours._conditions), default="deuteranopia",
+                        help="viewing condition to simulate or correct for")
+    parser.add_argument("--shape", type=int, nargs=2, metavar=("HEIGHT", "WIDTH"),
+                        help="size of a raw input image")
+    parser.add_argument("--tile", type=int, default=512, help="size of the tiles to work on")
+    parser.add_argument("--workers", type=int, default=None, help="number of threads to use")
+    args = parser.parse_args(argv)
+
+    try:
+        source = open_image(args.input, None if args.shape is None else args.shape + [3])
+        destination = create_image(args.output, source.shape, source.dtype)
+        process(source, destination, args.operation, args.condition, args.tile, args.workers)
+    except (OSError, ValueError) as error:
+        print("{}: error: {}".format(parser.prog, error), file=sys.stderr)
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""
+Lightweight timers and counters for seeing where the time goes when generating colours.
+
+Everything is off by default, and while it's off a timed function costs one extra check per call. Turn it
+on with enable() (or by setting SCHEMING_METRICS=1) and the timers and counters can be read back with
+snapshot() or written out with export().
+
+    @metrics.timed("points.move")
+    def _move(self, dt=1): ...
+
+    metrics.enable()
+    scheme.reroll()
+    metrics.snapshot()  # {"timers": {"points.move": {"calls": 200, "total": 0.09, ...}}, "counters": {...}}
+
+Functions decorated with timed are also registered with line_profiler when running under kernprof, so
+`kernprof -l -v` still gives line by line timings of them.
+"""
+import builtins
+import collections
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+
+_enabled = os.environ.get("SCHEMING_METRICS", "") not in ("", "0")
+_lock = threading.Lock()
+
+# the totals for each timer, as [calls, total seconds, longest call]
+_timers = collections.defaultdict(lambda: [0, 0.0, 0.0])
+_counters = collections.Counter()
+
+
+def enable(on=True):
+    """Turn the collection of metrics on (or off)."""
+    global _enabled
+    _enabled = on
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    """Forget everything collected so far."""
+    with _lock:
+        _timers.clear()
+        _counters.clear()
+
+
+def _record(name, elapsed):
+    with _lock:
+        timer = _timers[name]
+        timer[0] += 1
+        timer[1] += elapsed
+        timer[2] = max(timer[2], elapsed)
+
+
+def count(name, amount=1):
+    """Add to a counter."""
+    if _enabled:
+        with _lock:
+            _counters[name] += amount
+
+
+@contextlib.contextmanager
+def timer(name):
+    """Time a block of code under the given name."""
+    if not _enabled:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _record(name, time.perf_counter() - start)
+
+
+def timed(name):
+    """Decorate a function to be timed under the given name."""
+    def decorator(function):
+        # kernprof puts its profile into builtins, so hand it the function before we wrap it
+        profile = getattr(builtins, "profile", None)
+        if profile is not None:
+            function = profile(function)
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return function(*args, **kwargs)
+
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                _record(name, time.perf_counter() - start)
+
+        return wrapper
+
+    return decorator
+
+
+def snapshot():
+    """Return the timers and counters collected so far as a plain dict."""
+    with _lock:
+        timers = {name: {"calls": calls, "total": total, "mean": total / calls, "max": longest}
+                  for name, (calls, total, longest) in sorted(_timers.items())}
+        return {"timers": timers, "counters": dict(sorted(_counters.items()))}
+
+
+def export(path):
+    """Write a snapshot out to a JSON file."""
+    with open(path, "w") as outfile:
+        json.dump(snapshot(), outfile, indent=2)
+        outfile.write("\n")
@@ -0,0 +1,138 @@
+"""
+Find the nearest named (or approved) colours to a set of colours.
+
+A ColourIndex holds a KD-tree over a table of reference colours in CIELab, so whole schemes can be looked up
+in one batched query. The default index covers the CSS and xkcd named colours bundled in
+files/named_colours.csv, whose names and colours are cached to disk (as plain arrays, the tree is quick to
+rebuild) so the table only has to be read and converted once.
+
+    index = names.default_index()
+    index.nearest_names(rgb)  # ['teal', 'dusty rose', ...]
+
+    corporate = names.ColourIndex.from_hex(["#00205b", "#e4002b", ...])
+    snapped = corporate.snap(rgb, unique=True)
+"""
+import colours
+import csv
+import functools
+import hashlib
+import numpy
+import os
+import zipfile
+
+_table = os.path.join(os.path.dirname(os.path.abspath(__file__)), "files", "named_colours.csv")
+
+# bumped whenever what's cached (or how the colours are converted to CIELab) changes, so old caches aren't used
+_cache_version = 2
+
+
+class ColourIndex():
+    """An index of reference colours for nearest neighbour queries in CIELab."""
+
+    def __init__(self, names, rgb, lab=None):
+        import scipy.spatial
+
+        self.names = list(names)
+        self.rgb = numpy.asarray(rgb, dtype=numpy.int32).reshape(-1, 3)
+        self.lab = colours.rgb_to_lab(self.rgb) if lab is None else numpy.asarray(lab, dtype=float).reshape(-1, 3)
+        self.tree = scipy.spatial.cKDTree(self.lab)
+
+    @classmethod
+    def from_hex(cls, codes, names=None):
+        """Make an index from a list of hex codes (named by their codes unless names are given)."""
+        return cls(codes if names is None else names, colours._hex_to_rgb(codes))
+
+    def __len__(self):
+        return len(self.names)
+
+    def query(self, rgb, k=1):
+        """Return the indices of, and ΔE to, the k nearest reference colours of each RGB colour.
+
+        Both are of shape (n, k) for an (n, 3) array of colours.
+        """
+        k = min(k, len(self))
+        distances, indices = self.tree.query(colours.rgb_to_lab(numpy.asarray(rgb).reshape(-1, 3)), k=k)
+        return indices.reshape(-1, k), distances.reshape(-1, k)
+
+    def nearest_names(self, rgb):
+        """Return the name of the nearest reference colour to each RGB colour."""
+        indices, _ = self.query(rgb)
+        return [self.names[index] for index in indices[:, 0]]
+
+    def snap(self, rgb, unique=False):
+        """Return the nearest reference colour (RGB) to each of the colours.
+
+        With unique, no two colours snap to the same reference colour (so long as there are enough of them),
+        keeping the total ΔE as small as possible.
+        """
+        rgb = numpy.asarray(rgb).reshape(-1, 3)
+        if not unique or rgb.shape[0] > len(self):
+            indices, _ = self.query(rgb)
+            return self.rgb[indices[:, 0]]
+
+        import scipy.optimize
+
+        # only the nearest few reference colours of each can be part of the best assignment
+        candidates = numpy.unique(self.query(rgb, k=rgb.shape[0])[0])
+        lab = colours.rgb_to_lab(rgb)
+        cost = numpy.linalg.norm(lab[:, None] - self.lab[candidates][None], axis=-1)
+        rows, columns = scipy.optimize.linear_sum_assignment(cost)
+
+        return self.rgb[candidates[columns[numpy.argsort(rows)]]]
+
+
+def _read_table(path):
+    """Read a table of named colours (with name and hex columns)."""
+    with open(path, "r", newline="") as infile:
+        rows = list(csv.DictReader(infile))
+
+    return [row["name"] for row in rows], colours._hex_to_rgb([row["hex"] for row in rows])
+
+
+def _cache_path(path):
+    """Return where the colours of a table are cached, keyed by the contents of the table and the cache version."""
+    with open(path, "rb") as infile:
+        digest = hashlib.sha1(infile.read()).hexdigest()[:16]
+
+    cache = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache, "scheming", "{}-{}-v{}.npz".format(os.path.basename(path), digest, _cache_version))
+
+
+def _load_cache(cache_path):
+    """Return the names, RGB and CIELab colours cached at the path, or None if they can't be used."""
+    try:
+        # no pickles, so a stale or corrupt cache can only fail to load rather than run anything
+        with numpy.load(cache_path, allow_pickle=False) as cached:
+            names, rgb, lab = cached["names"], cached["rgb"], cached["lab"]
+    except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile):
+        return None
+
+    if rgb.shape != (len(names), 3) or lab.shape != (len(names), 3):
+        return None
+    return names.tolist(), rgb, lab
+
+
+def load_index(path=_table):
+    """Load the index for a table of named colours, using the cached colours if there are some."""
+    cache_path = _cache_path(path)
+    cached = _load_cache(cache_path)
+    if cached is not None:
+        return ColourIndex(*cached)
+
+    index = ColourIndex(*_read_table(path))
+
+    # not being able to cache it is no reason to fail
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(cache_path, "wb") as outfile:
+            numpy.savez(outfile, names=numpy.array(index.names, dtype=str), rgb=index.rgb, lab=index.lab)
+    except OSError:
+        pass
+
+    return index
+
+
+@functools.lru_cache(maxsize=None)
+def default_index():
+    """Return the index of the bundled CSS and xkcd named colours."""
+    return load_index()
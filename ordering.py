@@ -0,0 +1,111 @@
+"""
+Put colours into an order where neighbours are as easy as possible to tell apart.
+
+The order maximises the smallest difference (ΔE) between neighbouring colours, optionally taking the worst
+case difference across several viewing conditions. It's found with a greedy walk from a few starting colours
+followed by 2-opt moves on the weakest link, both vectorised, so it stays quick for hundreds of colours.
+
+    order = ordering.distinct_order(rgb, conditions=ordering.all_conditions)
+    scheme.reorder(order)
+"""
+import colours
+import numpy
+
+all_conditions = tuple(colours._conditions)
+
+
+def differences(rgb, conditions=("normal",)):
+    """Return the pairwise ΔE between the RGB colours, the smallest across the viewing conditions."""
+    rgb = numpy.asarray(rgb)
+    result = numpy.full((rgb.shape[0], rgb.shape[0]), numpy.inf)
+    for name in conditions:
+        lab = colours.rgb_to_lab(colours.simulate(rgb, *colours._conditions[name]))
+        numpy.minimum(result, numpy.linalg.norm(lab[:, None] - lab[None], axis=-1), out=result)
+
+    return result
+
+
+def _greedy(distances, starts):
+    """Walk from each start to the furthest unvisited colour each time, for all the starts at once."""
+    n = distances.shape[0]
+    paths = numpy.empty((len(starts), n), dtype=int)
+    paths[:, 0] = starts
+    visited = numpy.zeros((len(starts), n), dtype=bool)
+    visited[numpy.arange(len(starts)), starts] = True
+
+    for step in range(1, n):
+        candidates = numpy.where(visited, -numpy.inf, distances[paths[:, step - 1]])
+        paths[:, step] = candidates.argmax(axis=1)
+        visited[numpy.arange(len(starts)), paths[:, step]] = True
+
+    return paths
+
+
+def _links(distances, path):
+    """Return the difference across each neighbouring pair in the path."""
+    return distances[path[:-1], path[1:]]
+
+
+def _two_opt(distances, path, max_moves):
+    """Reverse sections of the path to remove its weakest link, for as long as that helps."""
+    path = path.copy()
+    n = len(path)
+    for move in range(max_moves):
+        links = _links(distances, path)
+        k = links.argmin()
+        weakest = links[k]
+
+        # reversing path[k + 1:j + 1] replaces the weakest link with (path[k], path[j]) and (path[k + 1], path[j + 1])
+        j = numpy.arange(k + 1, n)
+        after = numpy.where(j < n - 1, distances[path[k + 1], path[numpy.minimum(j + 1, n - 1)]], numpy.inf)
+        forward = numpy.minimum(distances[path[k], path[j]], after)
+
+        # while reversing path[i:k + 1] replaces it with (path[i - 1], path[k]) and (path[i], path[k + 1])
+        i = numpy.arange(0, k + 1)
+        before = numpy.where(i > 0, distances[path[numpy.maximum(i - 1, 0)], path[k]], numpy.inf)
+        backward = numpy.minimum(before, distances[path[i], path[k + 1]])
+
+        # take the best of them, as long as it actually beats the weakest link
+        if forward.max() >= backward.max():
+            if forward.max() <= weakest:
+                break
+            best = j[forward.argmax()]
+            path[k + 1:best + 1] = path[k + 1:best + 1][::-1]
+        else:
+            if backward.max() <= weakest:
+                break
+            best = i[backward.argmax()]
+            path[best:k + 1] = path[best:k + 1][::-1]
+
+    return path
+
+
+def solve(distances, start=None, starts=8, seed=None):
+    """Find an order of the colours maximising the smallest difference between neighbours.
+
+    The distances are the (n, n) pairwise differences. Without a start colour the best of a few random starts
+    is used (the same ones every time for a given seed).
+    """
+    n = distances.shape[0]
+    if n < 3:
+        return numpy.arange(n)
+
+    if start is None:
+        start_points = numpy.random.RandomState(seed).permutation(n)[:starts]
+    else:
+        start_points = numpy.array([start])
+
+    # improve each of the greedy walks and keep whichever ends up with the strongest weakest link
+    best, best_score = None, -numpy.inf
+    for path in _greedy(distances, start_points):
+        path = _two_opt(distances, path, max_moves=4 * n)
+        score = _links(distances, path).min()
+        if score > best_score:
+            best, best_score = path, score
+
+    return best
+
+
+def distinct_order(rgb, conditions=("normal",), start=None, seed=None):
+    """Find the order of the RGB colours that keeps neighbours most distinct across the conditions."""
+    return solve(differences(rgb, conditions), start=start, seed=seed)
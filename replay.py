@@ -0,0 +1,122 @@
+"""
+Record spreads of points and replay them, rather than redrawing them live as they're worked out.
+
+A spread is recorded step by step (see Points.spread) and saved compressed, then replayed as x-y, x-z and y-z
+projections with blitted animation, skipping frames so that long or large spreads play back quickly.
+Several recordings can be replayed side by side (a row each) to compare runs.
+
+usage: python replay.py record OUTPUT.npz [-n 20] [--steps 200] [--seed 0] [--force 10] [--dim 8]
+       python replay.py show RUN.npz [OTHER.npz ...] [--skip 1] [--max-frames 300] [--interval 30]
+"""
+import argparse
+import colours
+import numpy
+import sys
+
+# the pairs of axes to project onto
+_projections = (("x", "y"), ("x", "z"), ("y", "z"))
+_axes = {"x": 0, "y": 1, "z": 2}
+
+
+def _frames(steps, skip=1, max_frames=300):
+    """Return which steps to show, skipping enough of them to keep to the most frames (and keeping the last)."""
+    skip = max(skip, int(numpy.ceil(steps / max_frames)))
+    frames = list(range(0, steps, skip))
+    if frames[-1] != steps - 1:
+        frames.append(steps - 1)
+
+    return frames
+
+
+def show(trajectories, scale=10, labels=None, skip=1, max_frames=300, interval=30):
+    """Replay the trajectories (each of shape (steps, n, 3)), one row of projections each."""
+    import matplotlib.animation
+    import matplotlib.pyplot
+
+    labels = labels or ["run {}".format(i + 1) for i in range(len(trajectories))]
+    figure, axes = matplotlib.pyplot.subplots(len(trajectories), len(_projections), squeeze=False,
+                                              figsize=(4 * len(_projections), 4 * len(trajectories)))
+
+    # only the points and the step counter change, so they're all that gets redrawn (blitted) each frame
+    scatters = []
+    for row, (trajectory, label) in zip(axes, zip(trajectories, labels)):
+        colour = matplotlib.pyplot.cm.viridis(numpy.linspace(0, 1, trajectory.shape[1]))
+        for ax, (first, second) in zip(row, _projections):
+            ax.set_xlim(0, scale)
+            ax.set_ylim(0, scale)
+            ax.set_aspect("equal")
+            ax.set_xlabel(first)
+            ax.set_ylabel(second)
+            scatter = ax.scatter(trajectory[0, :, _axes[first]], trajectory[0, :, _axes[second]], s=12, c=colour,
+                                 animated=True)
+            scatters.append((scatter, trajectory, _axes[first], _axes[second]))
+        row[0].set_title(label, loc="left")
+
+    counter = axes[0, -1].text(0.98, 0.98, "", transform=axes[0, -1].transAxes, ha="right", va="top",
+                               animated=True)
+
+    def update(step):
+        for scatter, trajectory, first, second in scatters:
+            # shorter runs stay on their last step
+            positions = trajectory[min(step, trajectory.shape[0] - 1)]
+            scatter.set_offsets(positions[:, [first, second]])
+        counter.set_text("step {}".format(step))
+
+        return [scatter for scatter, *_ in scatters] + [counter]
+
+    steps = max(trajectory.shape[0] for trajectory in trajectories)
+    figure.tight_layout()
+    animation = matplotlib.animation.FuncAnimation(figure, update, frames=_frames(steps, skip, max_frames),
+                                                   interval=interval, blit=True, repeat=False)
+    matplotlib.pyplot.show()
+
+    return animation
+
+
+def record(path, n=20, steps=200, seed=0, force=10, dim=8, periodic=True, dtype="float64"):
+    """Spread some points, recording every step, and save the trajectory."""
+    points = colours.Points(n, force=force, dim=dim, periodic=periodic, seed=seed, dtype=dtype)
+    points.spread(steps, record=True)
+    points.save_trajectory(path)
+
+    return points.trajectory
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record spreads of points and replay them.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    recorder = commands.add_parser("record", help="spread some points and save every step")
+    recorder.add_argument("output", help="file to save the trajectory to (.npz)")
+    recorder.add_argument("-n", type=int, default=20, help="number of points")
+    recorder.add_argument("--steps", type=int, default=200, help="steps to spread for")
+    recorder.add_argument("--seed", type=int, default=0, help="seed for the starting positions")
+    recorder.add_argument("--force", type=float, default=10, help="force strength")
+    recorder.add_argument("--dim", type=int, default=8, help="force drop off power")
+    recorder.add_argument("--bounded", action="store_true", help="use a bounded rather than periodic box")
+    recorder.add_argument("--dtype", default="float64", help="dtype to spread in")
+
+    viewer = commands.add_parser("show", help="replay saved trajectories side by side")
+    viewer.add_argument("trajectories", nargs="+", help="saved trajectories (.npz)")
+    viewer.add_argument("--skip", type=int, default=1, help="show every this many steps")
+    viewer.add_argument("--max-frames", type=int, default=300, help="skip more steps to keep to this many frames")
+    viewer.add_argument("--interval", type=int, default=30, help="time between frames (ms)")
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        record(args.output, args.n, args.steps, args.seed, args.force, args.dim, not args.bounded, args.dtype)
+        return 0
+
+    try:
+        loaded = [colours.load_trajectory(path) for path in args.trajectories]
+    except (OSError, KeyError, ValueError) as error:
+        print("{}: error: {}".format(parser.prog, error), file=sys.stderr)
+        return 1
+
+    show([trajectory["positions"] for trajectory in loaded], max(trajectory["scale"] for trajectory in loaded),
+         args.trajectories, args.skip, args.max_frames, args.interval)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,30 +4,237 @@ A colour scheme generating application.
 
 author: Jacob Buete
 """
+import argparse
 import colours
-import matplotlib.patches
-import matplotlib.pyplot
+import concurrent.futures
+import contextlib
+import export
+import functools
+import history
+import io
+import json
+import names
 import numpy
+import ordering
+import os
+import threading
+import time
 import tkinter
+import tkinter.filedialog
+import tkinter.messagebox
 import tkinter.ttk
 
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+# matplotlib takes a while to import so it isn't loaded until the window is up (see PlotRegion)
+
+
+class RingBuffer():
+    """A bounded buffer of data rows, always readable as one contiguous array."""
+
+    def __init__(self, capacity, columns):
+        self.capacity = capacity
+        self.columns = columns
+
+        # every row is written twice, capacity rows apart, so that the most recent rows are always
+        # available as a single slice without having to copy or roll the storage
+        self._data = numpy.empty((2 * capacity, columns))
+        self._start = 0
+        self.size = 0
+        self.dropped = 0  # how many of the oldest rows have been dropped to make room
+
+    def extend(self, rows):
+        """Append the rows, dropping the oldest rows once the capacity is reached."""
+        total = self.dropped + self.size + rows.shape[0]
+        rows = rows[-self.capacity:]
+        n_rows = rows.shape[0]
+
+        # find where the new rows go and write them to both halves
+        index = (self._start + self.size + numpy.arange(n_rows)) % self.capacity
+        self._data[index] = rows
+        self._data[index + self.capacity] = rows
+
+        # and move the start along if we've overwritten anything
+        overflow = self.size + n_rows - self.capacity
+        if overflow > 0:
+            self._start = (self._start + overflow) % self.capacity
+            self.size = self.capacity
+        else:
+            self.size += n_rows
+        self.dropped = total - self.size
+
+    def view(self):
+        """Return the buffered rows, oldest first."""
+        return self._data[self._start:self._start + self.size]
+
+
+class FileTail():
+    """Follow a data file as it grows, only ever parsing the newly appended bytes."""
+
+    def __init__(self, filename, delimiter=None, capacity=100000):
+        self.filename = filename
+        self.delimiter = delimiter
+        self.capacity = capacity
+
+        # where we've read up to, and any incomplete line at the end of the file
+        self.offset = 0
+        self._partial = b""
+        self.buffer = None
+
+    def load(self):
+        """Read the whole file from the start."""
+        self.offset = 0
+        self._partial = b""
+        self.buffer = None
+
+        # the last line counts even without a newline at the end, only later reads wait for one
+        chunk = self._read_chunk() + self._partial
+        self._partial = b""
+        try:
+            rows = self._parse(chunk)
+        except ValueError:
+            rows = self._parse(chunk, skip_header=1)
+
+        # the whole file is always kept, the capacity only limits how far following it can grow past that
+        self.buffer = RingBuffer(max(self.capacity, rows.shape[0]), rows.shape[1])
+        self.buffer.extend(rows)
+
+        return self.buffer.view()
+
+    def read(self):
+        """Parse any rows appended since the last read, returning None if there are none."""
+        # check if the file has been truncated or replaced, in which case we start again
+        if os.stat(self.filename).st_size < self.offset:
+            raise EOFError("{} has been truncated".format(self.filename))
+
+        chunk = self._read_chunk()
+        if not chunk.strip():
+            # nothing but blank lines (if anything), which aren't rows
+            return None
+
+        rows = self._parse(chunk)
+        if rows.shape[1] != self.buffer.columns:
+            raise ValueError("{} changed its number of columns".format(self.filename))
+
+        self.buffer.extend(rows)
+        return rows
+
+    def _read_chunk(self):
+        """Read the complete lines that have been appended to the file."""
+        with open(self.filename, "rb") as infile:
+            infile.seek(self.offset)
+            chunk = self._partial + infile.read()
+            self.offset = infile.tell()
+
+        # hold back anything after the last newline as it may only be partially written
+        end = chunk.rfind(b"\n") + 1
+        self._partial = chunk[end:]
+
+        return chunk[:end]
+
+    def _parse(self, chunk, skip_header=0):
+        """Parse a chunk of complete lines into rows."""
+        return numpy.genfromtxt(io.BytesIO(chunk), delimiter=self.delimiter,
+                                skip_header=skip_header, ndmin=2)
+
+
+class TracedAction():
+    """The time spent in each stage of one user action."""
+
+    def __init__(self, name):
+        self.name = name
+        self.started = time.time()
+        self.start = time.perf_counter()
+        self.stages = {}
+
+    def add(self, stage, seconds):
+        """Add time to a stage (stages that happen more than once add up)."""
+        self.stages[stage] = self.stages.get(stage, 0) + seconds
+
+
+class ActionTracer():
+    """Trace each user action from its event through to the final draw.
+
+    Each action is timed stage by stage, handed to the callback once it's finished (to show it), and written
+    to the trace file as a JSON line if there is one.
+    """
+
+    def __init__(self, callback=None, trace_file=None):
+        self.callback = callback
+        self.trace_file = trace_file
+        self.current = None
+
+    def begin(self, name):
+        """Start tracing a new action, finishing off any that hadn't got to the end."""
+        if self.current is not None:
+            self.finish(interrupted=True)
+
+        self.current = TracedAction(name)
+        return self.current
+
+    def add(self, stage, seconds):
+        """Add time to a stage of the current action (only ever from the main thread, like everything here)."""
+        if self.current is not None:
+            self.current.add(stage, seconds)
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Time a stage of the current action."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def finish(self, widget=None, interrupted=False):
+        """Finish the current action, waiting for the widget to be redrawn first if one is given."""
+        action = self.current
+        if action is None:
+            return
+
+        # the drawing happens when Tk is next idle, so do that now to count it (but not before the window is
+        # up, as that would also run everything put off until after the first paint)
+        if widget is not None and widget.winfo_ismapped():
+            with self.stage("paint"):
+                widget.update_idletasks()
+
+        self.current = None
+        record = {"action": action.name,
+                  "started": action.started,
+                  "total": time.perf_counter() - action.start,
+                  "stages": dict(action.stages)}
+        if interrupted:
+            record["interrupted"] = True
+
+        if self.callback is not None:
+            self.callback(record)
+        if self.trace_file is not None:
+            self.trace_file.write(json.dumps(record) + "\n")
+            self.trace_file.flush()
 
 
 class FileRegion(tkinter.Frame):
     """The region dealing with files."""
 
+    poll_interval = 500  # how often to check a followed file (ms)
+
     def __init__(self, parent, *args, **kwargs):
         tkinter.Frame.__init__(self, parent, *args, **kwargs)
         self.parent = parent
+        self.tail = None
+        self._poll_job = None
 
         # the first thing is to make the file opening button
         self.df_open = tkinter.ttk.Button(self, text="Open data source...", command=self._open_file)
         self.file_name = tkinter.ttk.Label(self, text="Datafile: None")
 
+        # and the option to keep following the file as it grows
+        self.follow = tkinter.BooleanVar(self)
+        self.follow_check = tkinter.ttk.Checkbutton(self, text="Follow file", variable=self.follow,
+                                                    command=self._toggle_follow)
+
         # load them up
         self.file_name.pack(side="top", fill="x", expand=True)
         self.df_open.pack(side="top", fill="both", expand=True)
+        self.follow_check.pack(side="top", expand=True)
 
     def _open_file(self):
         """Open the selected data file."""
@@ -46,18 +253,65 @@ class FileRegion(tkinter.Frame):
                 delimiter = "\t"
             else:
                 delimiter = None
+
+            self.tail = FileTail(filename, delimiter=delimiter)
             try:
                 # we want to set this filename to the
-                self.parent.master.parent.parent.plot_layout.data = numpy.genfromtxt(filename, delimiter=delimiter)
+                self.parent.master.parent.parent.plot_layout.data = self.tail.load()
+                self.parent.master.parent.parent.plot_layout.first_row = self.tail.buffer.dropped
             except OSError:
+                self.tail = None
                 tkinter.messagebox.showerror("Open Source File", "Failed to read in {}".format(filename))
             except ValueError:
-                try:
-                    self.parent.master.parent.parent.plot_layout.data = numpy.genfromtxt(filename,
-                                                                                         delimiter=delimiter,
-                                                                                         skip_header=1)
-                except ValueError:
-                    tkinter.messagebox.showerror("Open Source File", "{} got a weird header".format(self.file_name))
+                self.tail = None
+                tkinter.messagebox.showerror("Open Source File", "{} got a weird header".format(filename))
+
+            self._toggle_follow()
+
+    def _toggle_follow(self):
+        """Start or stop following the open file."""
+        if self._poll_job is not None:
+            self.after_cancel(self._poll_job)
+            self._poll_job = None
+
+        if self.follow.get() and self.tail is not None:
+            self._poll_job = self.after(self.poll_interval, self._poll)
+
+    def _poll(self):
+        """Check the followed file for new rows and extend the plot with them."""
+        self._poll_job = None
+        application = self.parent.master.parent.parent
+
+        try:
+            rows = self.tail.read()
+        except (OSError, EOFError, ValueError):
+            # the file has been replaced underneath us so start again from scratch
+            try:
+                application.plot_layout.data = self.tail.load()
+                application.plot_layout.first_row = self.tail.buffer.dropped
+            except (OSError, ValueError):
+                self.follow.set(False)
+                tkinter.messagebox.showerror("Follow Source File", "Lost track of {}".format(self.tail.filename))
+                return
+            application.plot.make_plot()
+        else:
+            if rows is not None:
+                application.plot_layout.data = self.tail.buffer.view()
+                application.plot_layout.first_row = self.tail.buffer.dropped
+                application.plot.extend_plot()
+
+        self._toggle_follow()
+
+
+# the formats colours can be exported in, by the name they're offered as
+_export_formats = {"Hex": "hex",
+                   "RGB": "rgb",
+                   "Gnuplot": "gnuplot",
+                   "Python": "python",
+                   "CSS": "css",
+                   "Matplotlib Style": "mplstyle",
+                   "JSON": "json",
+                   "NumPy": "npy"}
 
 
 class ExportWindow(tkinter.Toplevel):
@@ -82,58 +336,131 @@ class ExportWindow(tkinter.Toplevel):
 
         # now the options
         self.output_label = tkinter.ttk.Label(self.options, text="Export as:", anchor="center")
-        self.output_choices = tkinter.ttk.Combobox(self.options, justify="center")
-        self.output_choices["values"] = ("Hex",
-                                         "RGB",
-                                         "Gnuplot",
-                                         "Python")
+        self.output_choices = tkinter.ttk.Combobox(self.options, justify="center", state="readonly")
+        self.output_choices["values"] = list(_export_formats.keys())
         self.output_choices.bind("<<ComboboxSelected>>", self._format_output)
         self.output_choices.current(0)  # make sure we have a reasonable default
+        self.save_button = tkinter.ttk.Button(self.options, text="Save...", command=self._save)
+
+        # the output for each format is kept until the colours change
+        self._rgb = None
+        self._outputs = {}
         self._format_output("doop")  # dumb error event shit
 
         # pack the options box and set the column and row options
         self.options.grid(column=0, row=0, sticky="nsew")
         self.options.grid_columnconfigure(0, weight=1)
         self.options.grid_columnconfigure(1, weight=1)
+        self.options.grid_columnconfigure(2, weight=1)
         self.options.grid_rowconfigure(0, weight=1)
 
         # pack the other things away
         self.box.grid(column=0, row=1, sticky="nsew")
         self.output_label.grid(column=0, row=0, sticky="nsew")
         self.output_choices.grid(column=1, row=0, sticky="nsew")
+        self.save_button.grid(column=2, row=0, sticky="nsew")
         self.top_frame.grid(column=0, row=0, sticky="nsew")
 
     def _format_output(self, event):
         """Format the colour export."""
-        # first we need to get the colours
-        colour_list = self.parent.parent.scheme.colours
-
-        # now iterate through and figure out the formatting
-        export_string = ""
-        for index, colour in enumerate(colour_list):
-            if self.output_choices.get() == "Hex":
-                export_string += colour.hex + "\n"
-            elif self.output_choices.get() == "RGB":
-                export_string += colour.get_rgb_string() + "\n"
-            elif self.output_choices.get() == "Gnuplot":
-                export_string += "set style line {} lc \"{}\"\n".format(index + 1, colour.hex)
-            elif self.output_choices.get() == "Python":
-                export_string += "\'{}\',\n".format(colour.hex)
+        # first we need to get the colours, and forget the old outputs if they've changed since
+        rgb = export.from_scheme(self.parent.parent.scheme)
+        if self._rgb is None or not numpy.array_equal(rgb, self._rgb):
+            self._rgb = rgb
+            self._outputs = {}
+
+        output_format = _export_formats.get(self.output_choices.get())
+        if output_format is None:
+            tkinter.messagebox.showerror("Export Issues", "Somehow you chose an option that doesn't exist... gg")
+            return
+
+        if output_format not in self._outputs:
+            if output_format == "npy":
+                # there's no showing a binary file, so just say what's in it
+                self._outputs[output_format] = ("A {} by 3 array of RGB values (0-255), "
+                                                "use Save to write it out.".format(len(rgb)))
             else:
-                tkinter.message.showerror("Export Issues", "Somehow you chose an option that doesn't exist... gg")
-
-        # some additional processing for the Python list
-        if self.output_choices.get() == "Python":
-            export_string = "[" + export_string[:-2] + "]"
+                self._outputs[output_format] = export.encode(rgb, output_format).decode()
 
         # now delete the contents of the box and insert the new format
         self.box.delete("1.0", tkinter.END)
-        self.box.insert("1.0", export_string)
+        self.box.insert("1.0", self._outputs[output_format])
+
+    def _save(self):
+        """Save the colours to a file in the chosen format."""
+        output_format = _export_formats[self.output_choices.get()]
+        extension = {"hex": ".txt", "rgb": ".txt", "gnuplot": ".gp"}.get(output_format, "." + output_format)
+        filename = tkinter.filedialog.asksaveasfilename(defaultextension=extension,
+                                                        filetypes=((self.output_choices.get(), "*" + extension),
+                                                                   ("All Files", "*")))
+        if filename:
+            try:
+                export.save(export.from_scheme(self.parent.parent.scheme), filename, output_format)
+            except OSError:
+                tkinter.messagebox.showerror("Colour Export", "Failed to write {}".format(filename))
+
+
+def _compare_scale(width, height, screen_width, screen_height):
+    """Return how much the comparison grid of a width x height plot has to shrink to fit on the screen.
+
+    At full size the grid is four plots wide and two (and their titles) high, and it's kept a little clear of
+    the screen's edges so the window's frame and button fit too.
+    """
+    return min(1, 0.9 * screen_width / (4 * width), 0.8 * screen_height / (2.2 * height))
+
+
+class CompareWindow(tkinter.Toplevel):
+    """A window showing the plot under every viewing condition at once."""
+
+    dpi = 100
+
+    def __init__(self, parent, image, titles, *args, **kwargs):
+        tkinter.Toplevel.__init__(self, parent, *args, **kwargs)
+        self.parent = parent
+        self.winfo_toplevel().title("Compare Viewing Options")
+
+        # the figure is already on the screen so matplotlib has been imported
+        import matplotlib.figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+        # every variant comes from the one render, each a single pass over its distinct colours
+        # (shown shrunk to fit the screen, only the export is at the full resolution of the render)
+        height, width = image.shape[:2]
+        self.scale = _compare_scale(width, height, self.winfo_screenwidth(), self.winfo_screenheight())
+        self.figure = matplotlib.figure.Figure(figsize=(4 * width * self.scale / self.dpi,
+                                                        2.2 * height * self.scale / self.dpi), dpi=self.dpi)
+        for index, (name, simulated) in enumerate(colours.simulate_image_all(image).items()):
+            # lay them out the same way as the viewing options buttons
+            ax = self.figure.add_subplot(2, 4, 1 + index // 2 + 4 * (index % 2))
+            ax.imshow(simulated, interpolation="antialiased")
+            ax.set_title(titles[name], fontsize="small")
+            ax.axis("off")
+        self.figure.subplots_adjust(left=0, right=1, bottom=0, top=0.95, wspace=0.02, hspace=0.1)
+
+        self._canvas = FigureCanvasTkAgg(self.figure, master=self)
+        self._canvas.draw()
+
+        self.export_button = tkinter.ttk.Button(self, text="Export PNG...", command=self._export)
+
+        self.export_button.pack(side="bottom", fill="x")
+        self._canvas.get_tk_widget().pack(side="top", fill="both", expand=True)
+
+    def _export(self):
+        """Save the grid as a single image."""
+        filename = tkinter.filedialog.asksaveasfilename(defaultextension=".png",
+                                                        filetypes=(("Portable Network Graphics", "*.png"),))
+        if filename:
+            try:
+                self.figure.savefig(filename, dpi=self.dpi / self.scale)
+            except OSError:
+                tkinter.messagebox.showerror("Export Comparison", "Failed to write {}".format(filename))
 
 
 class ColourPicker(tkinter.Frame):
     """The colour picking region of the application."""
 
+    preview_interval = 100  # how long to collect slider changes for before previewing them (ms)
+
     def __init__(self, parent, *args, **kwargs):
         # initialise the frame
         tkinter.Frame.__init__(self, parent, *args, **kwargs)
@@ -155,11 +482,11 @@ class ColourPicker(tkinter.Frame):
         self.file_io = FileRegion(self.label_frame)  # this will contain data selection and saving
 
         # now get the sliders
-        self.hue = Sliders(self.slider_container, 0, 360, "images/hue_slider.png")
+        self.hue = Sliders(self.slider_container, 0, 360, "hue")
         self.hue.label.config(text="Hue")
-        self.chroma = Sliders(self.slider_container, 0, 100, "images/chroma_slider.png")
+        self.chroma = Sliders(self.slider_container, 0, 100, "chroma")
         self.chroma.label.config(text="Chroma")
-        self.light = Sliders(self.slider_container, 0, 100, "images/light_slider.png")
+        self.light = Sliders(self.slider_container, 0, 100, "light")
         self.light.label.config(text="Light")
 
         # add the sliders to the list
@@ -184,11 +511,37 @@ class ColourPicker(tkinter.Frame):
         self._update_sliders("event_gibberish")
         self.preset_menu.bind("<<ComboboxSelected>>", self._update_sliders)
 
+        # live preview follows the sliders, coalescing their changes so we only update every so often
+        self.live = tkinter.BooleanVar(self)
+        self.live_check = tkinter.ttk.Checkbutton(self.input_container, text="Live preview", variable=self.live)
+        self._preview_job = None
+        self._restoring = False  # so that restoring old limits doesn't set off a preview
+        for sliders in (self.hue, self.chroma, self.light):
+            sliders.low.value.trace_add("write", self._limits_changed)
+            sliders.high.value.trace_add("write", self._limits_changed)
+            sliders.low.value.trace_add("write", self._update_previews)
+            sliders.high.value.trace_add("write", self._update_previews)
+        self._update_previews()
+
         # the button to generate the colours
         self.gen_button = tkinter.ttk.Button(self.input_container, text="Generate", command=self.parent.reroll)
         self.rand_button = tkinter.ttk.Button(self.input_container, text="Reorder", command=self.parent.reorder)
         self.export_button = tkinter.ttk.Button(self.input_container, text="Export", command=self._export)
 
+        # stepping back and forth through the schemes we've had
+        self.undo_button = tkinter.ttk.Button(self.input_container, text="Undo", command=self.parent.undo,
+                                              state="disabled")
+        self.redo_button = tkinter.ttk.Button(self.input_container, text="Redo", command=self.parent.redo,
+                                              state="disabled")
+        # only in this window, and not while typing in a text box (where they're for undoing the typing)
+        for sequence, action in (("<Control-z>", self.parent.undo),
+                                 ("<Control-y>", self.parent.redo),
+                                 ("<Control-Z>", self.parent.redo)):
+            self.winfo_toplevel().bind(sequence, functools.partial(self._shortcut, action), add="+")
+
+        # and something to show when colours are being generated
+        self.busy = tkinter.ttk.Progressbar(self.input_container, mode="indeterminate", length=60)
+
         # now we can start packing things
         self.num_label.pack(side="top", expand=True)
         self.num_entry.pack(side="top", expand=True)
@@ -199,8 +552,12 @@ class ColourPicker(tkinter.Frame):
         self.num_stack.pack(side="left", expand=True)
         self.preset_stack.pack(side="left", expand=True)
         self.rand_button.pack(side="right", expand=True)
+        self.redo_button.pack(side="right", expand=True)
+        self.undo_button.pack(side="right", expand=True)
         self.export_button.pack(side="right", expand=True)
         self.gen_button.pack(side="right", expand=True)
+        self.busy.pack(side="right", expand=True)
+        self.live_check.pack(side="right", expand=True)
 
         self.intro.pack(side="top", fill="x", expand=True)
         self.input_container.pack(side="top", fill="both", expand=True)
@@ -212,16 +569,65 @@ class ColourPicker(tkinter.Frame):
         """Export the colours."""
         ExportWindow(self)
 
+    def _shortcut(self, action, event):
+        """Undo or redo the palette from a key press, unless it was typed into a text box."""
+        if isinstance(event.widget, (tkinter.Entry, tkinter.ttk.Entry, tkinter.Spinbox)):
+            return
+        action()
+
+    def _limits_changed(self, *args):
+        """Schedule a preview for the latest limits, unless one is already on the way."""
+        if self.live.get() and not self._restoring and self._preview_job is None:
+            self.parent.tracer.begin("preview")
+            self._preview_job = self.after(self.preview_interval, self._preview)
+
+    def _update_previews(self, *args):
+        """Redraw the slider previews for the current limits."""
+        try:
+            limits = tuple((sliders.low.value.get(), sliders.high.value.get())
+                           for sliders in (self.hue, self.chroma, self.light))
+        except tkinter.TclError:
+            # one of the text boxes is part way through being typed in
+            return
+
+        for sliders in (self.hue, self.chroma, self.light):
+            sliders.middle.show(limits)
+
+    def _preview(self):
+        """Preview the colours for whatever the limits are now."""
+        self._preview_job = None
+        self.parent.preview()
+
+    def set_history(self, can_undo, can_redo):
+        """Enable the undo and redo buttons when there's somewhere to go."""
+        self.undo_button.config(state="normal" if can_undo else "disabled")
+        self.redo_button.config(state="normal" if can_redo else "disabled")
+
+    def show_scheme(self, scheme):
+        """Set the number of colours and the sliders to match a scheme, without previewing it."""
+        self._restoring = True
+        try:
+            self.num_colours.set(scheme.size)
+            for sliders, (low, high) in zip((self.hue, self.chroma, self.light), scheme.get_limits()):
+                sliders.low.value.set(round(low))
+                sliders.high.value.set(round(high))
+        finally:
+            self._restoring = False
+
+    def set_busy(self, busy):
+        """Show or hide the busy indicator."""
+        if busy:
+            self.busy.start(15)
+        else:
+            self.busy.stop()
+
     def _preset_options(self):
         """Define a dictionary of the preset options."""
         # this will be a dictionary keyed by the present name
         # since we can use that for the presentation
         # the value is a 3-tuple of 2-tuples
         # corresponding to ((h_low, h_high), (c_low, c_high), (l_low, l_high))
-        options = {"All": ((0, 360), (0, 100), (0, 100)),
-                   "Colourblind Friendly": ((0, 360), (40, 70), (15, 85))}
-
-        return options
+        return dict(colours._presets)
 
     def _update_sliders(self, event):
         """Update the sliders for the selected preset."""
@@ -240,50 +646,71 @@ class ColourPicker(tkinter.Frame):
         self.light.high.value.set(l_high)
 
 
-class Swatch(tkinter.Frame):
-    """A colour swatch."""
-
-    def __init__(self, parent, colour, rgb, _hex, index, *args, **kwargs):
-        tkinter.Frame.__init__(self, parent, *args, **kwargs)
-        self.parent = parent
-
-        # now make the things that we want
-        self.config(relief="groove")
-
-        # make the objects that we care about, namely a region to put the colour
-        # and the names
-        self.name_frame = tkinter.Frame(self, bg="white")
-        self.coloured = tkinter.Frame(self, bg=colour, height=30)
-        self.rgb_name = tkinter.ttk.Label(self.name_frame, text=rgb, background="white", width=14, anchor="center")
-        self.hex_name = tkinter.ttk.Label(self.name_frame, text=_hex, background="white", width=14, anchor="center")
-        self.index = tkinter.ttk.Label(self.name_frame, text="{}".format(index), width=3,
-                                       anchor="center", background="white", foreground="#bebebe")
-
-        # first do the colour
-        self.coloured.pack(side="top", fill="both", expand=True)
-
-        # make sure the names are where they need to be
-        self.rgb_name.pack(side="left", fill="x", expand=True)
-        self.index.pack(side="left", fill="x", expand=True)
-        self.hex_name.pack(side="right", fill="x", expand=True)
-
-        # and now the name frame
-        self.name_frame.pack(side="top", fill="x", expand=True)
-
-
-class SwatchCard(tkinter.Frame):
-    """A collection of swatches."""
-
-    def __init__(self, parent, *args, **kwargs):
-        tkinter.Frame.__init__(self, parent, *args, **kwargs)
-        self.parent = parent
-
-        # maybe other things will go here?
+class Swatch():
+    """The canvas items making up a single colour swatch."""
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+
+        # the items are made once and then reused, so we remember what they're showing to avoid
+        # pushing anything to Tk that hasn't actually changed
+        self.coloured = canvas.create_rectangle(0, 0, 0, 0, outline="#bebebe")
+        self.rgb_name = canvas.create_text(0, 0, anchor="w")
+        self.index = canvas.create_text(0, 0, fill="#bebebe")
+        self.hex_name = canvas.create_text(0, 0, anchor="e")
+        self.name = canvas.create_text(0, 0)
+        self._shown = {}
+        self._label_states = ("normal", "normal", "normal", "normal")
+
+    def _set(self, item, **options):
+        """Configure an item, skipping it if nothing has changed."""
+        changed = {key: value for key, value in options.items() if self._shown.get((item, key)) != value}
+        if changed:
+            self.canvas.itemconfig(item, **changed)
+            self._shown.update({(item, key): value for key, value in changed.items()})
+
+    def show(self, colour, rgb, _hex, index, name):
+        """Show the given colour and labels."""
+        rgb_state, index_state, hex_state, name_state = self._label_states
+        self.set_colour(colour)
+        self._set(self.coloured, state="normal")
+        self._set(self.rgb_name, text=rgb, state=rgb_state)
+        self._set(self.index, text="{}".format(index), state=index_state)
+        self._set(self.hex_name, text=_hex, state=hex_state)
+        self._set(self.name, text=name, state=name_state)
+
+    def set_colour(self, colour):
+        """Change only the displayed colour."""
+        # keep the name readable against the colour
+        r, g, b = (int(colour[i:i + 2], 16) for i in (1, 3, 5))
+        self._set(self.coloured, fill=colour)
+        self._set(self.name, fill="black" if 0.299 * r + 0.587 * g + 0.114 * b > 140 else "white")
+
+    def hide(self):
+        """Hide the swatch so it can be reused later."""
+        for item in (self.coloured, self.rgb_name, self.index, self.hex_name, self.name):
+            self._set(item, state="hidden")
+
+    def place(self, x, y, width, height, label_height):
+        """Position the swatch with its top left corner at (x, y)."""
+        middle = y + height - label_height / 2
+        self.canvas.coords(self.coloured, x + 1, y + 1, x + width - 1, y + height - label_height)
+        self.canvas.coords(self.rgb_name, x + 4, middle)
+        self.canvas.coords(self.index, x + width / 2, middle)
+        self.canvas.coords(self.hex_name, x + width - 4, middle)
+        self.canvas.coords(self.name, x + width / 2, y + (height - label_height) / 2)
+
+        # drop the longer labels when there's no room for them
+        self._label_states = tuple("normal" if width > limit else "hidden" for limit in (200, 40, 70, 90))
+        for item, state in zip((self.rgb_name, self.index, self.hex_name, self.name), self._label_states):
+            self._set(item, state=state)
 
 
 class ColourViewer(tkinter.Frame):
     """The viewer for the generated colours."""
 
+    label_height = 20  # the height of the text under each swatch
+
     def __init__(self, parent, *args, **kwargs):
         # first let's make sure we do the frame things
         tkinter.Frame.__init__(self, parent, *args, **kwargs)
@@ -292,129 +719,125 @@ class ColourViewer(tkinter.Frame):
 
         self.label = tkinter.ttk.Label(self, text="Colour pictures will go here")
 
+        # everything is drawn onto a single canvas, with the swatches pooled so we never rebuild them
         self.frame = tkinter.ttk.LabelFrame(self, text="Colours")
-        self.swatches = []
-        self.cards = []
-        # let's create the figure
-        # self.figure = matplotlib.pyplot.figure(frameon=False)
-        # self.ax = self.figure.add_subplot(1, 1, 1, aspect="equal")
-        # self.ax.axis("off")
+        self.canvas = tkinter.Canvas(self.frame, bg="white", highlightthickness=0)
+        self.swatches = []  # every swatch we've made, not all of which need to be visible
+        self.n_shown = 0
+        self._layout_key = None
 
-        # self._canvas = FigureCanvasTkAgg(self.figure, master=self)
-        # self._canvas.draw()
-
-        # self.canvas = self._canvas.get_tk_widget()
-        # self.canvas.pack(side="left", fill="both", expand=True)
+        self.canvas.bind("<Configure>", lambda event: self._layout())
+        self.canvas.pack(side="top", fill="both", expand=True)
+        self.frame.pack(side="left", fill="both", expand=True)
 
         self._draw()
 
+    def _viewing_args(self):
+        """Get the current colourblind arguments (normal vision if the options don't exist yet)."""
+        viewer = getattr(self.parent.parent, "view", None)
+        if viewer is None:
+            return {"condition": "normal", "_hex": True}
+        return viewer.colourblind_args[viewer.index[viewer.selected]]
+
     def update_colours(self, **args):
         """Update the colours to reflect the given colourblindness."""
         # iternate through the colours
-        n_colours = len(self.swatches)
-        for i in range(n_colours):
+        for i in range(self.n_shown):
             colour = colours.Colourblind(self.parent.scheme.colours[i].rgb, linear=False).as_though(**args)
-            self.swatches[i].coloured.config(bg=colour)
+            self.swatches[i].set_colour(colour)
 
     def _reorder_colours(self):
         """Reorder the colours."""
-        n_colours = len(self.swatches)
-        viewer = self.parent.parent.view
-        self.update_colours(**viewer.colourblind_args[viewer.index[viewer.selected]])
-        for i in range(n_colours):
-            self.swatches[i].rgb_name.config(text=self.parent.scheme.colours[i].get_rgb_string())
-            self.swatches[i].hex_name.config(text=self.parent.scheme.colours[i].hex)
-
-    def _draw(self):
-        """Draw the colourscheme in a nicer way."""
-        # first let's check the number of colours that we're looking at
-        n_colours = len(self.parent.scheme.colours)
+        self._draw()
 
+    def _grid(self, n_colours):
+        """Find the number of columns and rows that gets as close as we can to a square."""
         # now let's see how close we can make this to a square
         for n_cols in range(int(n_colours**0.5), 0, -1):
             if n_colours % n_cols == 0:  # check if it's a factor
                 break
-        else:
-            if n_colours < 5:
-                n_cols = 1
-            else:
-                n_cols = 2
-
-        n_rows = n_colours // n_cols  # integer division to avoid dangling issues
-
-        # check if the number of colours has changed
-        if n_colours == len(self.swatches):
-            viewer = self.parent.parent.view
-            self.update_colours(**viewer.colourblind_args[viewer.index[viewer.selected]])
-            for i in range(n_colours):
-                self.swatches[i].rgb_name.config(text=self.parent.scheme.colours[i].get_rgb_string())
-                self.swatches[i].hex_name.config(text=self.parent.scheme.colours[i].hex)
-        else:  # we have to remake everything
-            self.swatches = []
-            self.cards = []
-            self.frame.destroy()
-            # and then remake
-            frame_backup = tkinter.ttk.LabelFrame(self, text="Colours")
-            # now let's start adding some things
-            for i in range(n_rows):
-                # add a card
-                self.cards.append(SwatchCard(frame_backup))
-                for j in range(n_cols):
-                    # first make the swatch
-                    swatch = Swatch(self.cards[i],
-                                    self.parent.scheme.colours[i * n_cols + j].hex,
-                                    self.parent.scheme.colours[i * n_cols + j].get_rgb_string(),
-                                    self.parent.scheme.colours[i * n_cols + j].hex,
-                                    i * n_cols + j)
-                    # add it to the list
-                    self.swatches.append(swatch)
-
-                    # and then add it to the carc
-                    self.swatches[i * n_cols + j].pack(side="left", fill="both", expand=True)
-
-                # now add the card to the frame
-                self.cards[i].pack(side="top", fill="both", expand=True)
-
-            self.frame.destroy()
-            self.frame = frame_backup
-            self.frame.pack(side="left", fill="both", expand=True)
-
-    def draw(self, ncol=5, x_offset=2.5, y_offset=3):
-        """Draw the colourscheme."""
-        # first erase the figure
-        self.figure.clf()
-        self.ax = self.figure.add_axes([0, 0, 1, 1], aspect='equal')
-        self.ax.axis("off")
-
-        # now we want to make the colours visible
-        for index, colour in enumerate(self.parent.scheme.colours):
-            patch = matplotlib.patches.PathPatch(colours._rounded_verts(x_offset * (index % ncol),
-                                                                        -y_offset * (index // ncol)),
-                                                 facecolor=colour.rgb/255, lw=0.5)
-
-            self.ax.add_patch(patch)
-
-        self.ax.set_ylim(-5, 5)
-        self.ax.set_xlim(-1, 12)
-
-        # self._canvas.update()
-        self._canvas.draw()
+
+        # but don't settle for a long thin strip when there's no nice factor
+        if n_colours > 4 and n_cols * 2 < n_colours**0.5:
+            n_cols = int(numpy.ceil(n_colours**0.5))
+
+        return n_cols, int(numpy.ceil(n_colours / max(n_cols, 1)))
+
+    def _layout(self):
+        """Position the visible swatches to fill the canvas."""
+        if not self.n_shown:
+            return
+
+        width = max(self.canvas.winfo_width(), 1)
+        height = max(self.canvas.winfo_height(), 1)
+        n_cols, n_rows = self._grid(self.n_shown)
+
+        # only move things if something has actually changed
+        key = (width, height, n_cols, n_rows, self.n_shown)
+        if key == self._layout_key:
+            return
+        self._layout_key = key
+
+        swatch_width = width / n_cols
+        swatch_height = height / n_rows
+        label_height = min(self.label_height, swatch_height / 2)
+        for i in range(self.n_shown):
+            self.swatches[i].place((i % n_cols) * swatch_width, (i // n_cols) * swatch_height,
+                                   swatch_width, swatch_height, label_height)
+
+    def _draw(self):
+        """Draw the colourscheme in a nicer way."""
+        # first let's check the number of colours that we're looking at
+        scheme_colours = self.parent.scheme.colours
+        n_colours = len(scheme_colours)
+
+        # make any extra swatches that we need and hide the ones we don't
+        while len(self.swatches) < n_colours:
+            self.swatches.append(Swatch(self.canvas))
+        for swatch in self.swatches[n_colours:self.n_shown]:
+            swatch.hide()
+        self.n_shown = n_colours
+
+        # label them with the nearest named colours, all looked up at once
+        colour_names = []
+        if scheme_colours:
+            colour_names = names.default_index().nearest_names([colour.rgb for colour in scheme_colours])
+
+        # now update everything that has changed
+        args = self._viewing_args()
+        for i, colour in enumerate(scheme_colours):
+            self.swatches[i].show(colours.Colourblind(colour.rgb, linear=False).as_though(**args),
+                                  colour.get_rgb_string(), colour.hex, i, colour_names[i])
+
+        self._layout()
 
 
 class ColourRegion(tkinter.Frame):
     """The section containing the colour information."""
 
+    poll_interval = 20  # how often to check on a background generation (ms)
+    preview_steps = 20  # how far to respread the points for a preview
+    preview_chunk = 5  # and how many steps to take between redraws
+
     def __init__(self, parent, *args, **kwargs):
         # first let's make sure we do the frame things
         tkinter.Frame.__init__(self, parent, *args, **kwargs)
         self.config(bg="white")
         self.parent = parent
 
+        # colours are generated on a single background worker so the interface stays responsive
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self._generation = None  # (future, cancel event, scheme) for the latest request
+        self._preview_job = None  # (future, cancel event, scheme) for the preview steps being worked on
+        self._preview_remaining = 0
+        self.history = history.SchemeHistory()
+        self.tracer = parent.tracer
+
         # first let's make the picker
         self.picker = ColourPicker(self, height=300)
 
-        # get the colours
-        self.scheme = colours.ColourScheme(self.picker.num_colours.get())
+        # get the colours, which are left empty until the first generation comes back
+        self.scheme = colours.ColourScheme(self.picker.num_colours.get(), generate=False)
 
         self.grid_columnconfigure(0, weight=1)
         self.grid_columnconfigure(1, weight=1)
@@ -424,40 +847,223 @@ class ColourRegion(tkinter.Frame):
         # now the viewer for the colours
         self.viewer = ColourViewer(self, height=300)
 
-        # make sure we're using the default colour preset
-        self.reroll(first=True)
-
         self.picker.grid(column=0, row=0, sticky="nsew")
         self.viewer.grid(column=1, row=0, sticky="nsew")
         # self.picker.pack(side="left", fill="both", expand=True)
         # self.viewer.pack(side="left", fill="both", expand=True)
 
+    def destroy(self):
+        """Make sure the worker isn't left spreading points after we're gone."""
+        self._cancel_generation()
+        self._cancel_preview()
+        self._executor.shutdown(wait=False)
+        tkinter.Frame.destroy(self)
+
     def reorder(self):
         """Reorder the colours."""
-        # shuffle them
-        numpy.random.shuffle(self.scheme.colours)
+        if not self.scheme.colours:
+            return
+        self.tracer.begin("reorder")
+        self._cancel_preview()  # its next steps would put the old order back
+
+        # find another order that keeps neighbours distinct, starting from a random colour so that each press
+        # gives something different
+        with self.tracer.stage("order"):
+            rgb = numpy.array([colour.rgb for colour in self.scheme.colours])
+            start = numpy.random.randint(len(rgb))
+            self.scheme.reorder(ordering.distinct_order(rgb, ordering.all_conditions, start=start))
 
         # and then call the reordering function
-        self.viewer._reorder_colours()
-
-    def reroll(self, first=False):
-        """Regenerate the colours and draw them."""
-        # we should see if the number of colours has changed
-        # and if so we should generate a new scheme
-        if len(self.scheme.colours) != self.picker.num_colours.get():
-            self.scheme = colours.ColourScheme(self.picker.num_colours.get())
+        with self.tracer.stage("draw swatches"):
+            self.viewer._reorder_colours()
+        self._record()
+        self.tracer.finish(self)
+
+    def undo(self):
+        """Go back to the previous scheme."""
+        self.tracer.begin("undo")
+        with self.tracer.stage("restore"):
+            scheme = self.history.undo()
+        self._restore(scheme)
+
+    def redo(self):
+        """Go forward to the scheme that was undone."""
+        self.tracer.begin("redo")
+        with self.tracer.stage("restore"):
+            scheme = self.history.redo()
+        self._restore(scheme)
+
+    def _record(self):
+        """Add the current scheme to the history."""
+        self.history.push(self.scheme)
+        self.picker.set_history(self.history.can_undo(), self.history.can_redo())
+
+    def _restore(self, scheme):
+        """Show a scheme from the history."""
+        if scheme is None:
+            self.tracer.finish()
+            return
+
+        # whatever was on the way would replace it
+        self._cancel_generation()
+        self._cancel_preview()
+
+        self.scheme = scheme
+        self.picker.show_scheme(scheme)
+        self.picker.set_history(self.history.can_undo(), self.history.can_redo())
+        with self.tracer.stage("draw swatches"):
+            self.viewer._draw()
+        self.tracer.finish(self)
+
+    def reroll(self):
+        """Regenerate the colours in the background and draw them when they arrive."""
+        # anything we were already working on is now out of date
+        self._cancel_generation()
+        self._cancel_preview()
+        self.tracer.begin("generate")
+
+        # set up a new scheme with the current limits
+        scheme = colours.ColourScheme(self.picker.num_colours.get(), generate=False)
+        self._set_limits(scheme)
+
+        # now hand it off to the worker
+        cancel = threading.Event()
+        self._generation = (self._executor.submit(self._generate, scheme, cancel), cancel, scheme)
+        self.picker.set_busy(True)
+        self.after(self.poll_interval, self._check_generation, self._generation)
+
+    def preview(self):
+        """Quickly respread the current colours inside the current limits, drawing them as they move."""
+        try:
+            if self.scheme.points is None or self.scheme.size != self.picker.num_colours.get():
+                # there's nothing to warm start from so we need a proper generation
+                self.reroll()
+                return
+
+            self._set_limits(self.scheme)
+        except tkinter.TclError:
+            return  # someone is halfway through typing a value
+
+        # a full generation would only overwrite the preview, as would the rest of an earlier one
+        self._cancel_generation()
+        self._cancel_preview()
+
+        # remap straight away so the swatches follow the sliders (which doesn't move the points so is quick),
+        # then refine over the next few steps in the background
+        with self.tracer.stage("respread"):
+            self.scheme.respread(0)
+        with self.tracer.stage("draw swatches"):
+            self.viewer._draw()
 
-        # make sure the limits are correct
-        self.scheme.set_hue_limit(self.picker.hue.low.value.get(), self.picker.hue.high.value.get())
-        self.scheme.set_chroma_limit(self.picker.chroma.low.value.get(), self.picker.chroma.high.value.get())
-        self.scheme.set_light_limit(self.picker.light.low.value.get(), self.picker.light.high.value.get())
+        self._preview_remaining = self.preview_steps
+        self._preview_step()
+
+    def _preview_step(self):
+        """Hand the next few steps of a preview to the worker."""
+        cancel = threading.Event()
+        self._preview_job = (self._executor.submit(self._respread, self.scheme, self.scheme.points.copy(), cancel),
+                             cancel, self.scheme)
+        self.after(self.poll_interval, self._check_preview, self._preview_job)
+
+    def _respread(self, scheme, points, cancel):
+        """Spread a copy of the scheme's points a few steps further and find their colours (this runs on the worker)."""
+        start = time.perf_counter()
+        if not points.spread(self.preview_chunk, cancel=cancel):
+            return None
+        return points, scheme._to_colours(points), time.perf_counter() - start
+
+    def _cancel_preview(self):
+        """Stop any preview that is still being refined."""
+        if self._preview_job is not None:
+            future, cancel, _ = self._preview_job
+            future.cancel()
+            cancel.set()
+            self._preview_job = None
+        self._preview_remaining = 0
+
+    def _check_preview(self, preview):
+        """Draw the next steps of a preview once the worker has them, and set off the ones after."""
+        if preview is not self._preview_job:
+            return
+
+        future, _, scheme = preview
+        if not future.done():
+            self.after(self.poll_interval, self._check_preview, preview)
+            return
+
+        self._preview_job = None
+        result = future.result()
+        if result is None:
+            return
+
+        scheme.points, scheme.colours, seconds = result
+        self.tracer.add("respread", seconds)
+        with self.tracer.stage("draw swatches"):
+            self.viewer._draw()
 
-        # now we can regenerate the colours
-        self.scheme.reroll()
+        self._preview_remaining -= self.preview_chunk
+        if self._preview_remaining > 0:
+            self._preview_step()
+        else:
+            self._record()
+            self.tracer.finish(self)
+
+    def _set_limits(self, scheme):
+        """Make sure the limits of the scheme match the sliders."""
+        scheme.set_hue_limit(self.picker.hue.low.value.get(), self.picker.hue.high.value.get())
+        scheme.set_chroma_limit(self.picker.chroma.low.value.get(), self.picker.chroma.high.value.get())
+        scheme.set_light_limit(self.picker.light.low.value.get(), self.picker.light.high.value.get())
+
+    def _generate(self, scheme, cancel):
+        """Generate the colours and put them in their most distinct order (this runs on the worker).
+
+        Returns the time taken by each stage (for the main thread to trace), or None if it was cancelled.
+        """
+        stages = {}
+        start = time.perf_counter()
+        if not scheme.reroll(cancel):
+            return None
+        stages["generate"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        rgb = numpy.array([colour.rgb for colour in scheme.colours])
+        scheme.reorder(ordering.distinct_order(rgb, ordering.all_conditions, seed=scheme.seed))
+        stages["order"] = time.perf_counter() - start
+        return stages
+
+    def _cancel_generation(self):
+        """Cancel the current background generation, if there is one."""
+        if self._generation is not None:
+            future, cancel, _ = self._generation
+            future.cancel()  # in case it hasn't started yet
+            cancel.set()  # and in case it has
+            self._generation = None
+            self.picker.set_busy(False)
+
+    def _check_generation(self, generation):
+        """Apply the result of a background generation once it's ready."""
+        # ignore anything that has been superseded
+        if generation is not self._generation:
+            return
+
+        future, _, scheme = generation
+        if not future.done():
+            self.after(self.poll_interval, self._check_generation, generation)
+            return
+
+        self._generation = None
+        self.picker.set_busy(False)
 
         # and then draw them
-        if not first:
-            self.viewer._draw()
+        stages = future.result()
+        if stages is not None:
+            for stage, seconds in stages.items():
+                self.tracer.add(stage, seconds)
+            self.scheme = scheme
+            with self.tracer.stage("draw swatches"):
+                self.viewer._draw()
+            self._record()
+        self.tracer.finish(self)
 
 
 class ViewOptions(tkinter.LabelFrame):
@@ -485,6 +1091,7 @@ class ViewOptions(tkinter.LabelFrame):
                                           command=lambda x="tritanomaly": self._selected(x))
         self.tritanopia = tkinter.Button(self, text="Tritanopia (0.015%)",
                                          command=lambda x="tritanopia": self._selected(x))
+        self.compare = tkinter.ttk.Button(self, text="Compare All", command=self._compare)
 
         self.buttons = [self.normal,
                         self.greyscale,
@@ -513,9 +1120,10 @@ class ViewOptions(tkinter.LabelFrame):
                                  {"condition": "tritan", "anomalise": True, "_hex": True},
                                  {"condition": "tritan", "anomalise": False, "_hex": True}]
 
-        # define normal to be selected first
+        # define normal to be selected first (the swatches start out normal and there's no plot yet, so this
+        # is just the button, and isn't an action to trace)
         self.selected = "normal"
-        self._selected("normal")
+        self.buttons[self.index[self.selected]].config(relief="sunken")
 
         # now do the grid things
         for i in range(4):
@@ -527,6 +1135,7 @@ class ViewOptions(tkinter.LabelFrame):
         for j in range(2):
             for i in range(4):
                 self.buttons[j + i * 2].grid(column=i, row=j, sticky='nsew')
+        self.compare.grid(column=0, row=2, columnspan=4, sticky='nsew')
 
     def _selected(self, event):
         """Signal the change in selection."""
@@ -536,10 +1145,23 @@ class ViewOptions(tkinter.LabelFrame):
 
         # make sure this is tracked
         self.selected = event
+        tracer = self.parent.tracer
+        tracer.begin("view " + event)
 
         # we also need to make sure that we update the colours
-        self.parent.colours.viewer.update_colours(**self.colourblind_args[self.index[self.selected]])
+        with tracer.stage("recolour swatches"):
+            self.parent.colours.viewer.update_colours(**self.colourblind_args[self.index[self.selected]])
         self.parent.plot.make_plot()
+        tracer.finish(self)
+
+    def _compare(self):
+        """Show the plot under all of the viewing conditions side by side."""
+        image = self.parent.plot.render()
+        if image is None:
+            return
+
+        titles = {name: self.buttons[index].cget("text") for name, index in self.index.items()}
+        CompareWindow(self, image, titles)
 
 
 class PlotLayoutIntroduction(tkinter.Frame):
@@ -568,6 +1190,7 @@ class PlotLayout(tkinter.ttk.LabelFrame):
         # make a local copy of the plot
         self.plot = self.parent.plot
         self.data = None
+        self.first_row = 0  # the row of the file that the data starts at (once a followed file has scrolled)
 
         # self.label_frame = tkinter.ttk.LabelFrame(self, text="Plot Layout")
         self.header = PlotLayoutHeader(self)
@@ -583,7 +1206,7 @@ class PlotLayout(tkinter.ttk.LabelFrame):
         self.frame.grid_rowconfigure(1, weight=1)
         self.frame.grid_rowconfigure(2, weight=1)
 
-        self.plot_button = tkinter.ttk.Button(self.frame, text="Plot", command=self.plot.make_plot)
+        self.plot_button = tkinter.ttk.Button(self.frame, text="Plot", command=self._plot)
         self.xlim_low = tkinter.ttk.Entry(self.frame, width=10)
         self.xlim_high = tkinter.ttk.Entry(self.frame, width=10)
         self.xlim_to = tkinter.ttk.Label(self.frame, text="to", width=2, anchor="center")
@@ -596,7 +1219,19 @@ class PlotLayout(tkinter.ttk.LabelFrame):
         # make the introduction here
         self.intro = PlotLayoutIntroduction(self.top_frame)
 
+        # the entries go in a scrolling frame, as there can be as many of them as there are series
         self.entries = []
+        self.entry_canvas = tkinter.Canvas(self, highlightthickness=0, height=150)
+        self.entry_scroll = tkinter.ttk.Scrollbar(self, orient="vertical", command=self.entry_canvas.yview)
+        self.entry_canvas.config(yscrollcommand=self.entry_scroll.set)
+        self.entry_frame = tkinter.Frame(self.entry_canvas)
+        self.entry_window = self.entry_canvas.create_window(0, 0, anchor="nw", window=self.entry_frame)
+        self.entry_frame.bind("<Configure>", self._entries_resized)
+        self.entry_canvas.bind("<Configure>", self._canvas_resized)
+
+        self.entry_buttons = tkinter.Frame(self)
+        self.add_button = tkinter.ttk.Button(self.entry_buttons, text="Add series", command=self.add_entry)
+        self.remove_button = tkinter.ttk.Button(self.entry_buttons, text="Remove series", command=self.remove_entry)
 
         # self.label_frame.pack(side="top", fill="both", expand=True)
         # do the grid things
@@ -614,10 +1249,45 @@ class PlotLayout(tkinter.ttk.LabelFrame):
         self.frame.pack(side="right", fill="both", expand=True)
         self.intro.pack(side="left", fill="x", expand=True)
         self.header.pack(side="top", fill="x", expand=True)
+        self.entry_buttons.pack(side="bottom", fill="x")
+        self.add_button.pack(side="left", fill="x", expand=True)
+        self.remove_button.pack(side="left", fill="x", expand=True)
+        self.entry_scroll.pack(side="right", fill="y")
+        self.entry_canvas.pack(side="top", fill="both", expand=True)
 
         for i in range(5):
-            self.entries.append(PlotLayoutEntry(self))
-            self.entries[i].pack(side="top", fill="x", expand=True)
+            self.add_entry()
+
+    def add_entry(self):
+        """Add another series to the layout."""
+        entry = PlotLayoutEntry(self.entry_frame)
+        entry.pack(side="top", fill="x", expand=True)
+        self.entries.append(entry)
+        self.remove_button.state(["!disabled"])
+
+        return entry
+
+    def remove_entry(self):
+        """Remove the last series from the layout (keeping at least one)."""
+        if len(self.entries) > 1:
+            self.entries.pop().destroy()
+        if len(self.entries) == 1:
+            self.remove_button.state(["disabled"])
+
+    def _entries_resized(self, event):
+        """Let the canvas scroll over all of the entries."""
+        self.entry_canvas.config(scrollregion=self.entry_canvas.bbox("all"))
+
+    def _canvas_resized(self, event):
+        """Stretch the entries across the canvas."""
+        self.entry_canvas.itemconfigure(self.entry_window, width=event.width)
+
+    def _plot(self):
+        """Plot the data as laid out, tracing how long it takes."""
+        tracer = self.parent.tracer
+        tracer.begin("plot")
+        self.plot.make_plot()
+        tracer.finish(self)
 
     def _make_plot(self):
         """Create the plot."""
@@ -628,9 +1298,19 @@ class PlotLayout(tkinter.ttk.LabelFrame):
                 pass
 
 
+@functools.lru_cache(maxsize=None)
+def _cone_sensitivity():
+    """Read the cone sensitivity curves used for the logo (only once)."""
+    return numpy.genfromtxt("files/cone_sensitivity.csv", delimiter=",", names=True)
+
+
 class PlotRegion(tkinter.ttk.LabelFrame):
     """A region for the plot to go in."""
 
+    path_length = 3000  # the most vertices to draw as a single path (Agg struggles with much longer ones)
+    block_rows = 10000  # the rows of data drawn by each block of collections
+    best_legend_points = 100000  # finding the best place for the legend means checking it against every point
+
     def __init__(self, parent, *args, **kwargs):
         # first let's make sure we do the frame things
         tkinter.ttk.LabelFrame.__init__(self, parent, *args, **kwargs)
@@ -638,28 +1318,41 @@ class PlotRegion(tkinter.ttk.LabelFrame):
         self.parent = parent
         self.layout = None
 
-        # let's create the figure
-        self.figure = matplotlib.pyplot.figure(frameon=False)
+        # the figure is made once the window has been drawn, in the meantime we just hold the space
+        self.figure = None
+        self.canvas = tkinter.Frame(self, bg="white")
+        self.canvas.pack(side="left", fill="both", expand=True)
+
+        # this is where we define the plot values, the series are read from the layout entries and all drawn
+        # through the collections of each block of rows
+        self.series = []
+        self.marker_styles = {}
+        self.blocks = []
+
+        self.after_idle(self._make_figure)
+
+    def _make_figure(self):
+        """Create the figure (without pyplot, which we'd only be paying to import)."""
+        import matplotlib.figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+        self.figure = matplotlib.figure.Figure(frameon=False)
         self.ax = self.figure.add_subplot(1, 1, 1)
         # self.ax.axis("off")
 
         self._canvas = FigureCanvasTkAgg(self.figure, master=self)
         self._canvas.draw()
 
+        self.canvas.destroy()
         self.canvas = self._canvas.get_tk_widget()
         self.canvas.pack(side="left", fill="both", expand=True)
 
-        # this is where we define the plot values
-        self.lines = []
-        self.points = []
-        self.errors = []
-
         self._make_default()
 
     def _make_default(self):
         """Create the logo as the default plot."""
         # read in the data
-        data = numpy.genfromtxt("files/cone_sensitivity.csv", delimiter=",", names=True)
+        data = _cone_sensitivity()
 
         self.ax.plot(data["x"][data["x"] < 600], data["S"][data["x"] < 600], label="S", color='b', alpha=0.5)
         self.ax.plot(data["x"], data["M"], label="M", color="g", alpha=0.5)
@@ -674,82 +1367,75 @@ class PlotRegion(tkinter.ttk.LabelFrame):
         self.ax.legend()
         self._canvas.draw()
 
-    def make_plot(self):
-        """Make the given plot."""
+    def render(self):
+        """Return the plot as an RGB image, as it appears with no colour deficiency."""
+        if self.figure is None:
+            return None
+
+        # only replot if the colours on screen have been changed
+        viewer = self.parent.view
+        if viewer.selected != "normal" and self.layout is not None:
+            self.make_plot(viewer.colourblind_args[viewer.index["normal"]])
+            image = numpy.array(self._canvas.buffer_rgba())[..., :3]
+            self.make_plot()
+            return image
+
+        self._canvas.draw()
+        return numpy.array(self._canvas.buffer_rgba())[..., :3]
+
+    def make_plot(self, colourblind_args=None):
+        """Make the given plot (viewed with the given colourblind arguments, or the selected ones).
+
+        However many series there are, everything is drawn with a handful of collections: one for the lines,
+        one for the error bars and one for each kind (and colour) of marker, for each block of rows.
+        """
+        # without any data (or a figure) there's nothing to plot, so leave the logo where it is
+        if self.figure is None or self.parent.plot_layout.data is None:
+            return
+        start = time.perf_counter()
+
+        import matplotlib.lines
+        import matplotlib.markers
+
         # first clear the plotables and the axes
-        self.lines = []
-        self.points = []
-        self.errors = []
         self.ax.cla()
-
         self.layout = self.parent.plot_layout
-        use_legend = False
+
+        # and how to view the colours
+        if colourblind_args is None:
+            viewer = self.parent.view
+            colourblind_args = viewer.colourblind_args[viewer.index[viewer.selected]]
 
         # now figure out which elements we plot
-        for entry in self.layout.entries:
-            if entry.colour_choice.get() != "":
-                # then we have a valid plot choice
-                # and we can start to make the plot
-                # first up figure out the colour we can use
-                colour = colours.Colourblind(self.parent.colours.scheme.colours[int(entry.colour_choice.get())].rgb,
-                                             linear=False)
-
-                # and how to view that colour
-                viewer = self.parent.view
-                effective_colour = colour.as_though(**viewer.colourblind_args[viewer.index[viewer.selected]])
-                # check the legend
-                label = None
-                if entry.legend.get() != "":
-                    label = entry.legend.get()
-                    use_legend = True
-
-                # now check if we are using error bars or not
-                if entry.x_err.get() != "" or entry.y_err.get() != "":
-                    if entry.x_err.get() == "":
-                        x_errors = None
-                        y_errors = self.layout.data[:, int(entry.y_err.get())]
-                    else:
-                        y_errors = None
-                        x_errors = self.layout.data[:, int(entry.y_err.get())]
-
-                    # make the plot and store the result
-                    self.errors.append(self.ax.errorbar(self.layout.data[:, int(entry.x.get())],
-                                                        self.layout.data[:, int(entry.y.get())],
-                                                        yerr=y_errors,
-                                                        xerr=x_errors,
-                                                        # markerfacecolor=effective_colour,
-                                                        # markeredgecolor=effective_colour,
-                                                        color=effective_colour,
-                                                        ecolor=effective_colour,
-                                                        marker=entry.pointstyle,
-                                                        markersize=10,
-                                                        linestyle=entry.linestyle,
-                                                        fillstyle=entry.fillstyle,
-                                                        label=label))
-                else:
-                    # we don't have errors
-                    # in this case we will just check lines for this moment
-                    if entry.x.get() == "":
-                        self.lines.append(self.ax.plot(self.layout.data[:, int(entry.y.get())],
-                                                       color=effective_colour,
-                                                       label=label,
-                                                       marker=entry.pointstyle,
-                                                       linestyle=entry.linestyle,
-                                                       fillstyle=entry.fillstyle,
-                                                       markersize=10))
-                    else:
-                        self.lines.append(self.ax.plot(self.layout.data[:, int(entry.x.get())],
-                                                       self.layout.data[:, int(entry.y.get())],
-                                                       color=effective_colour,
-                                                       label=label,
-                                                       marker=entry.pointstyle,
-                                                       linestyle=entry.linestyle,
-                                                       fillstyle=entry.fillstyle,
-                                                       markersize=10))
-
-        # make the legend
-        if use_legend:
-            self.ax.legend()
+        self.series = [series for series in (self._series(entry, colourblind_args)
+                                             for entry in self.layout.entries) if series is not None]
+
+        # the series share the colours of the scheme, and markers are drawn much faster when all of a
+        # collection is the same colour
+        self.marker_styles = {}
+        for series in self.series:
+            key = (series["marker"], series["fillstyle"], series["colour"])
+            if series["marker"] == "None" or key in self.marker_styles:
+                continue
+            if matplotlib.markers.MarkerStyle(series["marker"]).is_filled():
+                style = {"edgecolors": series["colour"],
+                         "facecolors": series["colour"] if series["fillstyle"] == "full" else "none"}
+            else:
+                # line markers (like x and +) are only ever drawn in their face colour
+                style = {"color": series["colour"]}
+            self.marker_styles[key] = dict(style, marker=series["marker"], s=100, zorder=3)
+
+        self.blocks = []
+        self._update_blocks(self.layout.data, self.layout.first_row)
+
+        # make the legend, which needs a stand in for each labelled series as they've all been merged
+        handles = [matplotlib.lines.Line2D([], [], color=series["colour"], marker=series["marker"],
+                                           linestyle=series["linestyle"], fillstyle=series["fillstyle"],
+                                           markersize=10, label=series["label"])
+                   for series in self.series if series["label"] is not None]
+        if handles:
+            points = len(self.series) * self.layout.data.shape[0]
+            self.ax.legend(handles=handles, loc="best" if points < self.best_legend_points else "upper right")
 
         # now check the limits
         if self.layout.xlim_low.get() != "":
@@ -760,9 +1446,158 @@ class PlotRegion(tkinter.ttk.LabelFrame):
             self.ax.set_ylim(bottom=float(self.layout.ylim_low.get()))
         if self.layout.ylim_high.get() != "":
             self.ax.set_ylim(top=float(self.layout.ylim_high.get()))
+        self.parent.tracer.add("plot", time.perf_counter() - start)
 
         # and draw the values
-        self._canvas.draw()
+        with self.parent.tracer.stage("canvas draw"):
+            self._canvas.draw()
+
+    def _series(self, entry, colourblind_args):
+        """Read a layout entry into the description of a series (None if it's not in use)."""
+        if entry.colour_choice.get() == "":
+            return None
+
+        def column(field):
+            return None if field.get() == "" else int(field.get())
+
+        # figure out the colour we can use, as it'll be seen
+        colour = colours.Colourblind(self.parent.colours.scheme.colours[int(entry.colour_choice.get())].rgb,
+                                     linear=False)
+        return {"colour": colour.as_though(**colourblind_args),
+                "x": column(entry.x),
+                "y": column(entry.y),
+                "x_err": column(entry.x_err),
+                "y_err": column(entry.y_err),
+                "marker": entry.pointstyle,
+                "linestyle": entry.linestyle,
+                "fillstyle": entry.fillstyle,
+                "label": entry.legend.get() or None}
+
+    def _make_block(self, start):
+        """Add an empty block of collections for the rows from start on."""
+        import matplotlib.collections
+
+        # the error bars go underneath the lines, which go underneath the markers
+        block = {"start": start, "first": start, "end": start, "limits": None,
+                 "errors": matplotlib.collections.LineCollection([], zorder=1),
+                 "lines": matplotlib.collections.LineCollection([], zorder=2),
+                 "markers": {key: self.ax.scatter([], [], **style) for key, style in self.marker_styles.items()}}
+        self.ax.add_collection(block["errors"])
+        self.ax.add_collection(block["lines"])
+        self.blocks.append(block)
+
+        return block
+
+    def _remove_block(self, block):
+        """Take a block's collections off the axes."""
+        for collection in [block["errors"], block["lines"]] + list(block["markers"].values()):
+            collection.remove()
+
+    def _xy(self, series, data, rows, first_row):
+        """Return the x and y values of a series for a slice of the data (x defaults to the row in the file)."""
+        y = data[rows, series["y"]]
+        if series["x"] is None:
+            return numpy.column_stack([numpy.arange(rows.start, rows.stop) + first_row, y])
+        return numpy.column_stack([data[rows, series["x"]], y])
+
+    def _fill_block(self, block, data, first_row):
+        """Fill a block's collections with its rows of the data (which starts at row first_row of the file)."""
+        first = max(block["start"], first_row)
+        end = min(block["start"] + self.block_rows, first_row + data.shape[0])
+        rows = slice(first - first_row, end - first_row)
+        # the lines start from the last row of the block before so that the blocks join up
+        line_first = max(first - 1, first_row)
+        line_rows = slice(line_first - first_row, end - first_row)
+
+        lines, line_colours, line_styles = [], [], []
+        errors, error_colours = [], []
+        markers = {key: [] for key in block["markers"]}
+        for series in self.series:
+            xy = self._xy(series, data, rows, first_row)
+
+            if series["linestyle"] != "None":
+                # long lines are drawn in pieces, each overlapping the next by a point so they stay joined
+                line = self._xy(series, data, line_rows, first_row)
+                for start in range(0, max(line.shape[0] - 1, 1), self.path_length - 1):
+                    lines.append(line[start:start + self.path_length])
+                    line_colours.append(series["colour"])
+                    line_styles.append(series["linestyle"])
+
+            # the error bars are drawn as a few long paths, broken between the bars by rows of nan
+            bars = []
+            if series["x_err"] is not None:
+                bars.append(numpy.stack([xy - [1, 0] * data[rows, series["x_err"], None],
+                                         xy + [1, 0] * data[rows, series["x_err"], None]], axis=1))
+            if series["y_err"] is not None:
+                bars.append(numpy.stack([xy - [0, 1] * data[rows, series["y_err"], None],
+                                         xy + [0, 1] * data[rows, series["y_err"], None]], axis=1))
+            if bars:
+                bars = numpy.concatenate(bars)
+                gaps = numpy.full((bars.shape[0], 1, 2), numpy.nan)
+                bars = numpy.concatenate([bars, gaps], axis=1)
+                for start in range(0, bars.shape[0], self.path_length // 3):
+                    errors.append(bars[start:start + self.path_length // 3].reshape(-1, 2))
+                    error_colours.append(series["colour"])
+
+            if series["marker"] != "None":
+                markers[(series["marker"], series["fillstyle"], series["colour"])].append(xy)
+
+        block["lines"].set_segments(lines)
+        block["lines"].set_color(line_colours)
+        block["lines"].set_linestyle(line_styles or "solid")
+        block["errors"].set_segments(errors)
+        block["errors"].set_color(error_colours)
+        for key, offsets in markers.items():
+            block["markers"][key].set_offsets(numpy.concatenate(offsets))
+
+        # collections aren't included by relim, so keep track of the extent of each block ourselves
+        pieces = [piece for piece in lines + errors + [offset for offsets in markers.values() for offset in offsets]
+                  if piece.size]
+        block["limits"] = None
+        if pieces:
+            block["limits"] = (numpy.nanmin([numpy.nanmin(piece, axis=0) for piece in pieces], axis=0),
+                               numpy.nanmax([numpy.nanmax(piece, axis=0) for piece in pieces], axis=0))
+        # (the first row used, joining row and all, tells us when the block needs refilling as the data scrolls)
+        block["first"], block["end"] = line_first, end
+
+    def _update_blocks(self, data, first_row):
+        """Bring the blocks up to date with the data (which starts at row first_row of the file).
+
+        Blocks that have scrolled out of the data are dropped and only the first and last blocks are refilled,
+        so following a file costs the same however much of it is being shown.
+        """
+        end = first_row + data.shape[0]
+        while self.blocks and self.blocks[0]["end"] <= first_row:
+            self._remove_block(self.blocks.pop(0))
+        if self.blocks and self.blocks[0]["first"] < first_row:
+            self._fill_block(self.blocks[0], data, first_row)
+        if self.blocks and self.blocks[-1]["end"] < min(self.blocks[-1]["start"] + self.block_rows, end):
+            self._fill_block(self.blocks[-1], data, first_row)
+
+        # and then any new blocks (starting on a multiple of the block size so they line up as the file grows)
+        if self.blocks:
+            start = self.blocks[-1]["start"] + self.block_rows
+        else:
+            start = first_row - first_row % self.block_rows
+        for start in range(start, end, self.block_rows):
+            self._fill_block(self._make_block(start), data, first_row)
+
+        limits = [block["limits"] for block in self.blocks if block["limits"] is not None]
+        if limits:
+            self.ax.ignore_existing_data_limits = True
+            self.ax.update_datalim([numpy.min([low for low, _ in limits], axis=0),
+                                    numpy.max([high for _, high in limits], axis=0)])
+        self.ax.autoscale_view()
+
+    def extend_plot(self):
+        """Update the existing collections with the latest data rather than replotting."""
+        if self.layout is None or not self.series:
+            self.make_plot()
+            return
+
+        # let the axes follow the data (fixed limits have already turned this off)
+        self._update_blocks(self.layout.data, self.layout.first_row)
+        self._canvas.draw_idle()
 
 
 class PlotLayoutEntry(tkinter.Frame):
@@ -916,12 +1751,47 @@ class Slider(tkinter.Frame):
                 self.parent.low.value.set(round(float(value)))
 
 
+# what each slider's preview shows: its own quantity runs down the image (high at the top, like the slider),
+# the first of these runs across it over its current limits and the second is held at the middle of its limits
+# (hue is never held, the middle of a wide hue range is just one colour out of all of those selected)
+_slider_slices = {"hue": ("chroma", "light"),
+                  "chroma": ("hue", "light"),
+                  "light": ("hue", "chroma")}
+_slider_ranges = {"hue": (0, 360), "chroma": (0, 100), "light": (0, 100)}
+_slider_mask = numpy.array([217, 217, 217])  # the window background, for the colours sRGB can't show
+
+
+@functools.lru_cache(maxsize=256)
+def _slider_preview(kind, limits, width, height):
+    """Return the preview for a slider as PPM image data, given the (low, high) hue, chroma and light limits.
+
+    Colours outside of sRGB are masked out, and those outside the slider's own limits are faded.
+    """
+    limits = dict(zip(("hue", "chroma", "light"), limits))
+    across, held = _slider_slices[kind]
+    values = {kind: numpy.linspace(*_slider_ranges[kind][::-1], height)[:, None],
+              across: numpy.linspace(*limits[across], width)[None, :],
+              held: numpy.mean(limits[held])}
+
+    lab = colours.hcl_to_lab(values["hue"], values["chroma"], values["light"])
+    rgb = colours.lab_to_rgb(lab)
+    selected = (values[kind] >= limits[kind][0]) & (values[kind] <= limits[kind][1])
+    rgb = numpy.where(selected[..., None], rgb, (rgb + _slider_mask) / 2)
+    rgb = numpy.where(colours.in_gamut(lab)[..., None], rgb, _slider_mask)
+
+    return b"P6 %d %d 255\n" % (width, height) + numpy.round(rgb).astype(numpy.uint8).tobytes()
+
+
 class SliderImage(tkinter.Frame):
-    """A frame containing a reference image for a set of sliders."""
+    """A frame containing a preview of the colours a set of sliders covers."""
+
+    width = 24
+    height = 120
 
-    def __init__(self, parent, file, *args, **kwargs):
+    def __init__(self, parent, kind, *args, **kwargs):
         tkinter.Frame.__init__(self, parent, *args, **kwargs)
-        self._image = tkinter.PhotoImage(master=self, file=file)
+        self.kind = kind
+        self._image = tkinter.PhotoImage(master=self, width=self.width, height=self.height)
         self.image = tkinter.Label(self, image=self._image)
         self.image.image = self._image
 
@@ -930,11 +1800,15 @@ class SliderImage(tkinter.Frame):
         self.label.pack(side="top", expand=True, pady=5)
         self.image.pack(side="top", fill="both", expand=True)
 
+    def show(self, limits):
+        """Show the colours covered by the given hue, chroma and light limits."""
+        self._image.configure(data=_slider_preview(self.kind, limits, self.width, self.height), format="PPM")
+
 
 class Sliders(tkinter.Frame):
     """A frame containing a high and low slider."""
 
-    def __init__(self, parent, low, high, file, *args, **kwargs):
+    def __init__(self, parent, low, high, kind, *args, **kwargs):
         tkinter.Frame.__init__(self, parent, *args, **kwargs)
         self.parent = parent
         self.config(relief="sunken")
@@ -947,7 +1821,7 @@ class Sliders(tkinter.Frame):
         self.high = Slider(self, high, low)
 
         # self.dumb_shit = tkinter.Image(self, file="./images/hue_slider.png")
-        self.middle = SliderImage(self, file)
+        self.middle = SliderImage(self, kind)
         self.low.value.set(low)
         self.high.value.set(high)
 
@@ -961,8 +1835,8 @@ class Sliders(tkinter.Frame):
 class MainApplication(tkinter.Frame):
     """The MainApplication defines the frame for the application."""
 
-    def __init__(self, parent, *args, **kwargs):
-        """Initialise an instance."""
+    def __init__(self, parent, *args, trace_file=None, **kwargs):
+        """Initialise an instance (writing a trace of each action to the trace file if given)."""
         # first make sure we do the super-initialisation
         tkinter.Frame.__init__(self, parent, *args, **kwargs)
         # set the name of the application
@@ -979,27 +1853,43 @@ class MainApplication(tkinter.Frame):
         self.grid_rowconfigure(0, weight=1)
         self.grid_rowconfigure(1, weight=1)
 
+        # every action is timed, with the latest shown at the bottom
+        self.status = tkinter.ttk.Label(self, anchor="w")
+        self.tracer = ActionTracer(self._show_trace, trace_file)
+
         # add things
         self.colours = ColourRegion(self, height=450, width=750)
         self.plot = PlotRegion(self, height=750, width=750)
         self.plot_layout = PlotLayout(self, height=450, width=750, text="Plot Layout")
         self.view = ViewOptions(self, height=150, width=750, text="Viewing Options")
 
-        # add some beautification and consistent branding
-        self.plot._make_default()
-
         # now do some geometry management
         self.colours.grid(column=0, row=0, sticky="nsew")
         self.plot_layout.grid(column=0, row=1, sticky="nsew")
         self.plot.grid(column=1, row=0, sticky="nsew")
         self.view.grid(column=1, row=1, sticky="nsew")
+        self.status.grid(column=0, row=2, columnspan=2, sticky="ew")
+
+        # only start generating the first colours (with the default preset) once the window is up
+        self.after_idle(self.colours.reroll)
+
+    def _show_trace(self, record):
+        """Show the timing of the latest action in the status bar."""
+        stages = ", ".join("{} {:.0f} ms".format(stage, 1000 * seconds) for stage, seconds in record["stages"].items())
+        self.status.config(text="{}: {:.0f} ms{}".format(record["action"], 1000 * record["total"],
+                                                          " ({})".format(stages) if stages else ""))
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="A colour scheme generating application.")
+    parser.add_argument("--trace", type=argparse.FileType("a"),
+                        help="file to write the timing of each action to, as JSON lines")
+    args = parser.parse_args()
+
     # first initialise the application root
     root = tkinter.Tk()
 
     # now make the application
-    app = MainApplication(root)
+    app = MainApplication(root, trace_file=args.trace)
 
     root.mainloop()
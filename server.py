@@ -0,0 +1,185 @@
+"""
+A local palette generation service.
+
+Serves colour schemes and colourblind simulations as JSON over HTTP, so every program on the host shares one
+pool of warm worker processes and one cache of results rather than each spreading its own points.
+
+    POST /scheme    {"n": 10, "preset": "Colourblind Friendly", "seed": 3}
+                    -> {"n": 10, ..., "seed": 3, "colours": ["#...", ...]}
+    POST /simulate  {"colours": ["#...", ...], "condition": "deuteranopia"}
+                    -> {"condition": "deuteranopia", "colours": ["#...", ...]}
+    GET  /health    -> {"status": "ok", "cached": 12, "in_flight": 1}
+
+Schemes take the same options as `python -m colours`. A scheme without a seed uses seed 0, so identical
+requests always get (and share) the same palette.
+
+usage: python server.py [--host 127.0.0.1] [--port 8765] [--workers N] [--cache-size 1024]
+"""
+import argparse
+import collections
+import colours
+import concurrent.futures
+import http.server
+import json
+import os
+import threading
+
+
+def _warm(index):
+    """Run a tiny generation so the worker has everything imported and ready."""
+    colours.generate({"n": 2, "seed": index})
+    return os.getpid()
+
+
+class PaletteService():
+    """Generates palettes on a pool of worker processes, sharing the results between identical requests."""
+
+    def __init__(self, workers=None, cache_size=1024):
+        self.workers = workers or os.cpu_count() or 1
+        self.cache_size = cache_size
+
+        self._pool = concurrent.futures.ProcessPoolExecutor(self.workers)
+        self._lock = threading.RLock()  # reentrant as done callbacks can run while we hold it
+        self._in_flight = {}  # request key -> future, for anything currently being computed
+        self._cache = collections.OrderedDict()  # request key -> result, least recently used first
+
+        # get the workers going now rather than on the first requests
+        list(self._pool.map(_warm, range(self.workers)))
+
+    def close(self):
+        """Shut down the worker processes."""
+        self._pool.shutdown(wait=True)
+
+    def stats(self):
+        """Return the current state of the service."""
+        with self._lock:
+            return {"status": "ok", "workers": self.workers, "cached": len(self._cache),
+                    "in_flight": len(self._in_flight)}
+
+    def scheme(self, spec):
+        """Return the palette record for a scheme specification."""
+        spec = colours._resolve_spec(spec)
+        if spec["seed"] is None:
+            spec["seed"] = 0
+
+        key = ("scheme", json.dumps(spec, sort_keys=True))
+        return self._get(key, colours._generate_record, spec)
+
+    def simulate(self, request):
+        """Return the colours in the request as though viewed with its condition."""
+        name = request.get("condition", "normal")
+        if name not in colours._conditions:
+            raise ValueError("unknown condition {!r}, choose from {}".format(name, ", ".join(colours._conditions)))
+
+        # this is quick enough (and vectorised) that it isn't worth sending to the pool
+        condition, anomalise = colours._conditions[name]
+        simulated = colours.simulate(colours._hex_to_rgb(request.get("colours", [])), condition, anomalise)
+
+        return {"condition": name, "colours": colours._rgb_to_hex(simulated)}
+
+    def _get(self, key, function, *args):
+        """Get the result from the cache, an identical request in flight, or a new job on the pool."""
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+            future = self._in_flight.get(key)
+            if future is None:
+                future = self._pool.submit(function, *args)
+                self._in_flight[key] = future
+                future.add_done_callback(lambda done: self._finish(key, done))
+
+        return future.result()
+
+    def _finish(self, key, future):
+        """Move a finished job into the cache."""
+        with self._lock:
+            self._in_flight.pop(key, None)
+            if future.cancelled() or future.exception() is not None:
+                return
+
+            self._cache[key] = future.result()
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+
+class PaletteHandler(http.server.BaseHTTPRequestHandler):
+    """Handle the requests for the palette service."""
+
+    def do_GET(self):
+        """Report on the service."""
+        if self.path != "/health":
+            self._respond(404, {"error": "unknown path {}".format(self.path)})
+            return
+
+        self._respond(200, self.server.service.stats())
+
+    def do_POST(self):
+        """Generate or simulate palettes."""
+        routes = {"/scheme": self.server.service.scheme,
+                  "/simulate": self.server.service.simulate}
+        if self.path not in routes:
+            self._respond(404, {"error": "unknown path {}".format(self.path)})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length).decode("utf-8") or "{}")
+            if not isinstance(request, dict):
+                raise ValueError("the request should be a JSON object")
+            self._respond(200, routes[self.path](request))
+        except (ValueError, TypeError) as error:
+            self._respond(400, {"error": str(error)})
+        except Exception as error:
+            # anything else is our fault (like the pool of workers breaking), not the request's, but the client
+            # still deserves an answer rather than a dropped connection
+            self.send_error(500, "Palette generation failed", "{}: {}".format(type(error).__name__, error))
+
+    def _respond(self, status, body):
+        """Send the body back as JSON."""
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        """Keep quiet unless asked otherwise."""
+        if self.server.verbose:
+            http.server.BaseHTTPRequestHandler.log_message(self, format, *args)
+
+
+def serve(host="127.0.0.1", port=8765, workers=None, cache_size=1024, verbose=False):
+    """Create the server (use port 0 to pick any free port, see server.server_address)."""
+    server = http.server.ThreadingHTTPServer((host, port), PaletteHandler)
+    server.daemon_threads = True
+    server.verbose = verbose
+    server.service = PaletteService(workers, cache_size)
+
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve colour palettes to everything on this host.")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--port", type=int, default=8765, help="port to listen on")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes")
+    parser.add_argument("--cache-size", type=int, default=1024, help="number of palettes to keep")
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    args = parser.parse_args(argv)
+
+    server = serve(args.host, args.port, args.workers, args.cache_size, args.verbose)
+    print("serving palettes on http://{}:{}".format(*server.server_address[:2]))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.service.close()
+
+
+if __name__ == "__main__":
+    main()
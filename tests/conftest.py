@@ -0,0 +1,7 @@
+import os
+import sys
+
+# the tests import the modules straight from the repository, like the benchmarks do
+_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _root not in sys.path:
+    sys.path.insert(0, _root)
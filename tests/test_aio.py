@@ -0,0 +1,59 @@
+import aio
+import asyncio
+import pytest
+import threading
+
+
+@pytest.fixture
+def one_at_a_time(monkeypatch):
+    monkeypatch.setattr(aio, "_executor", None)
+    monkeypatch.setattr(aio, "_max_concurrency", None)
+    aio.configure(max_workers=2, max_concurrency=1)
+    yield
+    aio._executor.shutdown(wait=False)
+
+
+def test_cancelled_job_holds_its_place_until_it_stops(one_at_a_time):
+    """A cancelled job that's still running shouldn't let another start alongside it."""
+    started = threading.Event()
+    finish = threading.Event()
+
+    def slow(cancel):
+        started.set()
+        finish.wait(5)
+        return "slow"
+
+    def quick(cancel):
+        return "quick"
+
+    async def run():
+        first = asyncio.ensure_future(aio._run(slow))
+        while not started.is_set():
+            await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+
+        second = asyncio.ensure_future(aio._run(quick))
+        await asyncio.sleep(0.2)
+        assert not second.done()
+
+        finish.set()
+        assert await asyncio.wait_for(second, 5) == "quick"
+
+    asyncio.run(run())
+
+
+def test_cancelled_before_starting_frees_its_place(one_at_a_time):
+    async def run():
+        finish = threading.Event()
+        first = asyncio.ensure_future(aio._run(lambda cancel: finish.wait(5)))
+        second = asyncio.ensure_future(aio._run(lambda cancel: "second"))
+        await asyncio.sleep(0.05)
+        second.cancel()
+        finish.set()
+        await first
+
+        assert await asyncio.wait_for(aio._run(lambda cancel: "third"), 5) == "third"
+
+    asyncio.run(run())
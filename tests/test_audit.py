@@ -0,0 +1,57 @@
+import audit
+import colours
+import json
+import numpy
+import pytest
+
+
+def _palettes(seed=0):
+    random = numpy.random.default_rng(seed)
+    sizes = list(random.integers(1, 12, 60)) + [200]
+    return [random.integers(0, 256, (size, 3)) for size in random.permutation(sizes)]
+
+
+def test_chunks_fit_the_budget(monkeypatch):
+    """A long palette shouldn't pad out the short ones, each chunk's differences fit the budget."""
+    monkeypatch.setattr(audit, "_memory_budget", 50 * 12**2 * audit._bytes_per_pair)
+    palettes = _palettes()
+
+    chunks = list(audit._chunks(palettes))
+    assert sorted(index for chunk in chunks for index in chunk) == list(range(len(palettes)))
+    for chunk in chunks:
+        size = max(len(palettes[index]) for index in chunk)
+        assert len(chunk) == 1 or len(chunk) * size**2 * audit._bytes_per_pair <= audit._memory_budget
+
+
+def test_chunking_doesnt_change_results(monkeypatch):
+    palettes = _palettes()
+    whole = audit.audit(palettes, ["normal", "deuteranopia"])
+
+    monkeypatch.setattr(audit, "_memory_budget", 1)
+    single = audit.audit(palettes, ["normal", "deuteranopia"])
+
+    for name in whole:
+        numpy.testing.assert_allclose(single[name], whole[name])
+    assert numpy.isinf(whole["normal"][[len(palette) < 2 for palette in palettes]]).all()
+
+
+def test_jsonl_report_is_strict_json(tmp_path):
+    """A palette too small to have a difference gets null rather than Infinity, which isn't JSON."""
+    palettes = tmp_path / "palettes.txt"
+    palettes.write_text("single: #ff0000\npair: #000000, #ffffff\n")
+    report = tmp_path / "report.jsonl"
+    assert audit.main([str(palettes), "--format", "jsonl", "-o", str(report)]) == 0
+
+    def strict(constant):
+        raise ValueError("{} isn't JSON".format(constant))
+
+    records = {record["name"]: record for record in (json.loads(line, parse_constant=strict)
+                                                       for line in report.read_text().splitlines())}
+    assert records["single"]["worst"] is None
+    assert all(records["single"][name] is None for name in colours._conditions)
+    assert records["pair"]["worst"] > 0
+
+
+def test_json_refuses_nan():
+    with pytest.raises(ValueError):
+        audit._to_json({"name": "broken", "worst": float("nan")})
@@ -0,0 +1,84 @@
+import colormaps
+import colours
+import numpy
+import pytest
+
+_maps = [colormaps.sequential(),
+         colormaps.sequential(hue=(0, 360), chroma=(80, 100), light=(20, 80), size=64),
+         colormaps.sequential(size=1024),
+         colormaps.diverging(),
+         colormaps.diverging(hue=(140, 320), chroma=(10, 90), light=(25, 90), size=33)]
+
+
+def _arms(cmap):
+    """Return the parts of the table that are evenly spaced: all of it, or each half of a diverging map."""
+    if cmap.kind == "diverging":
+        middle = cmap.size // 2
+        return cmap.lab[:middle + 1], cmap.lab[middle:]
+    return (cmap.lab,)
+
+
+@pytest.mark.parametrize("cmap", _maps)
+def test_every_entry_is_in_gamut(cmap):
+    assert colours.in_gamut(cmap.lab).all()
+    assert cmap.rgb.min() >= 0 and cmap.rgb.max() <= 1
+
+
+@pytest.mark.parametrize("cmap", _maps)
+def test_neighbours_are_evenly_spaced(cmap):
+    """Every step is the same ΔE (within 1%), even where the path bends to follow the edge of the gamut.
+
+    The two halves of a diverging map are each even, but can have different steps so the middle stays central.
+    """
+    for arm in _arms(cmap):
+        steps = numpy.linalg.norm(numpy.diff(arm, axis=0), axis=-1)
+        numpy.testing.assert_allclose(steps, steps.mean(), rtol=0.01)
+
+
+@pytest.mark.parametrize("cmap", _maps)
+def test_validate(cmap):
+    results = cmap.validate()
+    assert set(results) == set(colours._conditions)
+
+    # the coarse steps of validate are chords across the curve of the path, and whole RGB values, so aren't
+    # perfectly even
+    assert results["normal"]["monotonic"]
+    assert results["normal"]["uniformity"] < 0.1
+
+
+@pytest.mark.parametrize("cmap", [colormaps.sequential(), colormaps.diverging()])
+def test_defaults_stay_monotonic_for_everyone(cmap):
+    # (the greyscale simulation isn't quite CIELab lightness, so a very colourful map can dip a little in it)
+    assert all(result["monotonic"] for result in cmap.validate().values())
+
+
+@pytest.mark.parametrize("chroma", [(0, 60), (10, 90)])
+def test_diverging_halves_meet_in_a_neutral_middle(chroma):
+    cmap = colormaps.diverging(hue=(140, 320), chroma=chroma, light=(25, 90), size=33)
+    numpy.testing.assert_allclose(cmap.lab[cmap.size // 2], [90, 0, 0], atol=1e-9)
+
+
+@pytest.mark.parametrize("cmap", _maps)
+def test_save_round_trips(cmap, tmp_path):
+    path = tmp_path / "cmap.npy"
+    cmap.save(str(path))
+    table = numpy.load(path)
+    assert table.shape == (cmap.size, 3) and table.dtype == numpy.float32
+    numpy.testing.assert_allclose(table, cmap.rgb, atol=1e-6)
+
+
+@pytest.mark.parametrize("cmap", _maps)
+def test_to_matplotlib_round_trips(cmap):
+    listed = cmap.to_matplotlib()
+    assert listed.N == cmap.size
+    assert listed.name == "scheming_" + cmap.kind
+    numpy.testing.assert_allclose(listed(numpy.arange(cmap.size))[:, :3], cmap.rgb)
+    numpy.testing.assert_allclose(listed(numpy.linspace(0, 1, cmap.size))[:, :3], cmap.rgb)
+
+
+@pytest.mark.parametrize("make, limits", [(colormaps.sequential, {"light": (90, 15)}),
+                                          (colormaps.diverging, {"light": (95, 30)}),
+                                          (colormaps.diverging, {"chroma": (60, 0)})])
+def test_limits_are_checked(make, limits):
+    with pytest.raises(ValueError):
+        make(**limits)
@@ -0,0 +1,98 @@
+import colours
+import concurrent.futures
+import history
+import pytest
+import scheming
+import threading
+import time
+import tkinter
+import tkinter.ttk
+import types
+
+
+def _slider(low, high):
+    value = lambda number: types.SimpleNamespace(value=types.SimpleNamespace(get=lambda: number))
+    return types.SimpleNamespace(low=value(low), high=value(high))
+
+
+@pytest.fixture
+def region():
+    """Make a ColourRegion with a generated scheme, without any of the window around it.
+
+    Whatever it schedules with after is kept in region.pending, to be run by _run_pending.
+    """
+    region = scheming.ColourRegion.__new__(scheming.ColourRegion)
+    region._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+    region._generation = None
+    region._preview_job = None
+    region._preview_remaining = 0
+    region.history = history.SchemeHistory()
+    region.records = []
+    region.tracer = scheming.ActionTracer(callback=region.records.append)
+    region.picker = types.SimpleNamespace(num_colours=types.SimpleNamespace(get=lambda: 6),
+                                          hue=_slider(0, 360), chroma=_slider(0, 100), light=_slider(30, 90),
+                                          set_busy=lambda busy: None, set_history=lambda undo, redo: None)
+    region.viewer = types.SimpleNamespace(_draw=lambda: None)
+    region.pending = []
+    region.after = lambda ms, function, *args: region.pending.append((function, args))
+    region.winfo_ismapped = lambda: False
+    region.scheme = colours.ColourScheme(6, seed=0)
+    yield region
+    region._executor.shutdown(wait=True)
+
+
+def _run_pending(region, timeout=30):
+    """Run everything scheduled, and everything that schedules, until nothing is left."""
+    end = time.monotonic() + timeout
+    while region.pending:
+        assert time.monotonic() < end
+        function, args = region.pending.pop(0)
+        function(*args)
+        time.sleep(0.001)
+
+
+def test_preview_spreads_on_the_worker(region, monkeypatch):
+    threads = []
+    spread = colours.Points.spread
+
+    def traced_spread(points, times=200, *args, **kwargs):
+        if times:
+            threads.append(threading.current_thread())
+        return spread(points, times, *args, **kwargs)
+
+    monkeypatch.setattr(colours.Points, "spread", traced_spread)
+    region.tracer.begin("preview")
+    region.preview()
+    _run_pending(region)
+
+    assert len(threads) == region.preview_steps // region.preview_chunk
+    assert threading.main_thread() not in threads
+    assert [record["action"] for record in region.records] == ["preview"]
+    assert "respread" in region.records[0]["stages"]
+    assert len(region.history) == 1
+
+
+def test_reroll_stops_a_preview(region):
+    region.tracer.begin("preview")
+    region.preview()
+    assert region._preview_job is not None
+
+    region.reroll()
+    assert region._preview_job is None and region._preview_remaining == 0
+    _run_pending(region)
+
+    # the preview is cut short and only the generation ends up in the history
+    assert [(record["action"], record.get("interrupted", False)) for record in region.records] == [
+        ("preview", True), ("generate", False)]
+    assert {"generate", "order"} <= set(region.records[1]["stages"])
+    assert len(region.history) == 1
+
+
+@pytest.mark.parametrize("widget, undone", [(tkinter.ttk.Entry, False), (tkinter.Entry, False),
+                                             (tkinter.Spinbox, False), (tkinter.ttk.Spinbox, False),
+                                             (tkinter.ttk.Button, True), (tkinter.Canvas, True)])
+def test_undo_shortcut_leaves_text_boxes_alone(widget, undone):
+    actions = []
+    picker = scheming.ColourPicker.__new__(scheming.ColourPicker)
+    picker._shortcut(lambda: actions.append("undo"), types.SimpleNamespace(widget=widget.__new__(widget)))
+    assert actions == (["undo"] if undone else [])
@@ -0,0 +1,95 @@
+import export
+import io
+import json
+import numpy
+import pytest
+
+_palette = [[255, 0, 16], [1, 2, 3], [128, 64, 200]]
+
+_golden = {"hex": ("#ff0010\n#010203\n#8040c8\n", ""),
+           "rgb": ("(255, 0, 16)\n(1, 2, 3)\n(128, 64, 200)\n", ""),
+           "gnuplot": ('set style line 1 lc "#ff0010"\nset style line 2 lc "#010203"\n'
+                       'set style line 3 lc "#8040c8"\n', ""),
+           "python": ("['#ff0010',\n'#010203',\n'#8040c8']\n", "[]\n"),
+           "css": (":root {\n  --colour-1: #ff0010;\n  --colour-2: #010203;\n  --colour-3: #8040c8;\n}\n",
+                   ":root {\n}\n"),
+           "mplstyle": ("axes.prop_cycle: cycler('color', ['ff0010', '010203', '8040c8'])\n",
+                        "axes.prop_cycle: cycler('color', [])\n"),
+           "json": ('["#ff0010", "#010203", "#8040c8"]\n', "[]\n")}
+
+
+def test_every_text_format_has_a_golden_output():
+    assert set(_golden) == set(export.formats) - {"npy"}
+
+
+@pytest.mark.parametrize("output_format", list(_golden))
+def test_golden_output(output_format):
+    assert export.encode(_palette, output_format).decode() == _golden[output_format][0]
+
+
+@pytest.mark.parametrize("output_format", list(_golden))
+def test_empty_palette(output_format):
+    assert export.encode(numpy.empty((0, 3)), output_format).decode() == _golden[output_format][1]
+
+
+@pytest.mark.parametrize("output_format", list(_golden))
+def test_chunks_join_up(output_format):
+    """Writing a chunk at a time gives exactly what writing it in one go does."""
+    rgb = numpy.random.default_rng(0).integers(0, 256, (25, 3))
+    whole, chunked = io.BytesIO(), io.BytesIO()
+    export.write(rgb, whole, output_format)
+    export.write(rgb, chunked, output_format, chunk_size=4)
+    assert chunked.getvalue() == whole.getvalue()
+
+
+def test_indices_count_across_chunks():
+    lines = export.encode(numpy.zeros((12, 3)), "gnuplot").decode().splitlines()
+    assert [line.split()[3] for line in lines] == [str(index) for index in range(1, 13)]
+
+
+def test_json_and_python_parse():
+    assert json.loads(export.encode(_palette, "json")) == ["#ff0010", "#010203", "#8040c8"]
+    assert eval(export.encode(_palette, "python")) == ["#ff0010", "#010203", "#8040c8"]
+
+
+def test_values_are_rounded_and_clipped():
+    assert export.encode([[300, -5, 127.6]], "rgb") == b"(255, 0, 128)\n"
+
+
+def test_npy(tmp_path):
+    path = tmp_path / "palette.npy"
+    export.save(_palette, str(path))
+    saved = numpy.load(path)
+    assert saved.dtype == numpy.uint8
+    numpy.testing.assert_array_equal(saved, _palette)
+
+    with pytest.raises(ValueError):
+        export.encode(_palette, "npy")
+
+
+def test_batches(tmp_path):
+    text = io.BytesIO()
+    assert export.write_batch([_palette, _palette[:1]], text, "hex") == 2
+    assert text.getvalue() == b"#ff0010\n#010203\n#8040c8\n\n#ff0010\n"
+
+    lines = io.BytesIO()
+    export.write_batch([_palette, []], lines, "json")
+    assert lines.getvalue() == b'["#ff0010", "#010203", "#8040c8"]\n[]\n'
+
+    path = tmp_path / "palettes.npy"
+    with open(path, "wb") as outfile:
+        export.write_batch([_palette, _palette], outfile, "npy")
+    assert numpy.load(path).shape == (2, 3, 3)
+    with pytest.raises(ValueError):
+        export.write_batch([_palette, _palette[:2]], io.BytesIO(), "npy")
+
+
+@pytest.mark.parametrize("path, output_format", [("a.css", "css"), ("b.JSON", "json"), ("c.gp", "gnuplot"),
+                                                 ("d.unknown", "hex"), ("e", "hex")])
+def test_guess_format(path, output_format):
+    assert export.guess_format(path) == output_format
+
+
+def test_unknown_format():
+    with pytest.raises(ValueError):
+        export.encode(_palette, "bmp")
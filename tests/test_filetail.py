@@ -0,0 +1,59 @@
+import numpy
+import scheming
+
+
+def test_load_keeps_last_line_without_newline(tmp_path):
+    path = tmp_path / "data.txt"
+    path.write_text("1 2\n3 4\n5 6")
+
+    data = scheming.FileTail(str(path)).load()
+    assert numpy.array_equal(data, [[1, 2], [3, 4], [5, 6]])
+
+
+def test_read_waits_for_complete_lines(tmp_path):
+    path = tmp_path / "data.txt"
+    path.write_text("1 2\n")
+    tail = scheming.FileTail(str(path))
+    assert numpy.array_equal(tail.load(), [[1, 2]])
+
+    with open(path, "a") as outfile:
+        outfile.write("3 4\n5")
+    assert numpy.array_equal(tail.read(), [[3, 4]])
+
+    with open(path, "a") as outfile:
+        outfile.write(" 6\n")
+    assert numpy.array_equal(tail.read(), [[5, 6]])
+    assert numpy.array_equal(tail.buffer.view(), [[1, 2], [3, 4], [5, 6]])
+
+
+def test_read_skips_blank_lines(tmp_path):
+    path = tmp_path / "data.txt"
+    path.write_text("1 2\n")
+    tail = scheming.FileTail(str(path))
+    tail.load()
+
+    with open(path, "a") as outfile:
+        outfile.write("\n")
+    assert tail.read() is None
+
+    with open(path, "a") as outfile:
+        outfile.write("3 4\n\n")
+    assert numpy.array_equal(tail.read(), [[3, 4]])
+
+
+def test_load_keeps_files_bigger_than_the_capacity(tmp_path):
+    path = tmp_path / "data.txt"
+    path.write_text("".join("{} {}\n".format(row, 2 * row) for row in range(25)))
+    tail = scheming.FileTail(str(path), capacity=10)
+
+    data = tail.load()
+    assert data.shape == (25, 2)
+    assert numpy.array_equal(data[:, 0], numpy.arange(25))
+    assert tail.buffer.dropped == 0
+
+    # following it past that drops the oldest rows, and says how many
+    with open(path, "a") as outfile:
+        outfile.write("25 50\n26 52\n")
+    tail.read()
+    assert tail.buffer.dropped == 2
+    assert numpy.array_equal(tail.buffer.view()[:, 0], numpy.arange(2, 27))
@@ -0,0 +1,23 @@
+import colours
+import json
+
+
+def test_unseeded_palettes_get_distinct_seeds(tmp_path):
+    """Palettes generated across worker processes without a seed shouldn't repeat each other."""
+    output = tmp_path / "palettes.jsonl"
+    assert colours.main(["-n", "3", "--count", "12", "-j", "3", "-o", str(output)]) == 0
+
+    records = [json.loads(line) for line in output.read_text().splitlines()]
+    assert len(records) == 12
+    assert len({record["seed"] for record in records}) == 12
+    assert len({tuple(record["colours"]) for record in records}) == 12
+
+
+def test_recorded_seed_reproduces_palette(tmp_path):
+    output = tmp_path / "palettes.jsonl"
+    assert colours.main(["-n", "3", "--count", "2", "-j", "2", "-o", str(output)]) == 0
+
+    for line in output.read_text().splitlines():
+        record = json.loads(line)
+        scheme = colours.generate({"n": 3, "seed": record["seed"]})
+        assert [colour.hex for colour in scheme.colours] == record["colours"]
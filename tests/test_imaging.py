@@ -0,0 +1,77 @@
+import colours
+import imaging
+import numpy
+import pytest
+
+
+def _image(height=37, width=53, seed=0):
+    """A small odd-sized image, so the tiles don't divide it evenly, with plenty of repeated colours."""
+    random = numpy.random.default_rng(seed)
+    palette = random.integers(0, 256, (40, 3), dtype=numpy.uint8)
+    return palette[random.integers(0, len(palette), (height, width))]
+
+
+@pytest.mark.parametrize("condition", ["deuteranopia", "protanomaly", "tritanopia", "greyscale"])
+def test_tiled_simulation_matches_the_whole_image(condition):
+    image = _image()
+    destination = numpy.zeros_like(image)
+
+    assert imaging.process(image, destination, "simulate", condition, tile=8, workers=3) == 5 * 7
+    expected = colours.simulate(image, *colours._conditions[condition]).astype(numpy.uint8)
+    numpy.testing.assert_array_equal(destination, expected)
+
+
+@pytest.mark.parametrize("condition", ["deuteranopia", "protanopia", "tritanomaly", "normal"])
+def test_tiled_daltonising_matches_the_whole_image(condition):
+    image = _image(seed=1)
+    destination = numpy.zeros_like(image)
+
+    imaging.process(image, destination, "daltonise", condition, tile=16, workers=2)
+    expected = imaging.daltonise(image, *colours._conditions[condition]).astype(numpy.uint8)
+    numpy.testing.assert_array_equal(destination, expected)
+
+
+def test_daltonise():
+    rgb = numpy.array([[255, 0, 0], [0, 255, 0], [128, 128, 128], [0, 0, 0]])
+
+    # nothing to correct with normal vision or in greyscale
+    numpy.testing.assert_array_equal(imaging.daltonise(rgb, "normal"), rgb)
+    numpy.testing.assert_array_equal(imaging.daltonise(rgb, "achroma"), rgb)
+
+    corrected = imaging.daltonise(rgb, "deutan")
+    assert corrected.dtype == numpy.int32 and corrected.min() >= 0 and corrected.max() <= 255
+    # red and green are what deuteranopes confuse, so they're shifted into what can be seen
+    assert (corrected[:2] != rgb[:2]).any(axis=-1).all()
+    numpy.testing.assert_array_equal(corrected[3], [0, 0, 0])
+
+
+@pytest.mark.parametrize("raw", [False, True])
+def test_main_works_through_memory_mapped_files(tmp_path, raw):
+    image = _image(seed=2)
+    if raw:
+        source, destination = tmp_path / "image.rgb", tmp_path / "simulated.rgb"
+        image.tofile(source)
+        shape = ["--shape", str(image.shape[0]), str(image.shape[1])]
+    else:
+        source, destination = tmp_path / "image.npy", tmp_path / "simulated.npy"
+        numpy.save(source, image)
+        shape = []
+
+    assert imaging.main(["simulate", str(source), str(destination), "--condition", "protanopia",
+                         "--tile", "10"] + shape) == 0
+    result = imaging.open_image(str(destination), image.shape if raw else None)
+    numpy.testing.assert_array_equal(result, colours.simulate_image(image, *colours._conditions["protanopia"]))
+
+
+def test_distinct_colours_needs_8_bit_channels():
+    image = _image(seed=3)
+    unique, inverse = colours._distinct_colours(image)
+    numpy.testing.assert_array_equal(unique[inverse].reshape(image.shape), image)
+
+    # other integer types are fine so long as they fit
+    unique, inverse = colours._distinct_colours(image.astype(numpy.int64))
+    numpy.testing.assert_array_equal(unique[inverse].reshape(image.shape), image)
+
+    for bad in (image.astype(float), image.astype(numpy.uint16) * 256, image.astype(numpy.int16) - 1):
+        with pytest.raises(ValueError):
+            colours._distinct_colours(bad)
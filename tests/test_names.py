@@ -0,0 +1,34 @@
+import names
+import numpy
+import os
+import pytest
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    return names._cache_path(names._table)
+
+
+def test_cached_index_matches_built_one(cache):
+    built = names.load_index()
+    assert os.path.exists(cache)
+
+    loaded = names.load_index()
+    assert loaded.names == built.names
+    numpy.testing.assert_array_equal(loaded.rgb, built.rgb)
+    numpy.testing.assert_array_equal(loaded.lab, built.lab)
+
+    rgb = numpy.random.default_rng(0).integers(0, 256, (50, 3))
+    assert loaded.nearest_names(rgb) == built.nearest_names(rgb)
+
+
+@pytest.mark.parametrize("contents", [b"", b"not a cache", b"\x80\x04\x95garbage"])
+def test_unusable_cache_is_rebuilt(cache, contents):
+    os.makedirs(os.path.dirname(cache), exist_ok=True)
+    with open(cache, "wb") as outfile:
+        outfile.write(contents)
+
+    index = names.load_index()
+    assert len(index) == len(names._read_table(names._table)[0])
+    assert names._load_cache(cache) is not None
@@ -0,0 +1,75 @@
+import io
+import matplotlib.figure
+import numpy
+import pytest
+import scheming
+import types
+
+
+def _region(series, layout, block_rows):
+    """Make a PlotRegion drawing onto a plain figure, without any of the window around it."""
+    region = scheming.PlotRegion.__new__(scheming.PlotRegion)
+    region.block_rows = block_rows
+    region.figure = matplotlib.figure.Figure()
+    region.ax = region.figure.add_subplot()
+    region._canvas = types.SimpleNamespace(draw=lambda: None, draw_idle=lambda: None)
+    region._series = lambda entry, colourblind_args: series[entry]
+    region.parent = types.SimpleNamespace(plot_layout=layout, tracer=scheming.ActionTracer(),
+                                          view=types.SimpleNamespace(colourblind_args=[{}], index={"normal": 0},
+                                                                     selected="normal"))
+    return region
+
+
+def _contents(region):
+    """Return everything the blocks draw, with the nan gaps between error bars made comparable."""
+    return [(block["start"], block["first"], block["end"],
+             [path.vertices.tolist() for path in block["lines"].get_paths()],
+             [numpy.nan_to_num(path.vertices, nan=-1).tolist() for path in block["errors"].get_paths()],
+             {key: markers.get_offsets().tolist() for key, markers in block["markers"].items()})
+            for block in region.blocks]
+
+
+def test_extending_matches_replotting():
+    """Following a scrolling file should draw exactly what replotting from scratch would."""
+    series = [{"colour": "#ff0000", "x": None, "y": 1, "x_err": None, "y_err": 3, "marker": "o",
+               "linestyle": "-", "fillstyle": "full", "label": None},
+              {"colour": "#0000ff", "x": 0, "y": 2, "x_err": 3, "y_err": None, "marker": "x",
+               "linestyle": "None", "fillstyle": "none", "label": "b"}]
+    empty = types.SimpleNamespace(get=lambda: "")
+    layout = types.SimpleNamespace(data=None, first_row=0, entries=range(len(series)), xlim_low=empty,
+                                   xlim_high=empty, ylim_low=empty, ylim_high=empty)
+
+    random = numpy.random.RandomState(0)
+    buffer = scheming.RingBuffer(300, 4)
+    buffer.extend(random.random_sample((120, 4)))
+    layout.data = buffer.view()
+    following = _region(series, layout, block_rows=50)
+    following.make_plot()
+
+    for rows in [1, 30, 50, 7, 100, 250, 3, 49, 50, 400]:
+        buffer.extend(random.random_sample((rows, 4)))
+        layout.data, layout.first_row = buffer.view(), buffer.dropped
+        following.extend_plot()
+
+        replotted = _region(series, layout, block_rows=50)
+        replotted.make_plot()
+        assert _contents(following) == _contents(replotted)
+        assert numpy.allclose(following.ax.dataLim.get_points(), replotted.ax.dataLim.get_points())
+
+
+def test_compare_grid_fits_the_screen_and_exports_at_full_size():
+    width, height = 750, 500
+    scale = scheming._compare_scale(width, height, 1920, 1080)
+    assert 4 * width * scale <= 1920 and 2.2 * height * scale <= 1080
+
+    dpi = scheming.CompareWindow.dpi
+    figure = matplotlib.figure.Figure(figsize=(4 * width * scale / dpi, 2.2 * height * scale / dpi), dpi=dpi)
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format="png", dpi=dpi / scale)
+    png = buffer.getvalue()
+    # the size of a PNG is in its header (give or take the rounding of the dpi)
+    assert int.from_bytes(png[16:20], "big") == pytest.approx(4 * width, abs=1)
+    assert int.from_bytes(png[20:24], "big") == pytest.approx(2.2 * height, abs=1)
+
+    # small plots aren't blown up
+    assert scheming._compare_scale(100, 80, 1920, 1080) == 1
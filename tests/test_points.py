@@ -0,0 +1,51 @@
+import colours
+import numpy
+import pytest
+import warnings
+
+
+def _min_separation(scheme):
+    lab = numpy.array([colour.lab for colour in scheme.colours])
+    separation = numpy.linalg.norm(lab[:, None] - lab, axis=-1)
+    numpy.fill_diagonal(separation, numpy.inf)
+    return separation.min()
+
+
+@pytest.mark.parametrize("n", [20, 50])
+def test_single_precision_spreads_as_well(n):
+    """Single precision should leave the colours as far apart as double precision does, typically.
+
+    The spread is sensitive to where the points start (a double precision run from the starting points rounded to
+    single precision ends up as far from the plain one), so a single seed can land anywhere and only the median over
+    several seeds is compared. Across 32 seeds it's within about 5%, while just rounding the starting points moves
+    it by up to about 9%, so the tolerance is 15%.
+    """
+    seeds = range(32)
+    double = numpy.median([_min_separation(colours.ColourScheme(n, seed=seed)) for seed in seeds])
+    single = numpy.median([_min_separation(colours.ColourScheme(n, seed=seed, dtype=numpy.float32)) for seed in seeds])
+    assert single == pytest.approx(double, rel=0.15)
+
+
+@pytest.mark.parametrize("dtype", [numpy.float32, numpy.float64])
+def test_close_points_stay_finite(dtype):
+    """Points nearly on top of each other get a big push rather than dividing by zero."""
+    points = colours.Points(3, force=20, dim=8, periodic=True, seed=0, dtype=dtype)
+    points.points[1] = points.points[0] + numpy.array([1e-6, 0, 0], dtype=dtype)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        points._move()
+
+    assert numpy.isfinite(points.points).all()
+
+
+@pytest.mark.parametrize("periodic", [True, False])
+@pytest.mark.parametrize("dtype", [numpy.float32, numpy.float64])
+def test_points_stay_in_the_box(periodic, dtype):
+    """However hard close points push each other, they end up inside the box (and nothing overflows)."""
+    points = colours.Points(50, force=20, dim=8, periodic=periodic, seed=1, dtype=dtype)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        points.spread(50)
+
+    assert ((points.points >= 0) & (points.points <= points.scale)).all()
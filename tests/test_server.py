@@ -0,0 +1,117 @@
+import colours
+import concurrent.futures
+import concurrent.futures.process
+import json
+import pytest
+import server
+import threading
+import urllib.error
+import urllib.request
+
+
+@pytest.fixture(scope="module")
+def service():
+    """Run the service on any free port of localhost, for the whole module."""
+    palettes = server.serve("127.0.0.1", 0, workers=2)
+    thread = threading.Thread(target=palettes.serve_forever, daemon=True)
+    thread.start()
+    yield palettes
+    palettes.shutdown()
+    palettes.server_close()
+    palettes.service.close()
+
+
+@pytest.fixture
+def submitted(service, monkeypatch):
+    """Count the jobs that actually go to the pool."""
+    jobs = []
+    submit = service.service._pool.submit
+
+    def counted(function, *args):
+        jobs.append(args)
+        return submit(function, *args)
+
+    monkeypatch.setattr(service.service._pool, "submit", counted)
+    return jobs
+
+
+def _request(service, path, body=None, data=None):
+    """Make a request of the service, returning the status and the parsed (or raw) response."""
+    url = "http://{}:{}{}".format(*service.server_address[:2], path)
+    if body is not None:
+        data = json.dumps(body).encode()
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, data=data), timeout=60) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as error:
+        content = error.read()
+        return error.code, json.loads(content) if error.headers.get_content_type() == "application/json" else content
+
+
+def test_seeded_schemes_are_reproducible(service):
+    status, first = _request(service, "/scheme", {"n": 5, "seed": 11})
+    assert status == 200
+    assert first["seed"] == 11 and len(first["colours"]) == 5
+    assert first["colours"] == [colour.hex for colour in colours.generate({"n": 5, "seed": 11}).colours]
+
+    assert _request(service, "/scheme", {"n": 5, "seed": 11}) == (200, first)
+    # and no seed means seed 0
+    assert _request(service, "/scheme", {"n": 5})[1]["colours"] == _request(service, "/scheme",
+                                                                           {"n": 5, "seed": 0})[1]["colours"]
+
+
+def test_identical_requests_share_one_job(service, submitted):
+    """Requests arriving together wait on the one job, and later ones come from the cache."""
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(_request(service, "/scheme", {"n": 40, "seed": 5})))
+               for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(results) == 8 and all(result == results[0] for result in results)
+    assert len(submitted) == 1
+
+    cached = _request(service, "/health")[1]["cached"]
+    assert _request(service, "/scheme", {"n": 40, "seed": 5}) == results[0]
+    assert len(submitted) == 1
+    assert _request(service, "/health")[1] == {"status": "ok", "workers": 2, "cached": cached, "in_flight": 0}
+
+
+def test_simulate(service):
+    status, result = _request(service, "/simulate", {"colours": ["#ff0000", "#00ff00"], "condition": "greyscale"})
+    assert status == 200
+    assert result["condition"] == "greyscale"
+    assert all(code[1:3] == code[3:5] == code[5:7] for code in result["colours"])
+
+
+@pytest.mark.parametrize("path, data", [("/scheme", b"{not json"),
+                                        ("/scheme", b"[1, 2]"),
+                                        ("/scheme", b'{"n": 4, "preset": "No Such Preset"}'),
+                                        ("/simulate", b'{"colours": ["#ff0000"], "condition": "sepia"}'),
+                                        ("/simulate", b'{"colours": ["not a colour"]}')])
+def test_bad_requests(service, path, data):
+    status, result = _request(service, path, data=data)
+    assert status == 400
+    assert result["error"]
+
+
+def test_unknown_paths(service):
+    assert _request(service, "/nowhere", {})[0] == 404
+    assert _request(service, "/nowhere")[0] == 404
+
+
+def test_broken_pool_is_a_server_error(service, monkeypatch):
+    def broken(function, *args):
+        future = concurrent.futures.Future()
+        future.set_exception(concurrent.futures.process.BrokenProcessPool("a worker died"))
+        return future
+
+    monkeypatch.setattr(service.service._pool, "submit", broken)
+    status, content = _request(service, "/scheme", {"n": 3, "seed": 1234})
+    assert status == 500
+    assert b"BrokenProcessPool" in content
+
+    # it isn't cached, and the service carries on
+    assert _request(service, "/health")[1]["in_flight"] == 0
@@ -0,0 +1,39 @@
+import colours
+import numpy
+import pytest
+import scheming
+
+_limits = ((0, 360), (0, 40), (30, 90))
+
+
+def _decode(ppm, width, height):
+    header = b"P6 %d %d 255\n" % (width, height)
+    assert ppm.startswith(header)
+    assert len(ppm) == len(header) + width * height * 3
+    return numpy.frombuffer(ppm[len(header):], dtype=numpy.uint8).reshape(height, width, 3)
+
+
+@pytest.mark.parametrize("kind", ["hue", "chroma", "light"])
+def test_preview_is_a_ppm(kind):
+    _decode(scheming._slider_preview(kind, _limits, 24, 120), 24, 120)
+
+
+def test_hue_is_never_held():
+    assert all(held != "hue" for across, held in scheming._slider_slices.values())
+
+
+@pytest.mark.parametrize("hue", [(0, 360), (100, 140), (200, 330)])
+def test_light_preview_covers_the_selected_hues(hue):
+    limits = (hue, (0, 40), (30, 90))
+    image = _decode(scheming._slider_preview("light", limits, 24, 120), 24, 120)
+
+    # the row at lightness 60, running across the hues at the middle chroma (20)
+    row = round((100 - 60) / 100 * 119)
+    lab = colours.rgb_to_lab(image[row].astype(float))
+    hues = numpy.degrees(numpy.arctan2(lab[:, 2], lab[:, 1])) % 360
+    expected = numpy.linspace(*hue, 24) % 360
+
+    # rounding to whole RGB values moves the hue a little, going the short way round the circle
+    assert numpy.abs((hues - expected + 180) % 360 - 180).max() < 3
+    numpy.testing.assert_allclose(numpy.hypot(lab[:, 1], lab[:, 2]), 20, atol=1)
+    numpy.testing.assert_allclose(lab[:, 0], 100 - row / 119 * 100, atol=1)